@@ -17,6 +17,7 @@
 
 from __future__ import absolute_import
 
+from google.cloud.pubsub_v1 import AsyncPublisherClient
 from google.cloud.pubsub_v1 import PublisherClient
 from google.cloud.pubsub_v1 import SubscriberClient
 from google.cloud.pubsub_v1 import SchemaServiceClient
@@ -26,6 +27,7 @@ from google.cloud.pubsub_v1 import types
 __all__ = (
     "types",
     "PublisherClient",
+    "AsyncPublisherClient",
     "SubscriberClient",
     "SchemaServiceClient",
 )
@@ -24,6 +24,10 @@ class PublisherClient(publisher.Client):
     __doc__ = publisher.Client.__doc__
 
 
+class AsyncPublisherClient(publisher.AsyncClient):
+    __doc__ = publisher.AsyncClient.__doc__
+
+
 class SubscriberClient(subscriber.Client):
     __doc__ = subscriber.Client.__doc__
 
@@ -32,4 +36,10 @@ class SchemaServiceClient(schema_service.client.SchemaServiceClient):
     __doc__ = schema_service.client.SchemaServiceClient.__doc__
 
 
-__all__ = ("types", "PublisherClient", "SubscriberClient", "SchemaServiceClient")
+__all__ = (
+    "types",
+    "PublisherClient",
+    "AsyncPublisherClient",
+    "SubscriberClient",
+    "SchemaServiceClient",
+)
@@ -0,0 +1,120 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compression of the message data, shared by the publisher and the subscriber."""
+
+from __future__ import absolute_import
+
+import lzma
+import typing
+from typing import Mapping, Optional, Tuple
+import zlib
+
+from google.cloud.pubsub_v1 import types
+
+if typing.TYPE_CHECKING:  # pragma: NO COVER
+    from google.cloud import pubsub_v1
+
+
+COMPRESSION_ATTRIBUTE = "googclient_compression"
+"""The reserved message attribute naming the algorithm the data is compressed with."""
+
+
+def _zlib_compress(data: bytes, level: Optional[int]) -> bytes:
+    return zlib.compress(data, -1 if level is None else level)
+
+
+def _lzma_compress(data: bytes, level: Optional[int]) -> bytes:
+    return lzma.compress(data, preset=level)
+
+
+_COMPRESSORS = {
+    types.CompressionAlgorithm.ZLIB.value: _zlib_compress,
+    types.CompressionAlgorithm.LZMA.value: _lzma_compress,
+}
+
+_DECOMPRESSORS = {
+    types.CompressionAlgorithm.ZLIB.value: zlib.decompress,
+    types.CompressionAlgorithm.LZMA.value: lzma.decompress,
+}
+
+
+def compress_data(
+    data: bytes,
+    attributes: Optional[Mapping[str, str]],
+    settings: "pubsub_v1.types.PublishCompression",
+) -> Tuple[bytes, Optional[Mapping[str, str]]]:
+    """Compress the message data, if it is large enough and compresses well.
+
+    The given attributes are not modified. If the data is compressed, a copy of
+    them is returned with the compression attribute added.
+
+    Args:
+        data: The message data.
+        attributes: The message attributes, already coerced to text strings.
+        settings: The compression settings.
+
+    Returns:
+        The data and attributes to publish.
+
+    Raises:
+        ValueError: If the attributes already contain the reserved compression
+            attribute.
+    """
+    if attributes and COMPRESSION_ATTRIBUTE in attributes:
+        raise ValueError(
+            "The {} attribute is reserved for message compression.".format(
+                COMPRESSION_ATTRIBUTE
+            )
+        )
+
+    if len(data) < settings.threshold:
+        return data, attributes
+
+    algorithm = types.CompressionAlgorithm(settings.algorithm).value
+    compressed = _COMPRESSORS[algorithm](data, settings.level)
+
+    # Incompressible data would only grow, and cost decompression time.
+    if len(compressed) >= len(data):
+        return data, attributes
+
+    marked = dict(attributes) if attributes else {}
+    marked[COMPRESSION_ATTRIBUTE] = algorithm
+    return compressed, marked
+
+
+def decompress_data(data: bytes, algorithm: str) -> bytes:
+    """Decompress the message data.
+
+    Args:
+        data: The compressed message data.
+        algorithm: The value of the compression attribute of the message.
+
+    Returns:
+        The decompressed data.
+
+    Raises:
+        ValueError: If the algorithm is unknown, or the data cannot be decompressed.
+    """
+    try:
+        decompress = _DECOMPRESSORS[algorithm]
+    except KeyError:
+        raise ValueError("Unknown compression algorithm: {!r}.".format(algorithm))
+
+    try:
+        return decompress(data)
+    except (zlib.error, lzma.LZMAError) as exc:
+        raise ValueError(
+            "Could not decompress {} compressed message data.".format(algorithm)
+        ) from exc
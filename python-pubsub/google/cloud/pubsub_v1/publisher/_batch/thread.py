@@ -40,6 +40,64 @@ _SERVER_PUBLISH_MAX_BYTES = 10 * 1000 * 1000  # max accepted size of PublishRequ
 _raw_proto_pubbsub_message = gapic_types.PubsubMessage.pb()
 
 
+def _varint_size(value: int) -> int:
+    """Return the number of bytes needed to encode a non-negative varint."""
+    size = 1
+    while value >= 0x80:
+        value >>= 7
+        size += 1
+    return size
+
+
+def _length_delimited_size(length: int) -> int:
+    """Return the encoded size of a length-delimited field with a one-byte tag."""
+    return 1 + _varint_size(length) + length
+
+
+def _utf8_length(text: str) -> int:
+    """Return the length of a string's UTF-8 encoding."""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def _framed_message_size(message: gapic_types.PubsubMessage) -> int:
+    """Return the number of bytes a message adds to a ``PublishRequest``.
+
+    This is equal to ``PublishRequest(messages=[message])._pb.ByteSize()``, but it
+    is computed directly from the field lengths, without creating a temporary
+    request and walking it.
+
+    Args:
+        message: The Pub/Sub message.
+
+    Returns:
+        The size of the message, including its field tag and length prefix.
+    """
+    pb = message._pb
+
+    if pb.HasField("publish_time"):
+        # Not set by publishers, fall back to the generic (slow) computation.
+        return _length_delimited_size(pb.ByteSize())
+
+    size = 0
+    if pb.data:
+        size += _length_delimited_size(len(pb.data))
+
+    # Map entries are always serialized with both the key and the value, even
+    # if any of them is empty.
+    for key, value in pb.attributes.items():
+        key_size = _length_delimited_size(_utf8_length(key))
+        value_size = _length_delimited_size(_utf8_length(value))
+        entry_size = key_size + value_size
+        size += _length_delimited_size(entry_size)
+
+    if pb.message_id:
+        size += _length_delimited_size(_utf8_length(pb.message_id))
+    if pb.ordering_key:
+        size += _length_delimited_size(_utf8_length(pb.ordering_key))
+
+    return _length_delimited_size(size)
+
+
 class Batch(base.Batch):
     """A batch of messages.
 
@@ -109,6 +167,11 @@ class Batch(base.Batch):
         # in order to avoid race conditions
         self._futures: List[futures.Future] = []
         self._messages: List[gapic_types.PubsubMessage] = []
+        # With lightweight futures, all messages share a single batch future, and
+        # the batch releases them from the client's flow control when done.
+        self._batch_future: Optional[futures._BatchFuture] = None
+        if client.publisher_options.lightweight_futures:
+            self._batch_future = futures._BatchFuture()
         self._status = base.BatchStatus.ACCEPTING_MESSAGES
 
         # The initial size is not zero, we need to account for the size overhead
@@ -187,8 +250,7 @@ class Batch(base.Batch):
             ), "Cancel should not be called after sending has started."
 
             exc = RuntimeError(cancellation_reason.value)
-            for future in self._futures:
-                future.set_exception(exc)
+            self._set_exception(exc)
             self._status = base.BatchStatus.ERROR
 
     def commit(self) -> None:
@@ -196,11 +258,12 @@ class Batch(base.Batch):
 
         .. note::
 
-            This method is non-blocking. It opens a new thread, which calls
-            :meth:`_commit`, which does block.
+            This method is non-blocking. It submits :meth:`_commit`, which does
+            block, to the client's pool of commit workers.
 
-        This synchronously sets the batch status to "starting", and then opens
-        a new thread, which handles actually sending the messages to Pub/Sub.
+        This synchronously sets the batch status to "starting", and then hands
+        the batch over to a commit worker, which handles actually sending the
+        messages to Pub/Sub.
 
         If the current batch is **not** accepting messages, this method
         does nothing.
@@ -214,17 +277,15 @@ class Batch(base.Batch):
             else:
                 return
 
-        self._start_commit_thread()
+        self._submit_commit()
 
-    def _start_commit_thread(self) -> None:
-        """Start a new thread to actually handle the commit."""
-        # NOTE: If the thread is *not* a daemon, a memory leak exists due to a CPython issue.
-        # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-829910303
-        # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-830092418
-        commit_thread = threading.Thread(
-            name="Thread-CommitBatchPublisher", target=self._commit, daemon=True
-        )
-        commit_thread.start()
+    def _submit_commit(self) -> None:
+        """Schedule the commit on one of the client's commit workers.
+
+        If all workers are busy, the commit waits in the executor's queue, which
+        bounds the number of concurrent publish requests.
+        """
+        self._client._commit_executor.submit(self._commit)
 
     def _commit(self) -> None:
         """Actually publish all of the messages on the active batch.
@@ -281,28 +342,31 @@ class Batch(base.Batch):
             # We failed to publish, even after retries, so set the exception on
             # all futures and exit.
             self._status = base.BatchStatus.ERROR
-
-            for future in self._futures:
-                future.set_exception(exc)
+            self._set_exception(exc)
 
             batch_transport_succeeded = False
             if self._batch_done_callback is not None:
                 # Failed to publish batch.
                 self._batch_done_callback(batch_transport_succeeded)
 
-            _LOGGER.exception("Failed to publish %s messages.", len(self._futures))
+            _LOGGER.exception("Failed to publish %s messages.", len(self._messages))
             return
 
         end = time.time()
         _LOGGER.debug("gRPC Publish took %s seconds.", end - start)
+        self._client._record_commit(len(self._messages), end - start)
 
-        if len(response.message_ids) == len(self._futures):
+        if len(response.message_ids) == len(self._messages):
             # Iterate over the futures on the queue and return the response
             # IDs. We are trusting that there is a 1:1 mapping, and raise
             # an exception if not.
             self._status = base.BatchStatus.SUCCESS
-            for message_id, future in zip(response.message_ids, self._futures):
-                future.set_result(message_id)
+            if self._batch_future is None:
+                for message_id, future in zip(response.message_ids, self._futures):
+                    future.set_result(message_id)
+            else:
+                self._client._release_flow_control(self._messages)
+                self._batch_future.set_result(response.message_ids)
         else:
             # Sanity check: If the number of message IDs is not equal to
             # the number of futures I have, then something went wrong.
@@ -311,8 +375,7 @@ class Batch(base.Batch):
                 "Some messages were not successfully published."
             )
 
-            for future in self._futures:
-                future.set_exception(exception)
+            self._set_exception(exception)
 
             # Unknown error -> batch failed to be correctly transported/
             batch_transport_succeeded = False
@@ -320,7 +383,7 @@ class Batch(base.Batch):
             _LOGGER.error(
                 "Only %s of %s messages were published.",
                 len(response.message_ids),
-                len(self._futures),
+                len(self._messages),
             )
 
         if self._batch_done_callback is not None:
@@ -369,9 +432,7 @@ class Batch(base.Batch):
             if self.status != base.BatchStatus.ACCEPTING_MESSAGES:
                 return None
 
-            size_increase = gapic_types.PublishRequest(
-                messages=[message]
-            )._pb.ByteSize()
+            size_increase = _framed_message_size(message)
 
             if (self._base_request_size + size_increase) > _SERVER_PUBLISH_MAX_BYTES:
                 err_msg = (
@@ -395,8 +456,13 @@ class Batch(base.Batch):
 
                 # Track the future on this batch (so that the result of the
                 # future can be set).
-                future = futures.Future()
-                self._futures.append(future)
+                if self._batch_future is None:
+                    future = futures.Future()
+                    self._futures.append(future)
+                else:
+                    future = futures.MessageFuture(
+                        self._batch_future, len(self._messages) - 1
+                    )
 
         # Try to commit, but it must be **without** the lock held, since
         # ``commit()`` will try to obtain the lock.
@@ -405,5 +471,14 @@ class Batch(base.Batch):
 
         return future
 
+    def _set_exception(self, exception: BaseException) -> None:
+        """Fail the futures of all messages in the batch."""
+        if self._batch_future is None:
+            for future in self._futures:
+                future.set_exception(exception)
+        else:
+            self._client._release_flow_control(self._messages)
+            self._batch_future.set_exception(exception)
+
     def _set_status(self, status: base.BatchStatus):
         self._status = status
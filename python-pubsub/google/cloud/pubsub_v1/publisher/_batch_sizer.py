@@ -0,0 +1,141 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from google.cloud.pubsub_v1 import types
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Batch settings are decreased by this factor when publishing gets too slow.
+_DECREASE_FACTOR = 0.5
+
+# Batch settings are increased by this factor when commits wait for a worker.
+_BACKLOG_INCREASE_FACTOR = 1.5
+
+# The maximum latency is scaled by these factors when batches are (not) full.
+_LATENCY_INCREASE_FACTOR = 1.25
+_LATENCY_DECREASE_FACTOR = 0.8
+
+
+class AdaptiveBatchSizer(object):
+    """Adapts the batch settings to the observed duration of publish requests.
+
+    The adjustments follow TCP congestion control: the maximum number of messages
+    per batch grows additively while publish requests complete within the target
+    latency and batches fill up, it grows multiplicatively while committed
+    batches wait in the queue for a free commit worker, and it shrinks
+    multiplicatively when a publish request takes longer than the target latency.
+    The maximum batch latency grows together with the batch size, and shrinks
+    while batches are committed before they are full, i.e. when the traffic is
+    light.
+
+    Args:
+        batch_settings:
+            The initial batch settings. The maximum number of bytes per batch is
+            never adjusted.
+        bounds:
+            The bounds of the adjusted settings.
+    """
+
+    def __init__(
+        self, batch_settings: "types.BatchSettings", bounds: "types.AdaptiveBatching"
+    ):
+        if bounds.min_messages < 1 or bounds.min_messages > bounds.max_messages:
+            raise ValueError(
+                "min_messages must be at least 1 and not greater than max_messages."
+            )
+        if bounds.min_latency <= 0 or bounds.min_latency > bounds.max_latency:
+            raise ValueError(
+                "min_latency must be positive and not greater than max_latency."
+            )
+
+        self._bounds = bounds
+        self._max_bytes = batch_settings.max_bytes
+        self._max_messages = self._clamp_messages(batch_settings.max_messages)
+        self._max_latency = self._clamp_latency(batch_settings.max_latency)
+        self._settings = self._make_settings()
+
+        # Publish requests complete on multiple commit workers concurrently.
+        self._operational_lock = threading.Lock()
+
+    @property
+    def settings(self) -> "types.BatchSettings":
+        """The batch settings to use for new batches."""
+        return self._settings
+
+    def record_commit(
+        self, message_count: int, latency: float, queue_depth: int
+    ) -> "types.BatchSettings":
+        """Adjust the batch settings after a successful publish request.
+
+        Args:
+            message_count: The number of messages in the published batch.
+            latency: The duration of the publish request in seconds.
+            queue_depth: The number of batches waiting for a free commit worker.
+
+        Returns:
+            The batch settings to use for new batches.
+        """
+        with self._operational_lock:
+            # A batch is committed once adding a message would reach the limit.
+            batch_full = message_count + 1 >= self._max_messages
+
+            if latency > self._bounds.target_commit_latency:
+                self._max_messages = self._clamp_messages(
+                    self._max_messages * _DECREASE_FACTOR
+                )
+            elif queue_depth > 0:
+                self._max_messages = self._clamp_messages(
+                    self._max_messages * _BACKLOG_INCREASE_FACTOR
+                )
+                self._max_latency = self._clamp_latency(
+                    self._max_latency * _LATENCY_INCREASE_FACTOR
+                )
+            elif batch_full:
+                self._max_messages = self._clamp_messages(
+                    self._max_messages + max(1, self._max_messages // 10)
+                )
+                self._max_latency = self._clamp_latency(
+                    self._max_latency * _LATENCY_INCREASE_FACTOR
+                )
+            else:
+                self._max_latency = self._clamp_latency(
+                    self._max_latency * _LATENCY_DECREASE_FACTOR
+                )
+
+            settings = self._make_settings()
+            if settings != self._settings:
+                _LOGGER.debug("Adjusted batch settings to %s.", settings)
+                self._settings = settings
+            return settings
+
+    def _clamp_messages(self, max_messages: float) -> int:
+        bounds = self._bounds
+        return int(min(max(max_messages, bounds.min_messages), bounds.max_messages))
+
+    def _clamp_latency(self, max_latency: float) -> float:
+        bounds = self._bounds
+        return min(max(max_latency, bounds.min_latency), bounds.max_latency)
+
+    def _make_settings(self) -> "types.BatchSettings":
+        return types.BatchSettings(
+            max_bytes=self._max_bytes,
+            max_latency=self._max_latency,
+            max_messages=self._max_messages,
+        )
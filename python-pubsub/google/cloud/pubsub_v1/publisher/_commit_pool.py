@@ -0,0 +1,131 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, List
+import uuid
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Worker stop indicator, see helper_threads.STOP in the subscriber for why this
+# is not a plain sentinel object.
+_STOP = uuid.uuid4()
+
+
+class CommitWorkerPool(object):
+    """A bounded pool of long-lived worker threads running batch commits.
+
+    Workers are started lazily, one per submitted task, until ``max_workers``
+    threads exist. From then on, tasks wait in a queue until a worker becomes
+    available, which bounds the number of commits running concurrently.
+
+    Unlike :class:`concurrent.futures.ThreadPoolExecutor`, the workers are daemon
+    threads, thus they do not block interpreter shutdown.
+
+    Args:
+        max_workers: The maximum number of worker threads.
+        thread_name_prefix: The prefix of the worker thread names.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0.")
+
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._work_queue: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._idle_workers = 0
+
+        # Protects the list of threads, the idle worker count and the shutdown flag.
+        self._operational_lock = threading.Lock()
+        self._shutdown = False
+
+    @property
+    def max_workers(self) -> int:
+        """The maximum number of worker threads."""
+        return self._max_workers
+
+    @property
+    def queue_size(self) -> int:
+        """The approximate number of submitted tasks waiting for a free worker."""
+        return self._work_queue.qsize()
+
+    def submit(self, fn: Callable[[], Any]) -> None:
+        """Schedule the callable to be run by one of the workers.
+
+        Args:
+            fn: The callable to run.
+
+        Raises:
+            RuntimeError: If called after :meth:`shutdown`.
+        """
+        with self._operational_lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit work after shutdown.")
+
+            self._work_queue.put(fn)
+
+            if self._idle_workers > 0:
+                self._idle_workers -= 1
+            elif len(self._threads) < self._max_workers:
+                self._start_worker()
+
+    def shutdown(self) -> None:
+        """Stop the workers once all already submitted work is done.
+
+        This method does not block.
+        """
+        with self._operational_lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+
+            for _ in self._threads:
+                self._work_queue.put(_STOP)
+
+    def _start_worker(self) -> None:
+        """Start a new worker thread.
+
+        The method assumes that the caller has obtained ``_operational_lock``.
+        """
+        # NOTE: If the thread is *not* a daemon, a memory leak exists due to a CPython issue.
+        # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-829910303
+        # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-830092418
+        thread = threading.Thread(
+            name="{}_{}".format(self._thread_name_prefix, len(self._threads)),
+            target=self._work,
+            daemon=True,
+        )
+        self._threads.append(thread)
+        thread.start()
+
+    def _work(self) -> None:
+        while True:
+            fn = self._work_queue.get()
+            if fn == _STOP:
+                break
+
+            try:
+                fn()
+            except Exception:
+                _LOGGER.exception("Error in commit worker.")
+
+            with self._operational_lock:
+                self._idle_workers += 1
+
+        _LOGGER.debug("Exiting commit worker %s.", threading.current_thread().name)
@@ -250,7 +250,7 @@ class OrderedSequencer(sequencer_base.Sequencer):
             commit_timeout:
                 The timeout to apply when publishing the batch.
         """
-        return self._client._batch_class(
+        batch = self._client._batch_class(
             client=self._client,
             topic=self._topic,
             settings=self._client.batch_settings,
@@ -259,6 +259,10 @@ class OrderedSequencer(sequencer_base.Sequencer):
             commit_retry=commit_retry,
             commit_timeout=commit_timeout,
         )
+        # Have the client commit the batch once it reaches the maximum latency
+        # (only if it is the first batch at that point).
+        self._client._schedule_batch_commit(self._topic, self._ordering_key, batch)
+        return batch
 
     def publish(
         self,
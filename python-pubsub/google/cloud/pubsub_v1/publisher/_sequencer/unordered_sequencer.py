@@ -103,7 +103,7 @@ class UnorderedSequencer(base.Sequencer):
             commit_timeout:
                 The timeout to apply when publishing the batch.
         """
-        return self._client._batch_class(
+        batch = self._client._batch_class(
             client=self._client,
             topic=self._topic,
             settings=self._client.batch_settings,
@@ -112,6 +112,9 @@ class UnorderedSequencer(base.Sequencer):
             commit_retry=commit_retry,
             commit_timeout=commit_timeout,
         )
+        # Have the client commit the batch once it reaches the maximum latency.
+        self._client._schedule_batch_commit(self._topic, "", batch)
+        return batch
 
     def publish(
         self,
@@ -0,0 +1,478 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import asyncio
+import logging
+import os
+import typing
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from google.api_core import gapic_v1
+from google.auth.credentials import AnonymousCredentials  # type: ignore
+
+from google.cloud.pubsub_v1 import _compression
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher import exceptions
+from google.cloud.pubsub_v1.publisher._batch import asyncio as asyncio_batch
+from google.cloud.pubsub_v1.publisher._sequencer import ordered_sequencer
+from google.cloud.pubsub_v1.publisher._sequencer import unordered_sequencer
+from google.cloud.pubsub_v1.publisher.client import _coerce_attributes
+from google.cloud.pubsub_v1.publisher.flow_controller import AsyncFlowController
+from google.pubsub_v1 import types as gapic_types
+from google.pubsub_v1.services.publisher import async_client as publisher_async_client
+
+if typing.TYPE_CHECKING:  # pragma: NO COVER
+    from google.pubsub_v1.services.publisher.client import OptionalRetry
+    from google.pubsub_v1.types import pubsub as pubsub_types
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+_raw_proto_pubbsub_message = gapic_types.PubsubMessage.pb()
+
+SequencerType = Union[
+    ordered_sequencer.OrderedSequencer, unordered_sequencer.UnorderedSequencer
+]
+
+
+class AsyncClient(publisher_async_client.PublisherAsyncClient):
+    """An asyncio publisher client for Google Cloud Pub/Sub.
+
+    This is the asyncio counterpart of :class:`~.pubsub_v1.publisher.client.Client`.
+    Messages are batched on the event loop, each batch is committed as a task
+    using the ``grpc_asyncio`` transport, and publishing returns
+    :class:`asyncio.Future` instances instead of thread-based futures.
+
+    The batching, flow control and message ordering semantics are the same as
+    those of the threaded client. The client must only be used from the thread
+    running its event loop.
+
+    Args:
+        batch_settings:
+            The settings for batch publishing.
+        publisher_options:
+            The options for the publisher client. Note that enabling message ordering
+            will override the publish retry timeout to be infinite. The
+            ``max_commit_workers`` option bounds the number of concurrent commit
+            tasks.
+        kwargs:
+            Any additional arguments provided are sent as keyword arguments to the
+            underlying
+            :class:`~google.pubsub_v1.services.publisher.async_client.PublisherAsyncClient`.
+
+    Example:
+
+    .. code-block:: python
+
+        from google.cloud import pubsub_v1
+
+        async def main():
+            publisher_client = pubsub_v1.AsyncPublisherClient()
+            topic = publisher_client.topic_path('[PROJECT]', '[TOPIC]')
+
+            future = await publisher_client.publish(topic, b'data')
+            message_id = await future
+
+            await publisher_client.stop()
+    """
+
+    def __init__(
+        self,
+        batch_settings: Union[types.BatchSettings, Sequence] = (),
+        publisher_options: Union[types.PublisherOptions, Sequence] = (),
+        **kwargs: Any,
+    ):
+        assert (
+            type(batch_settings) is types.BatchSettings or len(batch_settings) == 0
+        ), "batch_settings must be of type BatchSettings or an empty sequence."
+        assert (
+            type(publisher_options) is types.PublisherOptions
+            or len(publisher_options) == 0
+        ), "publisher_options must be of type PublisherOptions or an empty sequence."
+
+        # Sanity check: Is our goal to use the emulator?
+        # If so, create a grpc insecure channel with the emulator host
+        # as the target.
+        if os.environ.get("PUBSUB_EMULATOR_HOST"):
+            kwargs["client_options"] = {
+                "api_endpoint": os.environ.get("PUBSUB_EMULATOR_HOST")
+            }
+            kwargs["credentials"] = AnonymousCredentials()
+
+        self.publisher_options = types.PublisherOptions(*publisher_options)
+        if self.publisher_options.adaptive_batching is not None:
+            raise ValueError(
+                "Adaptive batching is not supported by the asyncio publisher client."
+            )
+        if self.publisher_options.lightweight_futures:
+            raise ValueError(
+                "Lightweight futures are not supported by the asyncio publisher client."
+            )
+        self._enable_message_ordering = self.publisher_options[0]
+
+        super().__init__(**kwargs)
+        self._batch_class = asyncio_batch.Batch
+        self.batch_settings = types.BatchSettings(*batch_settings)
+
+        # (topic, ordering_key) => sequencers object
+        self._sequencers: Dict[Tuple[str, str], SequencerType] = {}
+        self._is_stopped = False
+        # Task committing all sequencers after a timeout.
+        self._commit_timer: Optional[asyncio.Task] = None
+
+        # The commit tasks that have not finished yet, and the semaphore bounding
+        # how many of them can publish at the same time. The latter is created
+        # lazily, because before Python 3.10 it binds to the event loop current
+        # at creation time.
+        self._commit_tasks: Set[asyncio.Future] = set()
+        self._commit_semaphore: Optional[asyncio.Semaphore] = None
+
+        # The object controlling the message publishing flow
+        self._flow_controller = AsyncFlowController(self.publisher_options.flow_control)
+
+    def _get_or_create_sequencer(self, topic: str, ordering_key: str) -> SequencerType:
+        """Get an existing sequencer or create a new one given the (topic,
+        ordering_key) pair.
+        """
+        sequencer_key = (topic, ordering_key)
+        sequencer = self._sequencers.get(sequencer_key)
+        if sequencer is None:
+            if ordering_key == "":
+                sequencer = unordered_sequencer.UnorderedSequencer(
+                    self, topic  # type: ignore[arg-type]
+                )
+            else:
+                sequencer = ordered_sequencer.OrderedSequencer(
+                    self, topic, ordering_key  # type: ignore[arg-type]
+                )
+            self._sequencers[sequencer_key] = sequencer
+
+        return sequencer
+
+    def resume_publish(self, topic: str, ordering_key: str) -> None:
+        """Resume publish on an ordering key that has had unrecoverable errors.
+
+        Args:
+            topic: The topic to publish messages to.
+            ordering_key: A string that identifies related messages for which
+                publish order should be respected.
+
+        Raises:
+            RuntimeError:
+                If called after publisher has been stopped by a `stop()` method
+                call.
+            ValueError:
+                If the topic/ordering key combination has not been seen before
+                by this client.
+        """
+        if self._is_stopped:
+            raise RuntimeError("Cannot resume publish on a stopped publisher.")
+
+        if not self._enable_message_ordering:
+            raise ValueError(
+                "Cannot resume publish on a topic/ordering key if ordering "
+                "is not enabled."
+            )
+
+        sequencer_key = (topic, ordering_key)
+        sequencer = self._sequencers.get(sequencer_key)
+        if sequencer is None:
+            _LOGGER.debug(
+                "Error: The topic/ordering key combination has not been seen before."
+            )
+        else:
+            sequencer.unpause()
+
+    async def _gapic_publish(self, *args, **kwargs) -> "pubsub_types.PublishResponse":
+        """Call the GAPIC public API directly."""
+        return await super().publish(*args, **kwargs)
+
+    async def publish(  # type: ignore[override]
+        self,
+        topic: str,
+        data: bytes,
+        ordering_key: str = "",
+        retry: "OptionalRetry" = gapic_v1.method.DEFAULT,
+        timeout: "types.OptionalTimeout" = gapic_v1.method.DEFAULT,
+        **attrs: Union[bytes, str],
+    ) -> "asyncio.Future[str]":
+        """Publish a single message.
+
+        Add the given message to a batch; this will cause it to be published
+        once the batch either has enough messages or a sufficient period of time
+        has elapsed. Awaiting this method only waits until the message has been
+        accepted for publishing, which may take a while if
+        ``LimitExceededBehavior.BLOCK`` is used in the flow control settings.
+        Await the returned future to wait for the message to be published.
+
+        Example:
+            >>> from google.cloud import pubsub_v1
+            >>> client = pubsub_v1.AsyncPublisherClient()
+            >>> topic = client.topic_path('[PROJECT]', '[TOPIC]')
+            >>> data = b'The rain in Wales falls mainly on the snails.'
+            >>> future = await client.publish(topic, data, username='guido')
+            >>> message_id = await future
+
+        Args:
+            topic: The topic to publish messages to.
+            data: A bytestring representing the message body. This
+                must be a bytestring.
+            ordering_key: A string that identifies related messages for which
+                publish order should be respected. Message ordering must be
+                enabled for this client to use this feature.
+            retry:
+                Designation of what errors, if any, should be retried. If `ordering_key`
+                is specified, the total retry deadline will be changed to "infinity".
+                If given, it overides any retry passed into the client through
+                the ``publisher_options`` argument.
+            timeout:
+                The timeout for the RPC request. Can be used to override any timeout
+                passed in through ``publisher_options`` when instantiating the client.
+
+            attrs: A dictionary of attributes to be
+                sent as metadata. (These may be text strings or byte strings.)
+
+        Returns:
+            An :class:`asyncio.Future` resolving to the message ID.
+
+        Raises:
+            RuntimeError:
+                If called after publisher has been stopped by a `stop()` method
+                call.
+
+            pubsub_v1.publisher.exceptions.MessageTooLargeError: If publishing
+                the ``message`` would exceed the max size limit on the backend.
+
+            ValueError:
+                If message compression is enabled and ``attrs`` contain the
+                attribute reserved for it.
+        """
+        # Sanity check: Is the data being sent as a bytestring?
+        # If it is literally anything else, complain loudly about it.
+        if not isinstance(data, bytes):
+            raise TypeError(
+                "Data being published to Pub/Sub must be sent as a bytestring."
+            )
+
+        if not self._enable_message_ordering and ordering_key != "":
+            raise ValueError(
+                "Cannot publish a message with an ordering key when message "
+                "ordering is not enabled."
+            )
+
+        if self._is_stopped:
+            raise RuntimeError("Cannot publish on a stopped publisher.")
+
+        # Coerce all attributes to text strings.
+        attributes: Optional[Mapping[str, str]] = _coerce_attributes(attrs)
+
+        compression = self.publisher_options.compression
+        if compression is not None:
+            data, attributes = _compression.compress_data(data, attributes, compression)
+
+        vanilla_pb = _raw_proto_pubbsub_message(
+            data=data, ordering_key=ordering_key, attributes=attributes
+        )
+        message = gapic_types.PubsubMessage.wrap(vanilla_pb)
+
+        loop = asyncio.get_running_loop()
+
+        # Messages should go through flow control to prevent excessive
+        # queuing on the client side (depending on the settings).
+        try:
+            await self._flow_controller.add(message)
+        except exceptions.FlowControlLimitError as exc:
+            future = loop.create_future()
+            future.set_exception(exc)
+            return future
+
+        if retry is gapic_v1.method.DEFAULT:  # if custom retry not passed in
+            retry = self.publisher_options.retry
+
+        if timeout is gapic_v1.method.DEFAULT:  # if custom timeout not passed in
+            timeout = self.publisher_options.timeout
+
+        try:
+            # The client might have been stopped while waiting for flow control.
+            if self._is_stopped:
+                raise RuntimeError("Cannot publish on a stopped publisher.")
+
+            retry = self._resolve_ordering_retry(retry)
+
+            # Delegate the publishing to the sequencer.
+            sequencer = self._get_or_create_sequencer(topic, ordering_key)
+            sequencer_future = sequencer.publish(message, retry=retry, timeout=timeout)
+        except Exception:
+            self._flow_controller.release(message)
+            raise
+
+        if isinstance(sequencer_future, asyncio.Future):
+            future = sequencer_future
+        else:
+            # Paused ordering keys reject messages immediately with an already
+            # completed (threaded) future.
+            future = loop.create_future()
+            future.set_exception(sequencer_future.exception())  # type: ignore
+
+        future.add_done_callback(lambda _: self._flow_controller.release(message))
+
+        # Create a timer task if necessary to enforce the batching timeout.
+        self.ensure_cleanup_and_commit_timer_runs()
+
+        return future
+
+    def _resolve_ordering_retry(self, retry: "OptionalRetry") -> "OptionalRetry":
+        """Return the retry to use, taking message ordering into account."""
+        # Set retry timeout to "infinite" when message ordering is enabled.
+        # Note that this then also impacts messages added with an empty
+        # ordering key.
+        if self._enable_message_ordering:
+            if retry is gapic_v1.method.DEFAULT:
+                # use the default retry for the publish GRPC method as a base
+                transport = self._client._transport
+                base_retry = transport._wrapped_methods[transport.publish]._retry
+                retry = base_retry.with_deadline(2.0**32)
+            else:
+                retry = retry.with_deadline(2.0**32)  # type: ignore[union-attr]
+        return retry
+
+    def ensure_cleanup_and_commit_timer_runs(self) -> None:
+        """Ensure a cleanup/commit timer task is running.
+
+        If a cleanup/commit timer task is already running, or the publisher has
+        been stopped, this does nothing.
+        """
+        if (
+            self._commit_timer is None
+            and not self._is_stopped
+            and self.batch_settings.max_latency < float("inf")
+        ):
+            self._commit_timer = asyncio.ensure_future(
+                self._wait_and_commit_sequencers()
+            )
+
+    def _schedule_batch_commit(
+        self, topic: str, ordering_key: str, batch: asyncio_batch.Batch
+    ) -> None:
+        """Called by the sequencers when they create a new batch.
+
+        Open batches are committed by the commit timer ensured by :meth:`publish`,
+        thus there is nothing to do here.
+        """
+
+    async def _wait_and_commit_sequencers(self) -> None:
+        """Wait up to the batching timeout, and commit all sequencers."""
+        await asyncio.sleep(self.batch_settings.max_latency)
+        _LOGGER.debug("Commit timer is waking up")
+
+        if self._is_stopped:
+            return
+
+        # Clear the timer first, committing may need to start a new one.
+        self._commit_timer = None
+        self._commit_sequencers()
+
+    def _commit_sequencers(self) -> None:
+        """Clean up finished sequencers and commit the rest."""
+        finished_sequencer_keys = [
+            key
+            for key, sequencer in self._sequencers.items()
+            if sequencer.is_finished()
+        ]
+        for sequencer_key in finished_sequencer_keys:
+            del self._sequencers[sequencer_key]
+
+        for sequencer in self._sequencers.values():
+            sequencer.commit()
+
+    def _schedule_commit(self, commit: Callable[[], Awaitable[None]]) -> None:
+        """Run a batch commit as a task on the event loop.
+
+        At most ``max_commit_workers`` commits publish at the same time, the rest
+        wait for their turn.
+
+        Args:
+            commit: The coroutine function committing a batch.
+        """
+        task = asyncio.ensure_future(self._run_commit(commit))
+        self._commit_tasks.add(task)
+        task.add_done_callback(self._commit_tasks.discard)
+
+    async def _run_commit(self, commit: Callable[[], Awaitable[None]]) -> None:
+        if self._commit_semaphore is None:
+            self._commit_semaphore = asyncio.Semaphore(
+                self.publisher_options.max_commit_workers
+            )
+
+        async with self._commit_semaphore:
+            try:
+                await commit()
+            except Exception:
+                _LOGGER.exception("Error committing a batch.")
+
+    async def stop(self) -> None:
+        """Publish all outstanding messages and wait until that completes.
+
+        Sends all outstanding messages, prevents future calls to `publish()`,
+        and waits until all publish requests have completed, either in success
+        or error. Method should be awaited prior to deleting this `AsyncClient()`
+        object in order to ensure that no pending messages are lost.
+
+        Raises:
+            RuntimeError:
+                If called after publisher has been stopped by a `stop()` method
+                call.
+        """
+        if self._is_stopped:
+            raise RuntimeError("Cannot stop a publisher already stopped.")
+
+        self._is_stopped = True
+
+        for sequencer in self._sequencers.values():
+            sequencer.stop()
+
+        if self._commit_timer is not None:
+            self._commit_timer.cancel()
+            self._commit_timer = None
+
+        while self._commit_tasks:
+            await asyncio.wait(list(self._commit_tasks))
+
+    # Used only for testing.
+    def _set_batch(
+        self, topic: str, batch: asyncio_batch.Batch, ordering_key: str = ""
+    ) -> None:
+        sequencer = self._get_or_create_sequencer(topic, ordering_key)
+        sequencer._set_batch(batch)  # type: ignore[arg-type]
+
+    # Used only for testing.
+    def _set_sequencer(
+        self, topic: str, sequencer: SequencerType, ordering_key: str = ""
+    ) -> None:
+        sequencer_key = (topic, ordering_key)
+        self._sequencers[sequencer_key] = sequencer
@@ -14,23 +14,40 @@
 
 from __future__ import absolute_import
 
-import copy
+import contextlib
+import heapq
+import itertools
 import logging
 import os
 import threading
 import time
 import typing
-from typing import Any, Dict, Optional, Sequence, Tuple, Type, Union
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 import warnings
 
 from google.api_core import gapic_v1
 from google.auth.credentials import AnonymousCredentials  # type: ignore
 from google.oauth2 import service_account  # type: ignore
 
+from google.cloud.pubsub_v1 import _compression
 from google.cloud.pubsub_v1 import types
 from google.cloud.pubsub_v1.publisher import exceptions
 from google.cloud.pubsub_v1.publisher import futures
+from google.cloud.pubsub_v1.publisher._batch import base
 from google.cloud.pubsub_v1.publisher._batch import thread
+from google.cloud.pubsub_v1.publisher._batch_sizer import AdaptiveBatchSizer
+from google.cloud.pubsub_v1.publisher._commit_pool import CommitWorkerPool
 from google.cloud.pubsub_v1.publisher._sequencer import ordered_sequencer
 from google.cloud.pubsub_v1.publisher._sequencer import unordered_sequencer
 from google.cloud.pubsub_v1.publisher.flow_controller import FlowController
@@ -51,11 +68,50 @@ _LOGGER = logging.getLogger(__name__)
 
 
 _raw_proto_pubbsub_message = gapic_types.PubsubMessage.pb()
+_COMMIT_WORKER_NAME = "Thread-CommitBatchPublisher"
+# The number of shards of the sequencer map, each guarded by its own lock.
+_SEQUENCER_LOCK_STRIPES = 32
 
 SequencerType = Union[
     ordered_sequencer.OrderedSequencer, unordered_sequencer.UnorderedSequencer
 ]
 
+SequencerKey = Tuple[str, str]
+
+# A (deadline, sequence number, sequencer key, batch) entry of the commit schedule.
+# The sequencer key and batch are both None for entries scheduling a cleanup of
+# finished sequencers.
+_CommitDeadline = Tuple[
+    float, int, Optional[SequencerKey], Optional["_batch.thread.Batch"]
+]
+
+BulkMessageType = Tuple[bytes, Optional[Mapping[str, Union[bytes, str]]], str]
+"""A ``(data, attributes, ordering_key)`` tuple accepted by ``publish_many()``."""
+
+
+def _coerce_attributes(attrs: Mapping[str, Union[bytes, str]]) -> Dict[str, str]:
+    """Coerce all attribute values to text strings.
+
+    The given mapping is not modified, a new dictionary is only created if any of
+    the values needs to be decoded.
+
+    Raises:
+        TypeError: If any of the values is neither a text nor a byte string.
+    """
+    coerced = attrs
+    for k, v in attrs.items():
+        if isinstance(v, str):
+            continue
+        if isinstance(v, bytes):
+            if coerced is attrs:
+                coerced = dict(attrs)
+            coerced[k] = v.decode("utf-8")  # type: ignore[index]
+            continue
+        raise TypeError(
+            "All attributes being published to Pub/Sub must be sent as text strings."
+        )
+    return coerced  # type: ignore[return-value]
+
 
 class Client(publisher_client.PublisherClient):
     """A publisher client for Google Cloud Pub/Sub.
@@ -66,7 +122,9 @@ class Client(publisher_client.PublisherClient):
 
     Args:
         batch_settings:
-            The settings for batch publishing.
+            The settings for batch publishing. With adaptive batching enabled in
+            ``publisher_options``, these are the initial settings, and the
+            ``batch_settings`` attribute reflects the currently used settings.
         publisher_options:
             The options for the publisher client. Note that enabling message ordering
             will override the publish retry timeout to be infinite.
@@ -141,18 +199,46 @@ class Client(publisher_client.PublisherClient):
         self._batch_class = thread.Batch
         self.batch_settings = types.BatchSettings(*batch_settings)
 
-        # The batches on the publisher client are responsible for holding
-        # messages. One batch exists for each topic.
-        self._batch_lock = self._batch_class.make_lock()
-        # (topic, ordering_key) => sequencers object
-        self._sequencers: Dict[Tuple[str, str], SequencerType] = {}
+        # The sequencers, sharded by the hash of their (topic, ordering_key) pair.
+        # Each shard is guarded by its own lock, so that publishing with unrelated
+        # ordering keys does not contend on a single lock. The stop flag can only
+        # be changed while holding all of these locks.
+        self._sequencer_locks = [
+            self._batch_class.make_lock() for _ in range(_SEQUENCER_LOCK_STRIPES)
+        ]
+        self._sequencer_shards: List[Dict[SequencerKey, SequencerType]] = [
+            {} for _ in range(_SEQUENCER_LOCK_STRIPES)
+        ]
         self._is_stopped = False
-        # Thread created to commit all sequencers after a timeout.
+
+        # The deadlines by which the open batches must be committed, as a min-heap.
+        # A single long-lived thread waits for the earliest deadline to pass, and
+        # commits the corresponding batch. The batch lock guards the schedule.
+        self._batch_lock = self._batch_class.make_lock()
+        self._commit_deadlines: List[_CommitDeadline] = []
+        self._commit_deadline_counter = itertools.count()
+        self._commit_deadlines_changed = threading.Condition(self._batch_lock)
+        self._cleanup_scheduled = False
         self._commit_thread: Optional[threading.Thread] = None
 
+        # The workers that actually send the batches to the backend. The pool size
+        # bounds the number of publish requests in flight at the same time.
+        self._commit_executor = CommitWorkerPool(
+            max_workers=self.publisher_options.max_commit_workers,
+            thread_name_prefix=_COMMIT_WORKER_NAME,
+        )
+
         # The object controlling the message publishing flow
         self._flow_controller = FlowController(self.publisher_options.flow_control)
 
+        # Adjusts the batch settings to the observed publish request durations.
+        self._batch_sizer: Optional[AdaptiveBatchSizer] = None
+        if self.publisher_options.adaptive_batching is not None:
+            self._batch_sizer = AdaptiveBatchSizer(
+                self.batch_settings, self.publisher_options.adaptive_batching
+            )
+            self.batch_settings = self._batch_sizer.settings
+
     @classmethod
     def from_service_account_file(  # type: ignore[override]
         cls,
@@ -209,12 +295,21 @@ class Client(publisher_client.PublisherClient):
         warnings.warn(msg, category=DeprecationWarning)
         return super()
 
+    @staticmethod
+    def _shard_index(sequencer_key: SequencerKey) -> int:
+        """Return the index of the sequencer shard the given key belongs to."""
+        return hash(sequencer_key) % _SEQUENCER_LOCK_STRIPES
+
     def _get_or_create_sequencer(self, topic: str, ordering_key: str) -> SequencerType:
         """Get an existing sequencer or create a new one given the (topic,
         ordering_key) pair.
+
+        The method assumes that the caller has obtained the lock of the pair's
+        sequencer shard.
         """
         sequencer_key = (topic, ordering_key)
-        sequencer = self._sequencers.get(sequencer_key)
+        shard = self._sequencer_shards[self._shard_index(sequencer_key)]
+        sequencer = shard.get(sequencer_key)
         if sequencer is None:
             if ordering_key == "":
                 sequencer = unordered_sequencer.UnorderedSequencer(self, topic)
@@ -222,10 +317,18 @@ class Client(publisher_client.PublisherClient):
                 sequencer = ordered_sequencer.OrderedSequencer(
                     self, topic, ordering_key
                 )
-            self._sequencers[sequencer_key] = sequencer
+            shard[sequencer_key] = sequencer
 
         return sequencer
 
+    @contextlib.contextmanager
+    def _all_sequencer_locks(self):
+        """Acquire the locks of all sequencer shards, always in the same order."""
+        with contextlib.ExitStack() as stack:
+            for lock in self._sequencer_locks:
+                stack.enter_context(lock)
+            yield
+
     def resume_publish(self, topic: str, ordering_key: str) -> None:
         """Resume publish on an ordering key that has had unrecoverable errors.
 
@@ -242,7 +345,10 @@ class Client(publisher_client.PublisherClient):
                 If the topic/ordering key combination has not been seen before
                 by this client.
         """
-        with self._batch_lock:
+        sequencer_key = (topic, ordering_key)
+        index = self._shard_index(sequencer_key)
+
+        with self._sequencer_locks[index]:
             if self._is_stopped:
                 raise RuntimeError("Cannot resume publish on a stopped publisher.")
 
@@ -252,8 +358,7 @@ class Client(publisher_client.PublisherClient):
                     "is not enabled."
                 )
 
-            sequencer_key = (topic, ordering_key)
-            sequencer = self._sequencers.get(sequencer_key)
+            sequencer = self._sequencer_shards[index].get(sequencer_key)
             if sequencer is None:
                 _LOGGER.debug(
                     "Error: The topic/ordering key combination has not "
@@ -266,6 +371,22 @@ class Client(publisher_client.PublisherClient):
         """Call the GAPIC public API directly."""
         return super().publish(*args, **kwargs)
 
+    def _record_commit(self, message_count: int, latency: float) -> None:
+        """Adapt the batch settings to a successful publish request, if enabled.
+
+        New batches are created with the adjusted settings.
+
+        Args:
+            message_count: The number of messages in the published batch.
+            latency: The duration of the publish request in seconds.
+        """
+        if self._batch_sizer is None:
+            return
+
+        self.batch_settings = self._batch_sizer.record_commit(
+            message_count, latency, self._commit_executor.queue_size
+        )
+
     def publish(  # type: ignore[override]
         self,
         topic: str,
@@ -334,6 +455,10 @@ class Client(publisher_client.PublisherClient):
 
             pubsub_v1.publisher.exceptions.MessageTooLargeError: If publishing
                 the ``message`` would exceed the max size limit on the backend.
+
+            ValueError:
+                If message compression is enabled and ``attrs`` contain the
+                attribute reserved for it.
         """
         # Sanity check: Is the data being sent as a bytestring?
         # If it is literally anything else, complain loudly about it.
@@ -349,22 +474,17 @@ class Client(publisher_client.PublisherClient):
             )
 
         # Coerce all attributes to text strings.
-        for k, v in copy.copy(attrs).items():
-            if isinstance(v, str):
-                continue
-            if isinstance(v, bytes):
-                attrs[k] = v.decode("utf-8")
-                continue
-            raise TypeError(
-                "All attributes being published to Pub/Sub must "
-                "be sent as text strings."
-            )
+        attributes: Optional[Mapping[str, str]] = _coerce_attributes(attrs)
+
+        compression = self.publisher_options.compression
+        if compression is not None:
+            data, attributes = _compression.compress_data(data, attributes, compression)
 
         # Create the Pub/Sub message object. For performance reasons, the message
         # should be constructed by directly using the raw protobuf class, and only
         # then wrapping it into the higher-level PubsubMessage class.
         vanilla_pb = _raw_proto_pubbsub_message(
-            data=data, ordering_key=ordering_key, attributes=attrs
+            data=data, ordering_key=ordering_key, attributes=attributes
         )
         message = gapic_types.PubsubMessage.wrap(vanilla_pb)
 
@@ -386,52 +506,293 @@ class Client(publisher_client.PublisherClient):
         if timeout is gapic_v1.method.DEFAULT:  # if custom timeout not passed in
             timeout = self.publisher_options.timeout
 
-        with self._batch_lock:
+        # Only publishes with the same (topic, ordering_key) hash serialize here.
+        sequencer_lock = self._sequencer_locks[self._shard_index((topic, ordering_key))]
+
+        with sequencer_lock:
             if self._is_stopped:
                 raise RuntimeError("Cannot publish on a stopped publisher.")
 
-            # Set retry timeout to "infinite" when message ordering is enabled.
-            # Note that this then also impacts messages added with an empty
-            # ordering key.
-            if self._enable_message_ordering:
-                if retry is gapic_v1.method.DEFAULT:
-                    # use the default retry for the publish GRPC method as a base
-                    transport = self._transport
-                    base_retry = transport._wrapped_methods[transport.publish]._retry
-                    retry = base_retry.with_deadline(2.0**32)
-                else:
-                    retry = retry.with_deadline(2.0**32)
+            retry = self._resolve_ordering_retry(retry)
 
             # Delegate the publishing to the sequencer.
             sequencer = self._get_or_create_sequencer(topic, ordering_key)
+            # If the message opens a new batch, the sequencer schedules its commit.
             future = sequencer.publish(message, retry=retry, timeout=timeout)
-            future.add_done_callback(on_publish_done)
-
-            # Create a timer thread if necessary to enforce the batching
-            # timeout.
-            self._ensure_commit_timer_runs_no_lock()
+            # Batches release messages with lightweight futures on their own.
+            if not isinstance(future, futures.MessageFuture):
+                future.add_done_callback(on_publish_done)
 
             return future
 
+    def publish_many(
+        self,
+        topic: str,
+        messages: Iterable[BulkMessageType],
+        retry: "OptionalRetry" = gapic_v1.method.DEFAULT,
+        timeout: "types.OptionalTimeout" = gapic_v1.method.DEFAULT,
+    ) -> List["pubsub_v1.publisher.futures.Future"]:
+        """Publish several messages to the same topic.
+
+        This is equivalent to calling :meth:`publish` for each message, but the
+        per-call overhead is paid only once for the whole group: the messages are
+        added to flow control in bulk (if they all fit), and the sequencer lock is
+        acquired only once for each run of messages with the same ordering key. If
+        the messages do not fit into the flow control limits all at once, they are
+        added to flow control and published one by one, just like :meth:`publish`
+        would.
+
+        Example:
+            >>> from google.cloud import pubsub_v1
+            >>> client = pubsub_v1.PublisherClient()
+            >>> topic = client.topic_path('[PROJECT]', '[TOPIC]')
+            >>> futures = client.publish_many(
+            ...     topic,
+            ...     [(b'first', {'username': 'guido'}, ''), (b'second', None, '')],
+            ... )
+
+        Args:
+            topic: The topic to publish messages to.
+            messages:
+                The ``(data, attributes, ordering_key)`` tuples to publish. The
+                ``data`` must be a bytestring, ``attributes`` may be ``None``.
+            retry:
+                Designation of what errors, if any, should be retried. See
+                :meth:`publish` for details.
+            timeout:
+                The timeout for the RPC requests. See :meth:`publish` for details.
+
+        Returns:
+            A list of :class:`~google.cloud.pubsub_v1.publisher.futures.Future`
+            instances, one per message and in the same order as ``messages``.
+
+        Raises:
+            RuntimeError:
+                If called after publisher has been stopped by a `stop()` method
+                call.
+
+            pubsub_v1.publisher.exceptions.MessageTooLargeError: If publishing
+                any of the messages would exceed the max size limit on the backend.
+                None of the messages is published in that case.
+
+            ValueError:
+                If message compression is enabled and the attributes of any of the
+                messages contain the attribute reserved for it.
+        """
+        # Validate everything before accepting any message for publishing.
+        base_request_size = gapic_types.PublishRequest(topic=topic)._pb.ByteSize()
+        compression = self.publisher_options.compression
+        pending = []
+        for data, attrs, ordering_key in messages:
+            if not isinstance(data, bytes):
+                raise TypeError(
+                    "Data being published to Pub/Sub must be sent as a bytestring."
+                )
+
+            if not self._enable_message_ordering and ordering_key != "":
+                raise ValueError(
+                    "Cannot publish a message with an ordering key when message "
+                    "ordering is not enabled."
+                )
+
+            attributes = _coerce_attributes(attrs) if attrs else None
+            if compression is not None:
+                data, attributes = _compression.compress_data(
+                    data, attributes, compression
+                )
+
+            vanilla_pb = _raw_proto_pubbsub_message(
+                data=data, ordering_key=ordering_key, attributes=attributes
+            )
+            message = gapic_types.PubsubMessage.wrap(vanilla_pb)
+
+            if base_request_size + thread._framed_message_size(message) > (
+                thread._SERVER_PUBLISH_MAX_BYTES
+            ):
+                raise exceptions.MessageTooLargeError(
+                    "The message being published would produce too large a publish "
+                    "request that would exceed the maximum allowed size on the "
+                    "backend ({} bytes).".format(thread._SERVER_PUBLISH_MAX_BYTES)
+                )
+            pending.append(message)
+
+        if self._is_stopped:
+            raise RuntimeError("Cannot publish on a stopped publisher.")
+
+        if retry is gapic_v1.method.DEFAULT:  # if custom retry not passed in
+            retry = self.publisher_options.retry
+
+        if timeout is gapic_v1.method.DEFAULT:  # if custom timeout not passed in
+            timeout = self.publisher_options.timeout
+
+        retry = self._resolve_ordering_retry(retry)
+
+        if self._flow_controller.try_add_many(pending):
+            return self._publish_flow_controlled(topic, pending, retry, timeout)
+
+        # The messages do not fit into flow control all at once. Add and publish
+        # them one by one, so that the configured limit exceeded behavior applies
+        # to each of them individually, and a blocked message can be admitted
+        # once the messages published before it complete.
+        result = []
+        for message in pending:
+            try:
+                self._flow_controller.add(message)
+            except exceptions.FlowControlLimitError as exc:
+                future = futures.Future()
+                future.set_exception(exc)
+                result.append(future)
+                continue
+
+            result.extend(
+                self._publish_flow_controlled(topic, [message], retry, timeout)
+            )
+
+        return result
+
+    def _publish_flow_controlled(
+        self,
+        topic: str,
+        messages: Sequence[gapic_types.PubsubMessage],
+        retry: "OptionalRetry",
+        timeout: "types.OptionalTimeout",
+    ) -> List["pubsub_v1.publisher.futures.Future"]:
+        """Publish messages that have already been added to flow control.
+
+        The messages are released from flow control once published. If the
+        client has been stopped, the messages not published yet are released
+        right away.
+
+        Raises:
+            RuntimeError:
+                If called after publisher has been stopped by a `stop()` method
+                call.
+        """
+        release = self._flow_controller.release
+        result: List["pubsub_v1.publisher.futures.Future"] = []
+
+        # Consecutive messages usually share the ordering key, keep holding the
+        # sequencer shard lock and avoid repeated sequencer lookups for them.
+        sequencer_lock = None
+        sequencer = None
+        sequencer_key = None
+        try:
+            for i, message in enumerate(messages):
+                ordering_key = message._pb.ordering_key
+                if sequencer is None or ordering_key != sequencer_key:
+                    if sequencer_lock is not None:
+                        sequencer_lock.release()
+                    sequencer_lock = self._sequencer_locks[
+                        self._shard_index((topic, ordering_key))
+                    ]
+                    sequencer_lock.acquire()
+
+                    if self._is_stopped:
+                        # Give back flow control capacity of messages not published.
+                        for unpublished in messages[i:]:
+                            release(unpublished)
+                        raise RuntimeError("Cannot publish on a stopped publisher.")
+
+                    sequencer = self._get_or_create_sequencer(topic, ordering_key)
+                    sequencer_key = ordering_key
+
+                future = sequencer.publish(message, retry=retry, timeout=timeout)
+                if not isinstance(future, futures.MessageFuture):
+                    future.add_done_callback(
+                        lambda _, message=message: release(message)
+                    )
+                result.append(future)
+        finally:
+            if sequencer_lock is not None:
+                sequencer_lock.release()
+
+        return result
+
+    def _release_flow_control(
+        self, messages: Sequence[gapic_types.PubsubMessage]
+    ) -> None:
+        """Release the messages of a resolved batch from flow control.
+
+        Only called by batches with lightweight futures, the futures of other
+        batches release their messages one by one.
+        """
+        self._flow_controller.release_many(messages)
+
+    def _resolve_ordering_retry(self, retry: "OptionalRetry") -> "OptionalRetry":
+        """Return the retry to use, taking message ordering into account."""
+        # Set retry timeout to "infinite" when message ordering is enabled.
+        # Note that this then also impacts messages added with an empty
+        # ordering key.
+        if self._enable_message_ordering:
+            if retry is gapic_v1.method.DEFAULT:
+                # use the default retry for the publish GRPC method as a base
+                transport = self._transport
+                base_retry = transport._wrapped_methods[transport.publish]._retry
+                retry = base_retry.with_deadline(2.0**32)
+            else:
+                retry = retry.with_deadline(2.0**32)  # type: ignore[union-attr]
+        return retry
+
     def ensure_cleanup_and_commit_timer_runs(self) -> None:
-        """Ensure a cleanup/commit timer thread is running.
+        """Ensure that the sequencers are cleaned up and committed after a timeout.
 
-        If a cleanup/commit timer thread is already running, this does nothing.
+        If a cleanup is already scheduled, this does nothing.
         """
         with self._batch_lock:
             self._ensure_commit_timer_runs_no_lock()
 
     def _ensure_commit_timer_runs_no_lock(self) -> None:
-        """Ensure a commit timer thread is running, without taking
-        _batch_lock.
+        """Ensure that the sequencers are cleaned up and committed after a timeout,
+        without taking _batch_lock.
 
         _batch_lock must be held before calling this method.
         """
-        if not self._commit_thread and self.batch_settings.max_latency < float("inf"):
+        if not self._cleanup_scheduled and self.batch_settings.max_latency < float(
+            "inf"
+        ):
+            self._cleanup_scheduled = True
+            self._add_commit_deadline(None, None)
+
+    def _schedule_batch_commit(
+        self, topic: str, ordering_key: str, batch: "_batch.thread.Batch"
+    ) -> None:
+        """Schedule committing a newly opened batch once it reaches max latency.
+
+        This is called by the sequencers when they create a new batch. If the
+        batch is still accepting messages by the deadline, its sequencer is
+        committed.
+
+        Args:
+            topic: The topic of the sequencer.
+            ordering_key: The ordering key of the sequencer.
+            batch: The new batch.
+        """
+        if self.batch_settings.max_latency < float("inf"):
+            with self._batch_lock:
+                self._add_commit_deadline((topic, ordering_key), batch)
+
+    def _add_commit_deadline(
+        self,
+        sequencer_key: Optional[SequencerKey],
+        batch: Optional["_batch.thread.Batch"],
+    ) -> None:
+        """Add an entry to the commit schedule, due after the batching timeout.
+
+        _batch_lock must be held before calling this method.
+        """
+        deadline = time.monotonic() + self.batch_settings.max_latency
+        entry = (deadline, next(self._commit_deadline_counter), sequencer_key, batch)
+        heapq.heappush(self._commit_deadlines, entry)
+
+        if self._commit_thread is None:
             self._start_commit_thread()
+        elif len(self._commit_deadlines) == 1:
+            # All deadlines are the same time span away, thus the new one can only
+            # be the earliest if the commit thread had nothing to wait for.
+            self._commit_deadlines_changed.notify()
 
     def _start_commit_thread(self) -> None:
-        """Start a new thread to actually wait and commit the sequencers."""
+        """Start the thread committing batches as their deadlines pass."""
         # NOTE: If the thread is *not* a daemon, a memory leak exists due to a CPython issue.
         # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-829910303
         # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-830092418
@@ -443,29 +804,84 @@ class Client(publisher_client.PublisherClient):
         self._commit_thread.start()
 
     def _wait_and_commit_sequencers(self) -> None:
-        """Wait up to the batching timeout, and commit all sequencers."""
-        # Sleep for however long we should be waiting.
-        time.sleep(self.batch_settings.max_latency)
-        _LOGGER.debug("Commit thread is waking up")
+        """Commit the batches as their deadlines pass, until the client is stopped."""
+        while True:
+            with self._batch_lock:
+                entry = self._wait_for_commit_deadline()
+
+            if entry is None:
+                break
+
+            # Committing needs the sequencer shard locks, which must never be
+            # acquired while holding the batch lock.
+            _, _, sequencer_key, batch = entry
+            if sequencer_key is None:
+                self._commit_sequencers()
+            else:
+                self._commit_batch(sequencer_key, batch)  # type: ignore[arg-type]
 
-        with self._batch_lock:
+        _LOGGER.debug("Exiting the commit thread.")
+
+    def _wait_for_commit_deadline(self) -> Optional[_CommitDeadline]:
+        """Wait until the earliest deadline passes, and remove it from the schedule.
+
+        _batch_lock must be held before calling this method.
+
+        Returns:
+            The commit schedule entry, or ``None`` if the client has been stopped.
+        """
+        while not self._is_stopped:
+            if not self._commit_deadlines:
+                self._commit_deadlines_changed.wait()
+                continue
+
+            timeout = self._commit_deadlines[0][0] - time.monotonic()
+            if timeout > 0:
+                self._commit_deadlines_changed.wait(timeout)
+                continue
+
+            _LOGGER.debug("Commit thread is waking up")
+            entry = heapq.heappop(self._commit_deadlines)
+            if entry[2] is None:
+                self._cleanup_scheduled = False
+            return entry
+
+        return None
+
+    def _commit_batch(
+        self, sequencer_key: SequencerKey, batch: "_batch.thread.Batch"
+    ) -> None:
+        """Commit the sequencer of a batch that reached its deadline.
+
+        Nothing is done if the batch does not accept messages anymore, i.e. it was
+        full and has already been committed.
+        """
+        index = self._shard_index(sequencer_key)
+        with self._sequencer_locks[index]:
             if self._is_stopped:
                 return
-            self._commit_sequencers()
-            self._commit_thread = None
+
+            sequencer = self._sequencer_shards[index].get(sequencer_key)
+            if sequencer is not None and batch.status == (
+                base.BatchStatus.ACCEPTING_MESSAGES
+            ):
+                sequencer.commit()
 
     def _commit_sequencers(self) -> None:
         """Clean up finished sequencers and commit the rest."""
-        finished_sequencer_keys = [
-            key
-            for key, sequencer in self._sequencers.items()
-            if sequencer.is_finished()
-        ]
-        for sequencer_key in finished_sequencer_keys:
-            del self._sequencers[sequencer_key]
+        for lock, shard in zip(self._sequencer_locks, self._sequencer_shards):
+            with lock:
+                if self._is_stopped:
+                    return
+
+                finished_sequencer_keys = [
+                    key for key, sequencer in shard.items() if sequencer.is_finished()
+                ]
+                for sequencer_key in finished_sequencer_keys:
+                    del shard[sequencer_key]
 
-        for sequencer in self._sequencers.values():
-            sequencer.commit()
+                for sequencer in shard.values():
+                    sequencer.commit()
 
     def stop(self) -> None:
         """Immediately publish all outstanding messages.
@@ -486,14 +902,22 @@ class Client(publisher_client.PublisherClient):
                 If called after publisher has been stopped by a `stop()` method
                 call.
         """
-        with self._batch_lock:
+        with self._all_sequencer_locks():
             if self._is_stopped:
                 raise RuntimeError("Cannot stop a publisher already stopped.")
 
             self._is_stopped = True
 
-            for sequencer in self._sequencers.values():
-                sequencer.stop()
+            for shard in self._sequencer_shards:
+                for sequencer in shard.values():
+                    sequencer.stop()
+
+        with self._batch_lock:
+            self._commit_deadlines_changed.notify()
+
+        # Already submitted commits still run to completion, the workers then
+        # exit on their own.
+        self._commit_executor.shutdown()
 
     # Used only for testing.
     def _set_batch(
@@ -511,4 +935,6 @@ class Client(publisher_client.PublisherClient):
         self, topic: str, sequencer: SequencerType, ordering_key: str = ""
     ) -> None:
         sequencer_key = (topic, ordering_key)
-        self._sequencers[sequencer_key] = sequencer
+        self._sequencer_shards[self._shard_index(sequencer_key)][
+            sequencer_key
+        ] = sequencer
@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import collections
 from collections import OrderedDict
 import logging
 import threading
-from typing import Dict, Optional, Type
+from typing import Deque, Dict, Optional, Sequence, Tuple, Type
 import warnings
 
 from google.cloud.pubsub_v1 import types
@@ -68,6 +70,12 @@ class FlowController(object):
         self._reserved_bytes = 0
         self._reserved_slots = 0
 
+        # The number of threads blocked on adding a message if they are not
+        # admitted in FIFO order. Such threads do not reserve any capacity, and
+        # are woken up one at a time, which keeps releasing a message cheap no
+        # matter how many threads are blocked.
+        self._unordered_waiters = 0
+
         # The lock is used to protect all internal state (message and byte count,
         # waiting threads to add, etc.).
         self._operational_lock = threading.Lock()
@@ -139,6 +147,10 @@ class FlowController(object):
                 )
                 raise exceptions.FlowControlLimitError(error_msg)
 
+            if not self._settings.fair:
+                self._wait_for_capacity_unordered(message)
+                return
+
             current_thread = threading.current_thread()
 
             while self._would_overflow(message):
@@ -169,6 +181,43 @@ class FlowController(object):
             self._reserved_slots -= 1
             del self._waiting[current_thread]
 
+    def try_add_many(self, messages: Sequence[MessageType]) -> bool:
+        """Add several messages to flow control at once, if they all fit.
+
+        The messages are either all added under a single lock acquisition, or
+        none of them is, in which case the caller should fall back to adding
+        them one by one through :meth:`add`, which applies the configured
+        limit exceeded behavior.
+
+        Args:
+            messages:
+                The messages entering the flow control.
+
+        Returns:
+            ``True`` if all messages were added, ``False`` if nothing was added.
+        """
+        if self._settings.limit_exceeded_behavior == types.LimitExceededBehavior.IGNORE:
+            return True
+
+        total_bytes = sum(message._pb.ByteSize() for message in messages)
+
+        with self._operational_lock:
+            # Do not jump ahead of any threads already blocked in add().
+            if self._waiting:
+                return False
+
+            message_count = self._message_count + len(messages)
+            bytes_taken = self._total_bytes + total_bytes
+            if (
+                message_count + self._reserved_slots > self._settings.message_limit
+                or bytes_taken + self._reserved_bytes > self._settings.byte_limit
+            ):
+                return False
+
+            self._message_count = message_count
+            self._total_bytes = bytes_taken
+            return True
+
     def release(self, message: MessageType) -> None:
         """Release a mesage from flow control.
 
@@ -176,13 +225,24 @@ class FlowController(object):
             message:
                 The message entering the flow control.
         """
+        self.release_many((message,))
+
+    def release_many(self, messages: Sequence[MessageType]) -> None:
+        """Release several messages from flow control under a single lock.
+
+        Args:
+            messages:
+                The messages leaving the flow control.
+        """
         if self._settings.limit_exceeded_behavior == types.LimitExceededBehavior.IGNORE:
             return
 
+        total_bytes = sum(message._pb.ByteSize() for message in messages)
+
         with self._operational_lock:
-            # Releasing a message decreases the load.
-            self._message_count -= 1
-            self._total_bytes -= message._pb.ByteSize()
+            # Releasing messages decreases the load.
+            self._message_count -= len(messages)
+            self._total_bytes -= total_bytes
 
             if self._message_count < 0 or self._total_bytes < 0:
                 warnings.warn(
@@ -193,6 +253,12 @@ class FlowController(object):
                 self._message_count = max(0, self._message_count)
                 self._total_bytes = max(0, self._total_bytes)
 
+            if self._unordered_waiters:
+                # Wake up a single thread, which wakes up the next one if there
+                # is still capacity left after adding its message.
+                self._has_capacity.notify()
+                return
+
             self._distribute_available_capacity()
 
             # If at least one thread waiting to add() can be unblocked, wake them up.
@@ -200,6 +266,38 @@ class FlowController(object):
                 _LOGGER.debug("Notifying threads waiting to add messages to flow.")
                 self._has_capacity.notify_all()
 
+    def _wait_for_capacity_unordered(self, message: MessageType) -> None:
+        """Block until there is enough capacity for the message, then add it.
+
+        Blocked threads are admitted in no particular order.
+
+        The method assumes that the caller has obtained ``_operational_lock``.
+
+        Args:
+            message: The message entering the flow control.
+        """
+        self._unordered_waiters += 1
+        try:
+            while self._would_overflow(message):
+                _LOGGER.debug(
+                    "Blocking until there is enough free capacity in the flow - "
+                    "{}.".format(self._load_info())
+                )
+                self._has_capacity.wait()
+        finally:
+            self._unordered_waiters -= 1
+
+        self._message_count += 1
+        self._total_bytes += message._pb.ByteSize()
+
+        # Pass the wake-up on if another message might still fit.
+        if (
+            self._unordered_waiters
+            and self._message_count < self._settings.message_limit
+            and self._total_bytes < self._settings.byte_limit
+        ):
+            self._has_capacity.notify()
+
     def _distribute_available_capacity(self) -> None:
         """Distribute available capacity among the waiting threads in FIFO order.
 
@@ -311,3 +409,177 @@ class FlowController(object):
             f"bytes: {total_bytes} / {self._settings.byte_limit} "
             f"(reserved: {self._reserved_bytes})"
         )
+
+
+class AsyncFlowController(object):
+    """The asyncio counterpart of :class:`FlowController`.
+
+    Instead of blocking the calling thread, :meth:`add` suspends the calling
+    coroutine until there is enough free capacity. Waiting coroutines are admitted
+    in FIFO order.
+
+    The methods are not thread-safe, they must all be called from the thread
+    running the event loop.
+
+    Args:
+        settings: Desired flow control configuration.
+    """
+
+    def __init__(self, settings: types.PublishFlowControl):
+        self._settings = settings
+
+        # Load statistics. They represent the number of messages added, but not
+        # yet released (and their total size).
+        self._message_count = 0
+        self._total_bytes = 0
+
+        # A FIFO queue of coroutines waiting to add a message, and the sizes of
+        # their messages. Only relevant if the limit exceeded behavior is BLOCK.
+        self._waiting: Deque[Tuple[asyncio.Future, int]] = collections.deque()
+
+    async def add(self, message: MessageType) -> None:
+        """Add a message to flow control.
+
+        Adding a message updates the internal load statistics, and an action is
+        taken if these limits are exceeded (depending on the flow control settings).
+
+        Args:
+            message:
+                The message entering the flow control.
+
+        Raises:
+            :exception:`~pubsub_v1.publisher.exceptions.FlowControlLimitError`:
+                Raised when the desired action is
+                :attr:`~google.cloud.pubsub_v1.types.LimitExceededBehavior.ERROR` and
+                the message would exceed flow control limits, or when the desired action
+                is :attr:`~google.cloud.pubsub_v1.types.LimitExceededBehavior.BLOCK` and
+                the message would block forever against the flow control limits.
+        """
+        behavior = self._settings.limit_exceeded_behavior
+        if behavior == types.LimitExceededBehavior.IGNORE:
+            return
+
+        message_size = message._pb.ByteSize()
+
+        # Do not jump ahead of any coroutines already waiting for capacity.
+        if not self._waiting and self._fits(message_size):
+            self._message_count += 1
+            self._total_bytes += message_size
+            return
+
+        if behavior == types.LimitExceededBehavior.ERROR:
+            load_info = self._load_info(
+                message_count=self._message_count + 1,
+                total_bytes=self._total_bytes + message_size,
+            )
+            error_msg = "Flow control limits would be exceeded - {}.".format(load_info)
+            raise exceptions.FlowControlLimitError(error_msg)
+
+        assert behavior == types.LimitExceededBehavior.BLOCK
+
+        # Sanity check - if a message exceeds total flow control limits all
+        # by itself, it would block forever, thus raise error.
+        if message_size > self._settings.byte_limit or self._settings.message_limit < 1:
+            load_info = self._load_info(message_count=1, total_bytes=message_size)
+            error_msg = (
+                "Total flow control limits too low for the message, "
+                "would block forever - {}.".format(load_info)
+            )
+            raise exceptions.FlowControlLimitError(error_msg)
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, message_size)
+        self._waiting.append(entry)
+
+        _LOGGER.debug(
+            "Waiting until there is enough free capacity in the flow - "
+            "{}.".format(self._load_info())
+        )
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+            else:
+                # The capacity was already handed over, give it back.
+                self._message_count -= 1
+                self._total_bytes -= message_size
+            self._admit_waiting()
+            raise
+
+    def release(self, message: MessageType) -> None:
+        """Release a mesage from flow control.
+
+        Args:
+            message:
+                The message entering the flow control.
+        """
+        if self._settings.limit_exceeded_behavior == types.LimitExceededBehavior.IGNORE:
+            return
+
+        # Releasing a message decreases the load.
+        self._message_count -= 1
+        self._total_bytes -= message._pb.ByteSize()
+
+        if self._message_count < 0 or self._total_bytes < 0:
+            warnings.warn(
+                "Releasing a message that was never added or already released.",
+                category=RuntimeWarning,
+                stacklevel=2,
+            )
+            self._message_count = max(0, self._message_count)
+            self._total_bytes = max(0, self._total_bytes)
+
+        self._admit_waiting()
+
+    def _admit_waiting(self) -> None:
+        """Hand the available capacity over to the waiting coroutines in FIFO order."""
+        while self._waiting:
+            waiter, message_size = self._waiting[0]
+            if waiter.cancelled():
+                # Its coroutine has not been resumed yet to clean up after itself.
+                self._waiting.popleft()
+                continue
+
+            if not self._fits(message_size):
+                break
+
+            self._waiting.popleft()
+            self._message_count += 1
+            self._total_bytes += message_size
+            waiter.set_result(None)
+
+    def _fits(self, message_size: int) -> bool:
+        """Determine if a message of the given size can be accepted."""
+        return (
+            self._message_count + 1 <= self._settings.message_limit
+            and self._total_bytes + message_size <= self._settings.byte_limit
+        )
+
+    def _load_info(
+        self, message_count: Optional[int] = None, total_bytes: Optional[int] = None
+    ) -> str:
+        """Return the current flow control load information.
+
+        The caller can optionally adjust some of the values to fit its reporting
+        needs.
+
+        Args:
+            message_count:
+                The value to override the current message count with.
+            total_bytes:
+                The value to override the current total bytes with.
+        """
+        if message_count is None:
+            message_count = self._message_count
+
+        if total_bytes is None:
+            total_bytes = self._total_bytes
+
+        return (
+            f"messages: {message_count} / {self._settings.message_limit} "
+            f"(waiting: {len(self._waiting)}), "
+            f"bytes: {total_bytes} / {self._settings.byte_limit}"
+        )
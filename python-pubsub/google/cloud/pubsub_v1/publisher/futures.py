@@ -14,8 +14,11 @@
 
 from __future__ import absolute_import
 
+import concurrent.futures
+import logging
+import threading
 import typing
-from typing import Any, Callable, Union
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
 
 from google.cloud.pubsub_v1 import futures
 
@@ -23,6 +26,9 @@ if typing.TYPE_CHECKING:  # pragma: NO COVER
     from google.cloud import pubsub_v1
 
 
+_LOGGER = logging.getLogger(__name__)
+
+
 class Future(futures.Future):
     """This future object is returned from asychronous Pub/Sub publishing
     calls.
@@ -81,3 +87,189 @@ class Future(futures.Future):
                 callables are called in the order that they were added.
         """
         return super().add_done_callback(callback)  # type: ignore
+
+
+class _BatchFuture(object):
+    """The outcome of publishing a whole batch of messages.
+
+    A single condition and a single array of message IDs are shared by all the
+    messages in the batch, which are represented by :class:`MessageFuture`
+    instances that only hold their index into that array. The futures of all the
+    messages are resolved at once, and their callbacks are run in a single pass.
+    """
+
+    __slots__ = ("_condition", "_message_ids", "_exception", "_callbacks")
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._message_ids: Optional[Sequence[str]] = None
+        self._exception: Optional[BaseException] = None
+        self._callbacks: List[Tuple["MessageFuture", Callable[..., Any]]] = []
+
+    def done(self) -> bool:
+        """Return ``True`` if the batch has been published or has failed."""
+        return self._message_ids is not None or self._exception is not None
+
+    def set_result(self, message_ids: Sequence[str]) -> None:
+        """Resolve the futures of all messages in the batch.
+
+        Args:
+            message_ids: The IDs of the published messages, in the batch order.
+        """
+        with self._condition:
+            assert not self.done(), "The batch future has already been resolved."
+            self._message_ids = message_ids
+            callbacks = self._resolve()
+        self._run_callbacks(callbacks)
+
+    def set_exception(self, exception: BaseException) -> None:
+        """Fail the futures of all messages in the batch.
+
+        Args:
+            exception: The error that caused publishing to fail.
+        """
+        with self._condition:
+            assert not self.done(), "The batch future has already been resolved."
+            self._exception = exception
+            callbacks = self._resolve()
+        self._run_callbacks(callbacks)
+
+    def _resolve(self) -> List[Tuple["MessageFuture", Callable[..., Any]]]:
+        """Wake up all waiters, and take the callbacks added so far.
+
+        The method assumes that the caller has obtained ``_condition``.
+        """
+        self._condition.notify_all()
+        callbacks, self._callbacks = self._callbacks, []
+        return callbacks
+
+    @staticmethod
+    def _run_callbacks(
+        callbacks: List[Tuple["MessageFuture", Callable[..., Any]]]
+    ) -> None:
+        for future, callback in callbacks:
+            _run_callback(future, callback)
+
+    def wait(self, timeout: Optional[float]) -> None:
+        """Wait until the batch has been published or has failed.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the timeout expires first.
+        """
+        if self.done():
+            return
+        with self._condition:
+            if not self._condition.wait_for(self.done, timeout=timeout):
+                raise concurrent.futures.TimeoutError()
+
+    def add_done_callback(
+        self, future: "MessageFuture", callback: Callable[..., Any]
+    ) -> None:
+        """Run the callback with the given message future once the batch is done."""
+        with self._condition:
+            if not self.done():
+                self._callbacks.append((future, callback))
+                return
+        _run_callback(future, callback)
+
+
+def _run_callback(future: "MessageFuture", callback: Callable[..., Any]) -> None:
+    try:
+        callback(future)
+    except Exception:
+        _LOGGER.exception("Exception calling callback for %r.", future)
+
+
+class MessageFuture(object):
+    """A lightweight future of a single message published in a batch.
+
+    This future is returned from publishing calls instead of :class:`Future`
+    if lightweight futures are enabled in the publisher options. It provides the
+    same methods, but it is *not* an instance of
+    :class:`concurrent.futures.Future`, thus it cannot be passed to
+    :func:`concurrent.futures.wait` or :func:`concurrent.futures.as_completed`.
+
+    Calling :meth:`result` will resolve the future by returning the message
+    ID, unless an error occurs.
+    """
+
+    __slots__ = ("_batch_future", "_index")
+
+    def __init__(self, batch_future: _BatchFuture, index: int):
+        self._batch_future = batch_future
+        self._index = index
+
+    def cancel(self) -> bool:
+        """Actions in Pub/Sub generally may not be canceled.
+
+        This method always returns ``False``.
+        """
+        return False
+
+    def cancelled(self) -> bool:
+        """Actions in Pub/Sub generally may not be canceled.
+
+        This method always returns ``False``.
+        """
+        return False
+
+    def running(self) -> bool:
+        """Return ``True`` if the message has not been published yet."""
+        return not self._batch_future.done()
+
+    def done(self) -> bool:
+        """Return ``True`` if the message has been published or has failed."""
+        return self._batch_future.done()
+
+    def result(self, timeout: Union[int, float] = None) -> str:
+        """Return the message ID or raise an exception.
+
+        This blocks until the message has been published successfully and
+        returns the message ID unless an exception is raised.
+
+        Args:
+            timeout: The number of seconds before this call
+                times out and raises TimeoutError.
+
+        Returns:
+            The message ID.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the request times out.
+            Exception: For undefined exceptions in the underlying
+                call execution.
+        """
+        batch_future = self._batch_future
+        batch_future.wait(timeout)
+        if batch_future._exception is not None:
+            raise batch_future._exception
+        return batch_future._message_ids[self._index]  # type: ignore[index]
+
+    def exception(self, timeout: Union[int, float] = None) -> Optional[BaseException]:
+        """Return the exception raised by publishing the message, if any.
+
+        Args:
+            timeout: The number of seconds before this call
+                times out and raises TimeoutError.
+
+        Returns:
+            The exception, or ``None`` if the message was published successfully.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the request times out.
+        """
+        self._batch_future.wait(timeout)
+        return self._batch_future._exception
+
+    def add_done_callback(
+        self, callback: Callable[["pubsub_v1.publisher.futures.MessageFuture"], Any]
+    ) -> None:
+        """Attach a callable that will be called when the future finishes.
+
+        Args:
+            callback:
+                A callable that will be called with this future as its only
+                argument when the future completes. If the future has already
+                completed then the callable will be called immediately.
+        """
+        self._batch_future.add_done_callback(self, callback)
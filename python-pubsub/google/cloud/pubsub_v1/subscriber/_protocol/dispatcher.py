@@ -15,14 +15,16 @@
 from __future__ import absolute_import
 from __future__ import division
 
+import concurrent.futures
 import functools
+import heapq
 import itertools
 import logging
 import math
 import time
 import threading
 import typing
-from typing import List, Optional, Sequence, Union
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import warnings
 from google.api_core.retry import exponential_sleep_generator
 
@@ -50,6 +52,8 @@ RequestItem = Union[
 
 _LOGGER = logging.getLogger(__name__)
 _CALLBACK_WORKER_NAME = "Thread-CallbackRequestDispatcher"
+_ACK_SENDER_NAME_PREFIX = "Thread-AckSender"
+_RETRY_THREAD_NAME = "Thread-RetryAcksAndModAcks"
 
 
 _MAX_BATCH_SIZE = 100
@@ -71,13 +75,45 @@ _MAX_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS = 10 * 60
 """The maximum amount of time in seconds to retry failed acks and modacks when
 exactly-once delivery is enabled."""
 
+_RETRY_MERGE_WINDOW_SECS = 0.1
+"""Retries of failed acks and modacks that are due within this many seconds of
+each other are sent together."""
+
 
 class Dispatcher(object):
-    def __init__(self, manager: "StreamingPullManager", queue: "queue.Queue"):
+    """Dispatches the requests queued up by callbacks, e.g. acks and nacks.
+
+    Args:
+        manager: The streaming pull manager.
+        queue: The queue of the requests.
+        max_ack_rpc_concurrency:
+            The maximum number of ack and modack RPCs in flight at once. If 1
+            (default), the RPCs are sent one at a time by the thread dispatching
+            the requests, otherwise they are sent by a pool of sender threads,
+            and the dispatching thread does not wait for them.
+    """
+
+    def __init__(
+        self,
+        manager: "StreamingPullManager",
+        queue: "queue.Queue",
+        max_ack_rpc_concurrency: int = 1,
+    ):
+        if max_ack_rpc_concurrency < 1:
+            raise ValueError("max_ack_rpc_concurrency must be at least 1.")
+
         self._manager = manager
         self._queue = queue
         self._thread: Optional[threading.Thread] = None
         self._operational_lock = threading.Lock()
+        self._max_ack_rpc_concurrency = max_ack_rpc_concurrency
+        self._sender: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._retry_scheduler = _RetryScheduler(self)
+
+    @property
+    def retry_queue_size(self) -> int:
+        """The number of acks and modacks waiting to be retried."""
+        return self._retry_scheduler.size
 
     def start(self) -> None:
         """Start a thread to dispatch requests queued up by callbacks.
@@ -88,6 +124,12 @@ class Dispatcher(object):
             if self._thread is not None:
                 raise ValueError("Dispatcher is already running.")
 
+            if self._max_ack_rpc_concurrency > 1:
+                self._sender = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_ack_rpc_concurrency,
+                    thread_name_prefix=_ACK_SENDER_NAME_PREFIX,
+                )
+
             worker = helper_threads.QueueCallbackWorker(
                 self._queue,
                 self.dispatch_callback,
@@ -108,8 +150,32 @@ class Dispatcher(object):
                 self._queue.put(helper_threads.STOP)
                 self._thread.join()
 
+            # Wait for the RPCs of the last dispatched requests to complete.
+            if self._sender is not None:
+                self._sender.shutdown(wait=True)
+                self._sender = None
+
             self._thread = None
 
+    def _send(self, send_chunk: functools.partial) -> None:
+        """Send a chunk of ack or modack requests.
+
+        The chunk is sent right away if the RPCs are sent one at a time,
+        otherwise it is handed over to the pool of sender threads.
+        """
+        sender = self._sender
+        if sender is None:
+            send_chunk()
+            return
+
+        try:
+            future = sender.submit(send_chunk)
+        except RuntimeError:
+            # The sender pool was shut down concurrently, send the chunk directly.
+            send_chunk()
+        else:
+            future.add_done_callback(_log_send_error)
+
     def dispatch_callback(self, items: Sequence[RequestItem]) -> None:
         """Map the callback request to the appropriate gRPC request.
 
@@ -238,59 +304,24 @@ class Dispatcher(object):
                 req.ack_id: req
                 for req in itertools.islice(items_gen, _ACK_IDS_BATCH_SIZE)
             }
-            requests_completed, requests_to_retry = self._manager.send_unary_ack(
-                ack_ids=list(itertools.islice(ack_ids_gen, _ACK_IDS_BATCH_SIZE)),
-                ack_reqs_dict=ack_reqs_dict,
-            )
-
-            # Remove the completed messages from lease management.
-            self.drop(requests_completed)
-
-            # Retry on a separate thread so the dispatcher thread isn't blocked
-            # by sleeps.
-            if requests_to_retry:
-                self._start_retry_thread(
-                    "Thread-RetryAcks",
-                    functools.partial(self._retry_acks, requests_to_retry),
-                )
+            ack_ids = list(itertools.islice(ack_ids_gen, _ACK_IDS_BATCH_SIZE))
+            self._send(functools.partial(self._send_acks, ack_ids, ack_reqs_dict))
 
-    def _start_retry_thread(self, thread_name, thread_target):
-        # note: if the thread is *not* a daemon, a memory leak exists due to a cpython issue.
-        # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-829910303
-        # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-830092418
-        retry_thread = threading.Thread(
-            name=thread_name,
-            target=thread_target,
-            daemon=True,
-        )
-        # The thread finishes when the requests succeed or eventually fail with
-        # a back-end timeout error or other permanent failure.
-        retry_thread.start()
-
-    def _retry_acks(self, requests_to_retry):
-        retry_delay_gen = exponential_sleep_generator(
-            initial=_MIN_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS,
-            maximum=_MAX_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS,
+    def _send_acks(
+        self, ack_ids: List[str], ack_reqs_dict: Dict[str, requests.AckRequest]
+    ) -> None:
+        requests_completed, requests_to_retry = self._manager.send_unary_ack(
+            ack_ids=ack_ids,
+            ack_reqs_dict=ack_reqs_dict,
         )
-        while requests_to_retry:
-            time_to_wait = next(retry_delay_gen)
-            _LOGGER.debug(
-                "Retrying {len(requests_to_retry)} ack(s) after delay of "
-                + str(time_to_wait)
-                + " seconds"
-            )
-            time.sleep(time_to_wait)
 
-            ack_reqs_dict = {req.ack_id: req for req in requests_to_retry}
-            requests_completed, requests_to_retry = self._manager.send_unary_ack(
-                ack_ids=[req.ack_id for req in requests_to_retry],
-                ack_reqs_dict=ack_reqs_dict,
-            )
-            assert (
-                len(requests_to_retry) <= _ACK_IDS_BATCH_SIZE
-            ), "Too many requests to be retried."
-            # Remove the completed messages from lease management.
-            self.drop(requests_completed)
+        # Remove the completed messages from lease management.
+        self.drop(requests_completed)
+
+        # Retry in the background so the dispatcher thread isn't blocked
+        # by sleeps.
+        if requests_to_retry:
+            self._retry_scheduler.add(requests_to_retry)
 
     def drop(
         self,
@@ -341,60 +372,45 @@ class Dispatcher(object):
                 req.ack_id: req
                 for req in itertools.islice(items_gen, _ACK_IDS_BATCH_SIZE)
             }
-            requests_to_retry: List[requests.ModAckRequest]
+            ack_ids = list(itertools.islice(ack_ids_gen, _ACK_IDS_BATCH_SIZE))
             if default_deadline is None:
-                # no further work needs to be done for `requests_to_retry`
-                _, requests_to_retry = self._manager.send_unary_modack(
-                    modify_deadline_ack_ids=list(
-                        itertools.islice(ack_ids_gen, _ACK_IDS_BATCH_SIZE)
-                    ),
-                    modify_deadline_seconds=list(
-                        itertools.islice(deadline_seconds_gen, _ACK_IDS_BATCH_SIZE)
-                    ),
-                    ack_reqs_dict=ack_reqs_dict,
-                    default_deadline=None,
+                deadline_seconds: Optional[List[int]] = list(
+                    itertools.islice(deadline_seconds_gen, _ACK_IDS_BATCH_SIZE)
                 )
             else:
-                _, requests_to_retry = self._manager.send_unary_modack(
-                    modify_deadline_ack_ids=itertools.islice(
-                        ack_ids_gen, _ACK_IDS_BATCH_SIZE
-                    ),
-                    modify_deadline_seconds=None,
-                    ack_reqs_dict=ack_reqs_dict,
-                    default_deadline=default_deadline,
-                )
-            assert (
-                len(requests_to_retry) <= _ACK_IDS_BATCH_SIZE
-            ), "Too many requests to be retried."
-
-            # Retry on a separate thread so the dispatcher thread isn't blocked
-            # by sleeps.
-            if requests_to_retry:
-                self._start_retry_thread(
-                    "Thread-RetryModAcks",
-                    functools.partial(self._retry_modacks, requests_to_retry),
+                deadline_seconds = None
+            self._send(
+                functools.partial(
+                    self._send_modacks,
+                    ack_ids,
+                    deadline_seconds,
+                    ack_reqs_dict,
+                    default_deadline,
                 )
+            )
 
-    def _retry_modacks(self, requests_to_retry):
-        retry_delay_gen = exponential_sleep_generator(
-            initial=_MIN_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS,
-            maximum=_MAX_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS,
+    def _send_modacks(
+        self,
+        ack_ids: List[str],
+        deadline_seconds: Optional[List[int]],
+        ack_reqs_dict: Dict[str, requests.ModAckRequest],
+        default_deadline: Optional[float],
+    ) -> None:
+        requests_to_retry: List[requests.ModAckRequest]
+        _, requests_to_retry = self._manager.send_unary_modack(
+            modify_deadline_ack_ids=ack_ids,
+            modify_deadline_seconds=deadline_seconds,
+            ack_reqs_dict=ack_reqs_dict,
+            default_deadline=default_deadline,
         )
-        while requests_to_retry:
-            time_to_wait = next(retry_delay_gen)
-            _LOGGER.debug(
-                "Retrying {len(requests_to_retry)} modack(s) after delay of "
-                + str(time_to_wait)
-                + " seconds"
-            )
-            time.sleep(time_to_wait)
+        assert (
+            len(requests_to_retry) <= _ACK_IDS_BATCH_SIZE
+        ), "Too many requests to be retried."
 
-            ack_reqs_dict = {req.ack_id: req for req in requests_to_retry}
-            requests_completed, requests_to_retry = self._manager.send_unary_modack(
-                modify_deadline_ack_ids=[req.ack_id for req in requests_to_retry],
-                modify_deadline_seconds=[req.seconds for req in requests_to_retry],
-                ack_reqs_dict=ack_reqs_dict,
-            )
+        # Retry in the background so the dispatcher thread isn't blocked
+        # by sleeps.
+        if requests_to_retry:
+            self._retry_scheduler.add(requests_to_retry)
 
     def nack(self, items: Sequence[requests.NackRequest]) -> None:
         """Explicitly deny receipt of messages.
@@ -420,3 +436,186 @@ class Dispatcher(object):
                 for item in items
             ]
         )
+
+
+RetryRequest = Union[requests.AckRequest, requests.ModAckRequest]
+
+# A group of requests to retry, as (due time, sequence number, requests, delays).
+# The sequence number keeps the heap order stable for groups due at the same time.
+_RetryEntry = Tuple[float, int, List[RetryRequest], Iterator[float]]
+
+
+class _RetryScheduler(object):
+    """Retries the failed acks and modacks of a dispatcher from a single thread.
+
+    Each group of failed requests waits in a heap ordered by the time of its next
+    attempt, and backs off exponentially on its own. The groups that are due at
+    about the same time are retried together, in as few RPCs as possible. The
+    thread exits once there is nothing left to retry, and is started again when
+    needed.
+
+    Args:
+        dispatcher: The dispatcher whose requests to retry.
+    """
+
+    def __init__(self, dispatcher: Dispatcher):
+        self._dispatcher = dispatcher
+        self._condition = threading.Condition(threading.Lock())
+        self._heap: List[_RetryEntry] = []
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def size(self) -> int:
+        """The number of requests waiting for their next attempt."""
+        with self._condition:
+            return sum(len(entry[2]) for entry in self._heap)
+
+    def add(
+        self,
+        requests_to_retry: List[RetryRequest],
+        retry_delays: Optional[Iterator[float]] = None,
+    ) -> None:
+        """Schedule the next attempt of the given requests.
+
+        Args:
+            requests_to_retry:
+                The acks or modacks to retry.
+            retry_delays:
+                The delays of the requests' next attempts. If not given, the
+                requests failed for the first time, and start a new exponential
+                backoff.
+        """
+        if retry_delays is None:
+            retry_delays = exponential_sleep_generator(
+                initial=_MIN_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS,
+                maximum=_MAX_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS,
+            )
+        time_to_wait = next(retry_delays)
+        _LOGGER.debug(
+            "Retrying %s ack(s)/modack(s) after delay of %s seconds",
+            len(requests_to_retry),
+            time_to_wait,
+        )
+
+        entry = (
+            time.monotonic() + time_to_wait,
+            next(self._sequence),
+            requests_to_retry,
+            retry_delays,
+        )
+        with self._condition:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                # note: if the thread is *not* a daemon, a memory leak exists due to
+                # a cpython issue.
+                # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-829910303
+                # https://github.com/googleapis/python-pubsub/issues/395#issuecomment-830092418
+                self._thread = threading.Thread(
+                    name=_RETRY_THREAD_NAME, target=self._run, daemon=True
+                )
+                self._thread.start()
+            else:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            due_entries = self._wait_for_due_entries()
+            if not due_entries:
+                _LOGGER.debug("%s exiting.", _RETRY_THREAD_NAME)
+                return
+            self._retry(due_entries)
+
+    def _wait_for_due_entries(self) -> List[_RetryEntry]:
+        """Wait until some requests are due, and take all requests due by then.
+
+        Returns:
+            The entries of the due requests, or an empty list if there is nothing
+            left to retry, in which case the thread should exit.
+        """
+        with self._condition:
+            while self._heap:
+                time_to_wait = self._heap[0][0] - time.monotonic()
+                if time_to_wait > 0:
+                    self._condition.wait(timeout=time_to_wait)
+                    continue
+
+                cutoff = time.monotonic() + _RETRY_MERGE_WINDOW_SECS
+                due_entries = []
+                while self._heap and self._heap[0][0] <= cutoff:
+                    due_entries.append(heapq.heappop(self._heap))
+                return due_entries
+
+            self._thread = None
+            return []
+
+    def _retry(self, due_entries: List[_RetryEntry]) -> None:
+        """Send the due requests together, and reschedule those that failed again.
+
+        Each request that fails again is rescheduled with the backoff of the
+        group it came from.
+        """
+        retry_delays_by_ack_id: Dict[Tuple[bool, str], Iterator[float]] = {}
+        acks: List[requests.AckRequest] = []
+        modacks: List[requests.ModAckRequest] = []
+        for _, _, requests_to_retry, retry_delays in due_entries:
+            for req in requests_to_retry:
+                is_ack = isinstance(req, requests.AckRequest)
+                key = (is_ack, req.ack_id)
+                if key in retry_delays_by_ack_id:
+                    # The same ack ID is already being retried in this round, so
+                    # retry the duplicate in the next one.
+                    self.add([req], retry_delays)
+                    continue
+                retry_delays_by_ack_id[key] = retry_delays
+                if is_ack:
+                    acks.append(req)  # type: ignore[arg-type]
+                else:
+                    modacks.append(req)  # type: ignore[arg-type]
+
+        for start in range(0, len(acks), _ACK_IDS_BATCH_SIZE):
+            chunk = acks[start : start + _ACK_IDS_BATCH_SIZE]
+            self._retry_chunk(chunk, True, retry_delays_by_ack_id)
+        for start in range(0, len(modacks), _ACK_IDS_BATCH_SIZE):
+            chunk = modacks[start : start + _ACK_IDS_BATCH_SIZE]
+            self._retry_chunk(chunk, False, retry_delays_by_ack_id)
+
+    def _retry_chunk(
+        self,
+        chunk: Sequence[RetryRequest],
+        is_ack: bool,
+        retry_delays_by_ack_id: Dict[Tuple[bool, str], Iterator[float]],
+    ) -> None:
+        manager = self._dispatcher._manager
+        ack_reqs_dict = {req.ack_id: req for req in chunk}
+        try:
+            if is_ack:
+                requests_completed, requests_to_retry = manager.send_unary_ack(
+                    ack_ids=list(ack_reqs_dict),
+                    ack_reqs_dict=ack_reqs_dict,
+                )
+                # Remove the completed messages from lease management.
+                self._dispatcher.drop(requests_completed)
+            else:
+                _, requests_to_retry = manager.send_unary_modack(
+                    modify_deadline_ack_ids=list(ack_reqs_dict),
+                    modify_deadline_seconds=[req.seconds for req in chunk],
+                    ack_reqs_dict=ack_reqs_dict,
+                )
+        except Exception:
+            _LOGGER.exception("Error retrying %s ack(s)/modack(s).", len(chunk))
+            return
+
+        # Keep each group of requests on its own backoff schedule.
+        groups: Dict[int, Tuple[Iterator[float], List[RetryRequest]]] = {}
+        for req in requests_to_retry:
+            retry_delays = retry_delays_by_ack_id[(is_ack, req.ack_id)]
+            groups.setdefault(id(retry_delays), (retry_delays, []))[1].append(req)
+        for retry_delays, group in groups.values():
+            self.add(group, retry_delays)
+
+
+def _log_send_error(future: concurrent.futures.Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        _LOGGER.error("Error sending ack or modack requests.", exc_info=exc)
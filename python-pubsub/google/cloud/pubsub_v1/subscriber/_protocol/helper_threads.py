@@ -12,14 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import logging
 import queue
+import threading
 import time
-from typing import Any, Callable, List, Sequence
+from typing import Any, Callable, List, Optional, Sequence
 import uuid
 
 
-__all__ = ("QueueCallbackWorker", "STOP")
+__all__ = ("BatchQueue", "QueueCallbackWorker", "STOP")
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +33,99 @@ _LOGGER = logging.getLogger(__name__)
 STOP = uuid.uuid4()
 
 
+class BatchQueue(queue.Queue):
+    """A queue optimized for many producers and a single consumer draining
+    the items in batches.
+
+    Putting an item is an append to a :class:`collections.deque`, which does not
+    take any lock, and the consumer is only woken up through an
+    :class:`threading.Event` if it might be waiting for items. The consumer takes
+    all available items at once with :meth:`get_many`.
+
+    The queue is unbounded, and it does not support :meth:`task_done` and
+    :meth:`join`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._items: collections.deque = collections.deque()
+        self._not_empty = threading.Event()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return False
+
+    def put(self, item: Any, block: bool = True, timeout: float = None) -> None:
+        self._items.append(item)
+        # The event remains set while the consumer is busy with the previous
+        # items, so most puts do not need to set it again.
+        if not self._not_empty.is_set():
+            self._not_empty.set()
+
+    def put_nowait(self, item: Any) -> None:
+        self.put(item)
+
+    def get(self, block: bool = True, timeout: float = None) -> Any:
+        if not block:
+            timeout = 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+
+            if deadline is None:
+                self._wait(None)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+                self._wait(remaining)
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def get_many(self, max_items: int = None, max_latency: float = 0) -> List[Any]:
+        """Get multiple items from the queue.
+
+        Gets at least one (blocking) and at most ``max_items`` items. See
+        :func:`_get_many` for the meaning of the arguments.
+        """
+        start = time.monotonic()
+        # Always return at least one item.
+        items = [self.get()]
+        popleft = self._items.popleft
+
+        while max_items is None or len(items) < max_items:
+            try:
+                items.append(popleft())
+                continue
+            except IndexError:
+                pass
+
+            remaining = max_latency - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            self._wait(remaining)
+
+        return items
+
+    def _wait(self, timeout: Optional[float]) -> None:
+        """Wait until an item might have been put to the empty queue."""
+        # A put() either happens before the emptiness check below, or it sees
+        # the cleared event and sets it, so that the wakeup is never missed.
+        self._not_empty.clear()
+        if not self._items:
+            self._not_empty.wait(timeout)
+
+
 def _get_many(
     queue_: queue.Queue, max_items: int = None, max_latency: float = 0
 ) -> List[Any]:
@@ -51,6 +146,9 @@ def _get_many(
     Returns:
         A sequence of items retrieved from the queue.
     """
+    if isinstance(queue_, BatchQueue):
+        return queue_.get_many(max_items=max_items, max_latency=max_latency)
+
     start = time.time()
     # Always return at least one item.
     items = [queue_.get()]
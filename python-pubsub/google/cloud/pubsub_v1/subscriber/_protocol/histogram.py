@@ -12,12 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, Optional, Union
+import time
+from typing import List, Optional, Union
 
 
 MIN_ACK_DEADLINE = 10
 MAX_ACK_DEADLINE = 600
 
+_NUM_BUCKETS = MAX_ACK_DEADLINE - MIN_ACK_DEADLINE + 1
+
+# The largest power of two not greater than the number of buckets, the first step
+# of the binary search over the cumulative counts.
+_SEARCH_START = 1 << (_NUM_BUCKETS.bit_length() - 1)
+
+# In the time-decayed mode, new values are given exponentially growing weights
+# instead of decaying all the existing weights. Once a weight exceeds this
+# limit, all the weights are scaled down to avoid a floating point overflow.
+_MAX_WEIGHT = 2.0**64
+
 
 class Histogram(object):
     """Representation of a single histogram.
@@ -34,37 +46,46 @@ class Histogram(object):
     values outside the range of ``MIN_ACK_DEADLINE <= x <= MAX_ACK_DEADLINE`` are stored
     as ``MIN_ACK_DEADLINE`` or ``MAX_ACK_DEADLINE``, since these are the boundaries of
     leases in the actual API.
+
+    The counts are stored in a fixed-size array with a bucket for every second in
+    that range, organized as a binary indexed tree of cumulative counts. Adding a
+    value and looking up a percentile both take a logarithmic number of steps in
+    the (constant) number of buckets.
     """
 
-    def __init__(self, data: Optional[Dict[int, int]] = None):
+    def __init__(self, half_life: Optional[float] = None):
         """Instantiate the histogram.
 
         Args:
-            data:
-                The data strucure to be used to store the underlying data. The default
-                is an empty dictionary. This can be set to a dictionary-like object if
-                required (for example, if a special object is needed for concurrency
-                reasons).
+            half_life:
+                If given, the time in seconds after which the weight of a value
+                added to the histogram drops by half, relative to the values added
+                later. This lets the percentiles follow a workload that changes over
+                time. By default, all values are weighted equally forever.
+
+        Raises:
+            ValueError: If ``half_life`` is not positive.
         """
-        # The data is stored as a dictionary, with the keys being the
-        # value being added and the values being the number of times that
-        # value was added to the dictionary.
-        #
-        # This is depending on the Python interpreter's implicit ordering
-        # of dictionaries, which is a bitwise sort by the key's ``hash()``
-        # value. Because ``hash(int i) -> i`` and all of our keys are
-        # positive integers (negatives would be a problem because the sort
-        # is bitwise), we can rely on this.
-        if data is None:
-            data = {}
-        self._data = data
+        if half_life is not None and half_life <= 0:
+            raise ValueError("The half life must be positive.")
+
+        self._half_life = half_life
+        self._epoch = time.monotonic()
+
+        # The weight of each bucket, and the binary indexed tree in which the item
+        # at (1-based) position i holds the sum of the weights of the buckets
+        # (i - (i & -i), i].
+        self._weights: List[float] = [0] * _NUM_BUCKETS
+        self._tree: List[float] = [0] * (_NUM_BUCKETS + 1)
+        self._total_weight: float = 0
         self._len = 0
 
     def __len__(self) -> int:
-        """Return the total number of data points in this histogram.
+        """Return the total number of data points added to this histogram.
 
-        This is cached on a separate counter (rather than computing it using
-        ``sum([v for v in self._data.values()])``) to optimize lookup.
+        This is cached on a separate counter (rather than computing it from the
+        buckets) to optimize lookup. In the time-decayed mode this still counts
+        every data point added, regardless of its current weight.
 
         Returns:
             The total number of data points in this histogram.
@@ -73,7 +94,9 @@ class Histogram(object):
 
     def __contains__(self, needle: int) -> bool:
         """Return ``True`` if needle is present in the histogram, ``False`` otherwise."""
-        return needle in self._data
+        if not MIN_ACK_DEADLINE <= needle <= MAX_ACK_DEADLINE:
+            return False
+        return self._weights[int(needle) - MIN_ACK_DEADLINE] > 0
 
     def __repr__(self):
         return "<Histogram: {len} values between {min} and {max}>".format(
@@ -89,9 +112,12 @@ class Histogram(object):
         Returns:
             The maximum value in the histogram.
         """
-        if len(self._data) == 0:
+        if self._len == 0:
             return MAX_ACK_DEADLINE
-        return next(iter(reversed(sorted(self._data.keys()))))
+        for index in range(_NUM_BUCKETS - 1, -1, -1):
+            if self._weights[index] > 0:
+                break
+        return index + MIN_ACK_DEADLINE
 
     @property
     def min(self) -> int:
@@ -102,9 +128,12 @@ class Histogram(object):
         Returns:
             The minimum value in the histogram.
         """
-        if len(self._data) == 0:
+        if self._len == 0:
             return MIN_ACK_DEADLINE
-        return next(iter(sorted(self._data.keys())))
+        for index in range(_NUM_BUCKETS):
+            if self._weights[index] > 0:
+                break
+        return index + MIN_ACK_DEADLINE
 
     def add(self, value: Union[int, float]) -> None:
         """Add the value to this histogram.
@@ -123,11 +152,18 @@ class Histogram(object):
         elif value > MAX_ACK_DEADLINE:
             value = MAX_ACK_DEADLINE
 
-        # Add the value to the histogram's data dictionary.
-        self._data.setdefault(value, 0)
-        self._data[value] += 1
+        weight = self._new_weight()
+        index = value - MIN_ACK_DEADLINE
+        self._weights[index] += weight
+        self._total_weight += weight
         self._len += 1
 
+        tree = self._tree
+        position = index + 1
+        while position <= _NUM_BUCKETS:
+            tree[position] += weight
+            position += position & -position
+
     def percentile(self, percent: Union[int, float]) -> int:
         """Return the value that is the Nth precentile in the histogram.
 
@@ -139,21 +175,56 @@ class Histogram(object):
         Returns:
             The value corresponding to the requested percentile.
         """
-        # Sanity check: Any value over 100 should become 100.
+        # Sanity check: Any value over 100 is the maximum. This also avoids comparing
+        # the total weight against the sums in the tree, which could differ by a
+        # rounding error in the time-decayed mode.
         if percent >= 100:
-            percent = 100
-
-        # Determine the actual target number.
-        target = len(self) - len(self) * (percent / 100)
-
-        # Iterate over the values in reverse, dropping the target by the
-        # number of times each value has been seen. When the target passes
-        # 0, return the value we are currently viewing.
-        for k in reversed(sorted(self._data.keys())):
-            target -= self._data[k]
-            if target < 0:
-                return k
-
-        # The only way to get here is if there was no data.
-        # In this case, just return the shortest possible deadline.
-        return MIN_ACK_DEADLINE
+            return self.max if self._len else MIN_ACK_DEADLINE
+
+        # Find the first bucket at which the cumulative weight reaches the
+        # percentile, by descending the tree towards the last bucket before it.
+        # With no data, this is the shortest possible deadline.
+        tree = self._tree
+        target = self._total_weight * (percent / 100)
+        position = 0
+        step = _SEARCH_START
+        while step:
+            next_position = position + step
+            if next_position <= _NUM_BUCKETS and tree[next_position] < target:
+                position = next_position
+                target -= tree[next_position]
+            step >>= 1
+
+        return min(position, _NUM_BUCKETS - 1) + MIN_ACK_DEADLINE
+
+    def _new_weight(self) -> float:
+        """Return the weight of a value added now.
+
+        In the time-decayed mode, the weight doubles every half life, which is
+        equivalent to halving the weight of all the older values.
+        """
+        if self._half_life is None:
+            return 1
+
+        now = time.monotonic()
+        weight = 2.0 ** ((now - self._epoch) / self._half_life)
+        if weight > _MAX_WEIGHT:
+            self._rescale(weight, now)
+            weight = 1.0
+        return weight
+
+    def _rescale(self, factor: float, now: float) -> None:
+        """Divide all the weights by the factor, and start a new epoch."""
+        weights = [weight / factor for weight in self._weights]
+        tree = [0.0] * (_NUM_BUCKETS + 1)
+        for index, weight in enumerate(weights):
+            position = index + 1
+            tree[position] += weight
+            parent = position + (position & -position)
+            if parent <= _NUM_BUCKETS:
+                tree[parent] += tree[position]
+
+        self._weights = weights
+        self._tree = tree
+        self._total_weight = sum(weights)
+        self._epoch = now
@@ -14,13 +14,13 @@
 
 from __future__ import absolute_import
 
-import copy
+import heapq
 import logging
 import random
 import threading
 import time
 import typing
-from typing import Dict, Iterable, Optional, Union
+from typing import Dict, Iterable, List, Optional, Union
 
 from google.cloud.pubsub_v1.subscriber._protocol.dispatcher import _MAX_BATCH_LATENCY
 
@@ -32,6 +32,7 @@ except TypeError:
     # Deprecated since Python 3.9, thus only use as a fallback in older Python versions
     from typing import KeysView
 
+from google.cloud.pubsub_v1.subscriber._protocol import histogram
 from google.cloud.pubsub_v1.subscriber._protocol import requests
 
 if typing.TYPE_CHECKING:  # pragma: NO COVER
@@ -43,6 +44,12 @@ if typing.TYPE_CHECKING:  # pragma: NO COVER
 _LOGGER = logging.getLogger(__name__)
 _LEASE_WORKER_NAME = "Thread-LeaseMaintainer"
 
+_RENEWAL_SLOTS = 10
+"""The number of groups of leases renewed in turn, one group per cycle."""
+
+_EXPIRY_BUCKET_SECONDS = 10
+"""The width of the buckets grouping leases by the time they were sent."""
+
 
 class _LeasedMessage(typing.NamedTuple):
     sent_time: float
@@ -51,8 +58,24 @@ class _LeasedMessage(typing.NamedTuple):
     size: int
     ordering_key: Optional[str]
 
+    renewal_slot: int
+    """The index of the group of leases this lease is renewed with."""
+
 
 class Leaser(object):
+    """Maintains the leases of received messages.
+
+    The leases are split into a wheel of ``_RENEWAL_SLOTS`` groups, and every
+    cycle of the lease maintenance renews only the next group in turn, so that
+    the modacks are spread over time rather than sent all at once. New leases
+    join the group renewed most recently, thus they are first renewed a full
+    rotation after they were received (and modacked).
+
+    The leases with a started expiry timer are also kept in buckets by the time
+    they were sent, so that looking for the leases held for too long only needs
+    to look at the buckets old enough.
+    """
+
     def __init__(self, manager: "StreamingPullManager"):
         self._thread: Optional[threading.Thread] = None
         self._manager = manager
@@ -61,7 +84,8 @@ class Leaser(object):
         self._operational_lock = threading.Lock()
 
         # A lock ensuring that add/remove operations are atomic and cannot be
-        # intertwined. Protects the _leased_messages and _bytes attributes.
+        # intertwined. Protects the _leased_messages and _bytes attributes, as
+        # well as the renewal slots and the expiry buckets.
         self._add_remove_lock = threading.Lock()
 
         # Dict of ack_id -> _LeasedMessage
@@ -70,6 +94,21 @@ class Leaser(object):
         self._bytes = 0
         """The total number of bytes consumed by leased messages."""
 
+        # The ack IDs in each renewal slot (the dicts are used as ordered sets),
+        # the index of the slot to renew next, and the shortest ACK deadline that
+        # any lease in each slot might have been last extended by.
+        self._renewal_slots: List[Dict[str, None]] = [{} for _ in range(_RENEWAL_SLOTS)]
+        self._next_slot = 0
+        self._slot_deadlines: List[float] = [
+            histogram.MIN_ACK_DEADLINE
+        ] * _RENEWAL_SLOTS
+        self._last_deadline: float = histogram.MIN_ACK_DEADLINE
+
+        # Bucket number -> ack IDs sent within that bucket, and a min-heap of the
+        # bucket numbers (possibly including numbers of already removed buckets).
+        self._expiry_buckets: Dict[int, Dict[str, None]] = {}
+        self._expiry_heap: List[int] = []
+
         self._stop_event = threading.Event()
 
     @property
@@ -90,6 +129,14 @@ class Leaser(object):
     def add(self, items: Iterable[requests.LeaseRequest]) -> None:
         """Add messages to be managed by the leaser."""
         with self._add_remove_lock:
+            # The messages were just modacked with (about) the deadline last used
+            # for renewals, add them to the slot renewed most recently.
+            slot_index = (self._next_slot - 1) % _RENEWAL_SLOTS
+            slot = self._renewal_slots[slot_index]
+            self._slot_deadlines[slot_index] = min(
+                self._slot_deadlines[slot_index], self._last_deadline
+            )
+
             for item in items:
                 # Add the ack ID to the set of managed ack IDs, and increment
                 # the size counter.
@@ -98,7 +145,9 @@ class Leaser(object):
                         sent_time=float("inf"),
                         size=item.byte_size,
                         ordering_key=item.ordering_key,
+                        renewal_slot=slot_index,
                     )
+                    slot[item.ack_id] = None
                     self._bytes += item.byte_size
                 else:
                     _LOGGER.debug("Message %s is already lease managed", item.ack_id)
@@ -110,14 +159,22 @@ class Leaser(object):
             items: Sequence of ack-ids for which to start lease expiry timers.
         """
         with self._add_remove_lock:
+            now = time.time()
+            bucket_number = int(now // _EXPIRY_BUCKET_SECONDS)
+            bucket = self._expiry_buckets.get(bucket_number)
+
             for ack_id in ack_ids:
                 lease_info = self._leased_messages.get(ack_id)
                 # Lease info might not exist for this ack_id because it has already
                 # been removed by remove().
                 if lease_info:
-                    self._leased_messages[ack_id] = lease_info._replace(
-                        sent_time=time.time()
-                    )
+                    self._discard_from_expiry_bucket(ack_id, lease_info)
+                    self._leased_messages[ack_id] = lease_info._replace(sent_time=now)
+
+                    if bucket is None:
+                        bucket = self._expiry_buckets[bucket_number] = {}
+                        heapq.heappush(self._expiry_heap, bucket_number)
+                    bucket[ack_id] = None
 
     def remove(
         self,
@@ -130,8 +187,11 @@ class Leaser(object):
             # Remove the ack ID from lease management, and decrement the
             # byte counter.
             for item in items:
-                if self._leased_messages.pop(item.ack_id, None) is not None:
+                lease_info = self._leased_messages.pop(item.ack_id, None)
+                if lease_info is not None:
                     self._bytes -= item.byte_size
+                    self._renewal_slots[lease_info.renewal_slot].pop(item.ack_id, None)
+                    self._discard_from_expiry_bucket(item.ack_id, lease_info)
                 else:
                     _LOGGER.debug("Item %s was not managed.", item.ack_id)
 
@@ -139,12 +199,82 @@ class Leaser(object):
                 _LOGGER.debug("Bytes was unexpectedly negative: %d", self._bytes)
                 self._bytes = 0
 
+    def _discard_from_expiry_bucket(
+        self, ack_id: str, lease_info: _LeasedMessage
+    ) -> None:
+        """Remove the ack ID from its expiry bucket, if it is in one.
+
+        The method assumes that the caller has obtained ``_add_remove_lock``.
+        """
+        if lease_info.sent_time == float("inf"):
+            return
+
+        bucket_number = int(lease_info.sent_time // _EXPIRY_BUCKET_SECONDS)
+        bucket = self._expiry_buckets.get(bucket_number)
+        if bucket is None:
+            return
+
+        bucket.pop(ack_id, None)
+        if not bucket:
+            # The bucket number is removed from the heap lazily.
+            del self._expiry_buckets[bucket_number]
+
+    def _take_expired(self, cutoff: float) -> List[requests.DropRequest]:
+        """Return the drop requests for the leases sent before the cutoff time.
+
+        Only the buckets old enough to contain such leases are visited. The
+        expired leases are taken out of their buckets and renewal slots, but they
+        stay leased until they are dropped.
+
+        The method assumes that the caller has obtained ``_add_remove_lock``.
+        """
+        to_drop = []
+        cutoff_bucket_number = int(cutoff // _EXPIRY_BUCKET_SECONDS)
+
+        heap = self._expiry_heap
+        while heap and heap[0] <= cutoff_bucket_number:
+            bucket_number = heap[0]
+            bucket = self._expiry_buckets.get(bucket_number)
+            if bucket is None:
+                heapq.heappop(heap)
+                continue
+
+            if bucket_number < cutoff_bucket_number:
+                # The whole bucket was sent before the cutoff.
+                expired = list(bucket)
+            else:
+                expired = [
+                    ack_id
+                    for ack_id in bucket
+                    if self._leased_messages[ack_id].sent_time < cutoff
+                ]
+
+            for ack_id in expired:
+                # Also stop renewing the lease, even before it is dropped.
+                del bucket[ack_id]
+                item = self._leased_messages[ack_id]
+                self._renewal_slots[item.renewal_slot].pop(ack_id, None)
+                to_drop.append(
+                    requests.DropRequest(ack_id, item.size, item.ordering_key)
+                )
+
+            if bucket:
+                # Only the bucket of the cutoff time itself can be partially
+                # expired, and it is the last one to check.
+                break
+
+            del self._expiry_buckets[bucket_number]
+            heapq.heappop(heap)
+
+        return to_drop
+
     def maintain_leases(self) -> None:
         """Maintain all of the leases being managed.
 
-        This method modifies the ack deadline for all of the managed
-        ack IDs, then waits for most of that time (but with jitter), and
-        repeats.
+        Every cycle, this method drops the leases held for too long, and modifies
+        the ack deadline for the ack IDs in the next renewal slot. It then waits
+        for a fraction of the time in which the whole wheel of renewal slots must
+        be renewed (with jitter), and repeats.
         """
         while not self._stop_event.is_set():
             # Determine the appropriate duration for the lease. This is
@@ -155,38 +285,40 @@ class Leaser(object):
             deadline = self._manager._obtain_ack_deadline(maybe_update=True)
             _LOGGER.debug("The current deadline value is %d seconds.", deadline)
 
-            # Make a copy of the leased messages. This is needed because it's
-            # possible for another thread to modify the dictionary while
-            # we're iterating over it.
-            leased_messages = copy.copy(self._leased_messages)
-
             # Drop any leases that are beyond the max lease time. This ensures
             # that in the event of a badly behaving actor, we can drop messages
             # and allow the Pub/Sub server to resend them.
             cutoff = time.time() - self._manager.flow_control.max_lease_duration
-            to_drop = [
-                requests.DropRequest(ack_id, item.size, item.ordering_key)
-                for ack_id, item in leased_messages.items()
-                if item.sent_time < cutoff
-            ]
+            with self._add_remove_lock:
+                to_drop = self._take_expired(cutoff)
 
             if to_drop:
                 _LOGGER.warning(
                     "Dropping %s items because they were leased too long.", len(to_drop)
                 )
                 assert self._manager.dispatcher is not None
+                # This removes the dropped items from lease management by
+                # calling self.remove().
                 self._manager.dispatcher.drop(to_drop)
 
-            # Remove dropped items from our copy of the leased messages (they
-            # have already been removed from the real one by
-            # self._manager.drop(), which calls self.remove()).
-            for item in to_drop:
-                leased_messages.pop(item.ack_id)
+            # Take the ack IDs of the next renewal slot.
+            with self._add_remove_lock:
+                slot_index = self._next_slot
+                ack_ids = list(self._renewal_slots[slot_index])
+                leased_messages = {
+                    ack_id: self._leased_messages[ack_id] for ack_id in ack_ids
+                }
+                self._slot_deadlines[slot_index] = deadline
+                self._last_deadline = deadline
+                self._next_slot = (slot_index + 1) % _RENEWAL_SLOTS
+
+                # All slots must be renewed before the shortest deadline that any
+                # of them was extended by expires.
+                rotation_time = 0.9 * min(self._slot_deadlines)
 
             # Create a modack request.
             # We do not actually call `modify_ack_deadline` over and over
             # because it is more efficient to make a single request.
-            ack_ids = leased_messages.keys()
             expired_ack_ids = set()
             if ack_ids:
                 _LOGGER.debug("Renewing lease for %d ack IDs.", len(ack_ids))
@@ -220,15 +352,17 @@ class Leaser(object):
             # Now wait an appropriate period of time and do this again.
             #
             # We determine the appropriate period of time based on a random
-            # period between:
-            # minimum: MAX_BATCH_LATENCY (to prevent duplicate modacks being created in one batch)
-            # maximum: 90% of the deadline
-            # This maximum time attempts to prevent ack expiration before new lease modacks arrive at the server.
+            # period between half of and the full time available to each slot,
+            # so that every slot is renewed within 90% of the shortest deadline.
+            # This maximum time attempts to prevent ack expiration before new lease
+            # modacks arrive at the server.
             # This use of jitter (http://bit.ly/2s2ekL7) helps decrease contention in cases
             # where there are many clients.
             # If we spent any time iterating over expired acks, we should subtract this from the deadline.
-            snooze = random.uniform(
-                _MAX_BATCH_LATENCY, (deadline * 0.9 - (time.time() - start_time))
+            slot_time = rotation_time / _RENEWAL_SLOTS
+            snooze = max(
+                _MAX_BATCH_LATENCY,
+                random.uniform(slot_time / 2, slot_time) - (time.time() - start_time),
             )
             _LOGGER.debug("Snoozing lease management for %f seconds.", snooze)
             self._stop_event.wait(timeout=snooze)
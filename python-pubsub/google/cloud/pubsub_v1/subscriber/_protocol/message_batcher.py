@@ -0,0 +1,117 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+import typing
+from typing import Callable, List, Optional
+
+if typing.TYPE_CHECKING:  # pragma: NO COVER
+    from google.cloud import pubsub_v1
+
+
+_LOGGER = logging.getLogger(__name__)
+_FLUSH_TIMER_NAME = "Thread-MessageBatchFlush"
+
+
+class MessageBatcher(object):
+    """Groups the messages released to the user into batches.
+
+    A batch is sent as soon as it contains ``max_size`` messages, or when
+    ``max_latency`` seconds have passed since its first message was added,
+    whichever comes first.
+
+    Args:
+        send_batch:
+            The callable that sends a batch of messages to the user.
+        max_size:
+            The maximum number of messages in a batch.
+        max_latency:
+            The maximum number of seconds a message waits for its batch to fill.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List["pubsub_v1.subscriber.message.Message"]], None],
+        max_size: int,
+        max_latency: float,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        if max_latency < 0:
+            raise ValueError("max_latency must not be negative.")
+
+        self._send_batch = send_batch
+        self._max_size = max_size
+        self._max_latency = max_latency
+
+        # Guards the current batch and its flush timer, and also serializes
+        # sending the batches, so that a batch is never sent after stop().
+        self._lock = threading.Lock()
+        self._messages: List["pubsub_v1.subscriber.message.Message"] = []
+        self._timer: Optional[threading.Timer] = None
+        self._stopped = False
+
+    def add(self, message: "pubsub_v1.subscriber.message.Message") -> None:
+        """Add a message to the current batch, and send the batch if it is full.
+
+        Args:
+            message: The message released to the user.
+        """
+        with self._lock:
+            if self._stopped:
+                _LOGGER.debug("Batcher stopped, not sending message %s.", message)
+                return
+
+            self._messages.append(message)
+            if len(self._messages) >= self._max_size:
+                self._send()
+            elif self._timer is None:
+                timer = threading.Timer(self._max_latency, self._flush)
+                timer.name = _FLUSH_TIMER_NAME
+                timer.daemon = True
+                timer.start()
+                self._timer = timer
+
+    def _flush(self) -> None:
+        with self._lock:
+            if not self._stopped and self._messages:
+                self._send()
+
+    def _send(self) -> None:
+        """Send the current batch, and cancel its flush timer.
+
+        The method assumes that the caller has obtained ``_lock``.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        messages, self._messages = self._messages, []
+        self._send_batch(messages)
+
+    def stop(self) -> List["pubsub_v1.subscriber.message.Message"]:
+        """Stop batching the messages.
+
+        Returns:
+            The messages in the current batch, which was not sent.
+        """
+        with self._lock:
+            self._stopped = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            messages, self._messages = self._messages, []
+            return messages
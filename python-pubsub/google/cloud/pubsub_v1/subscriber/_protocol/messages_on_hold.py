@@ -15,7 +15,7 @@
 import collections
 import logging
 import typing
-from typing import Any, Callable, Iterable, Optional
+from typing import Any, Callable, Iterable, List, Optional, Sequence
 
 if typing.TYPE_CHECKING:  # pragma: NO COVER
     from google.cloud.pubsub_v1 import subscriber
@@ -31,17 +31,17 @@ class MessagesOnHold(object):
         self._size = 0
 
         # A FIFO queue for the messages that have been received from the server,
-        # but not yet sent to the user callback.
-        # Both ordered and unordered messages may be in this queue. Ordered
-        # message state tracked in _pending_ordered_messages once ordered
-        # messages are taken off this queue.
+        # and that can be sent to the user callback right away, i.e. the
+        # unordered messages, and the first message of each ordering key that
+        # does not have a message in flight yet.
         # The tail of the queue is to the right side of the deque; the head is
         # to the left side.
         self._messages_on_hold = collections.deque()
 
         # Dict of ordering_key -> queue of ordered messages that have not been
         # delivered to the user.
-        # All ordering keys in this collection have a message in flight. Once
+        # All ordering keys in this collection have a message in flight, or a
+        # message in _messages_on_hold that will be the next one in flight. Once
         # that one is acked or nacked, the next message in the queue for that
         # ordering key will be sent.
         # If the queue is empty, it means there's a message for that key in
@@ -69,30 +69,13 @@ class MessagesOnHold(object):
             A message that hasn't been sent to the user yet or ``None`` if there are no
             messages available.
         """
-        while self._messages_on_hold:
-            msg = self._messages_on_hold.popleft()
-
-            if msg.ordering_key:
-                pending_queue = self._pending_ordered_messages.get(msg.ordering_key)
-                if pending_queue is None:
-                    # Create empty queue to indicate a message with the
-                    # ordering key is in flight.
-                    self._pending_ordered_messages[
-                        msg.ordering_key
-                    ] = collections.deque()
-                    self._size = self._size - 1
-                    return msg
-                else:
-                    # Another message is in flight so add message to end of
-                    # queue for this ordering key.
-                    pending_queue.append(msg)
-            else:
-                # Unordered messages can be returned without any
-                # restrictions.
-                self._size = self._size - 1
-                return msg
+        # The messages blocked behind a message in flight are never in the queue,
+        # so the head of the queue (if any) can always be sent to the user.
+        if not self._messages_on_hold:
+            return None
 
-        return None
+        self._size = self._size - 1
+        return self._messages_on_hold.popleft()
 
     def put(self, message: "subscriber.message.Message") -> None:
         """Put a message on hold.
@@ -100,9 +83,48 @@ class MessagesOnHold(object):
         Args:
             message: The message to put on hold.
         """
+        ordering_key = message.ordering_key
+        if ordering_key:
+            pending_queue = self._pending_ordered_messages.get(ordering_key)
+            if pending_queue is not None:
+                # Another message with the key is in flight (or is about to be),
+                # so add message to end of queue for this ordering key.
+                pending_queue.append(message)
+                self._size = self._size + 1
+                return
+
+            # Create empty queue to indicate that this message will be the one
+            # with the ordering key in flight.
+            self._pending_ordered_messages[ordering_key] = collections.deque()
+
         self._messages_on_hold.append(message)
         self._size = self._size + 1
 
+    def put_many(self, messages: Sequence["subscriber.message.Message"]) -> None:
+        """Put several messages on hold, in the given order.
+
+        Args:
+            messages: The messages to put on hold.
+        """
+        for message in messages:
+            self.put(message)
+
+    def drain(self) -> List["subscriber.message.Message"]:
+        """Remove all messages on hold, including those waiting behind other
+        messages with the same ordering key.
+
+        Returns:
+            The messages that were on hold.
+        """
+        messages = list(self._messages_on_hold)
+        for pending_queue in self._pending_ordered_messages.values():
+            messages.extend(pending_queue)
+
+        self._messages_on_hold.clear()
+        self._pending_ordered_messages.clear()
+        self._size = 0
+        return messages
+
     def activate_ordering_keys(
         self,
         ordering_keys: Iterable[str],
@@ -0,0 +1,143 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+from typing import Callable, Dict, List, Mapping, Optional
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# The suffixes of the snapshot entries that only ever grow.
+_COUNTER_SUFFIXES = ("_total", "_count", "_sum")
+
+
+class Metrics(object):
+    """A registry of the metrics of a streaming pull.
+
+    The registry holds three kinds of metrics:
+
+    * Counters, which only grow, e.g. the number of received messages. By
+      convention their names end with ``_total``.
+    * Distributions of observed values, e.g. RPC latencies, kept as the number
+      of observations, their sum and their maximum.
+    * Gauges, which are read from a function when a snapshot is taken, so that
+      they cost nothing until then.
+    """
+
+    def __init__(self):
+        # Guards the counters and the distributions.
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        # The count, sum and maximum of the observed values of each distribution.
+        self._distributions: Dict[str, List[float]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add the value to a counter.
+
+        Args:
+            name: The name of the counter.
+            value: The value to add.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Add an observed value to a distribution.
+
+        Args:
+            name: The name of the distribution.
+            value: The observed value.
+        """
+        with self._lock:
+            distribution = self._distributions.get(name)
+            if distribution is None:
+                self._distributions[name] = [1, value, value]
+            else:
+                distribution[0] += 1
+                distribution[1] += value
+                if value > distribution[2]:
+                    distribution[2] = value
+
+    def add_gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Register a gauge.
+
+        Args:
+            name: The name of the gauge.
+            read: The function that returns the current value of the gauge.
+        """
+        self._gauges[name] = read
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the current values of all metrics.
+
+        A distribution is reported as three entries, ``<name>_count``,
+        ``<name>_sum`` and ``<name>_max``. Distributions without observations
+        are not reported.
+
+        Returns:
+            The values of the metrics, by name.
+        """
+        with self._lock:
+            values = dict(self._counters)
+            for name, (count, total, maximum) in self._distributions.items():
+                values[name + "_count"] = count
+                values[name + "_sum"] = total
+                values[name + "_max"] = maximum
+
+        for name, read in self._gauges.items():
+            try:
+                values[name] = read()
+            except Exception:
+                _LOGGER.debug("Failed to read gauge %s.", name, exc_info=True)
+
+        return values
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def to_prometheus_text(
+    snapshot: Mapping[str, float],
+    prefix: str = "pubsub_subscriber_",
+    labels: Optional[Mapping[str, str]] = None,
+) -> str:
+    """Format a metrics snapshot in the Prometheus text exposition format.
+
+    The counters and the counts and sums of the distributions are exported as
+    counters, all other entries as gauges.
+
+    Args:
+        snapshot: The metrics snapshot, see :meth:`Metrics.snapshot`.
+        prefix: The prefix of the metric names.
+        labels: The labels added to every metric, e.g. the subscription.
+
+    Returns:
+        The metrics, one per line.
+    """
+    label_text = ""
+    if labels:
+        label_text = "{%s}" % ",".join(
+            '{}="{}"'.format(key, _escape_label_value(value))
+            for key, value in sorted(labels.items())
+        )
+
+    lines = []
+    for name, value in sorted(snapshot.items()):
+        metric_type = "counter" if name.endswith(_COUNTER_SUFFIXES) else "gauge"
+        lines.append("# TYPE {}{} {}".format(prefix, name, metric_type))
+        lines.append("{}{}{} {}".format(prefix, name, label_text, float(value)))
+    return "\n".join(lines) + "\n"
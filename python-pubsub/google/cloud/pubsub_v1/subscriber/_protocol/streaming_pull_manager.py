@@ -16,11 +16,24 @@ from __future__ import division
 
 import collections
 import functools
+import inspect
 import itertools
 import logging
 import threading
+import time
 import typing
-from typing import Any, Dict, Callable, Iterable, List, Optional, Set, Tuple
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 import uuid
 
 import grpc  # type: ignore
@@ -32,7 +45,9 @@ from google.cloud.pubsub_v1.subscriber._protocol import dispatcher
 from google.cloud.pubsub_v1.subscriber._protocol import heartbeater
 from google.cloud.pubsub_v1.subscriber._protocol import histogram
 from google.cloud.pubsub_v1.subscriber._protocol import leaser
+from google.cloud.pubsub_v1.subscriber._protocol import message_batcher
 from google.cloud.pubsub_v1.subscriber._protocol import messages_on_hold
+from google.cloud.pubsub_v1.subscriber._protocol import metrics
 from google.cloud.pubsub_v1.subscriber._protocol import requests
 from google.cloud.pubsub_v1.subscriber.exceptions import (
     AcknowledgeError,
@@ -40,7 +55,7 @@ from google.cloud.pubsub_v1.subscriber.exceptions import (
 )
 import google.cloud.pubsub_v1.subscriber.message
 from google.cloud.pubsub_v1.subscriber import futures
-from google.cloud.pubsub_v1.subscriber.scheduler import ThreadScheduler
+from google.cloud.pubsub_v1.subscriber.scheduler import Scheduler, ThreadScheduler
 from google.pubsub_v1 import types as gapic_types
 from grpc_status import rpc_status  # type: ignore
 from google.rpc.error_details_pb2 import ErrorInfo  # type: ignore
@@ -63,11 +78,6 @@ _RETRYABLE_STREAM_ERRORS = (
     exceptions.Aborted,
 )
 _TERMINATING_STREAM_ERRORS = (exceptions.Cancelled,)
-_MAX_LOAD = 1.0
-"""The load threshold above which to pause the incoming message stream."""
-
-_RESUME_THRESHOLD = 0.8
-"""The load threshold below which to resume the incoming message stream."""
 
 _MIN_ACK_DEADLINE_SECS_WHEN_EXACTLY_ONCE_ENABLED = 60
 """The minimum ack_deadline, in seconds, for when exactly_once is enabled for
@@ -114,25 +124,87 @@ def _wrap_callback_errors(
     callback: Callable[["google.cloud.pubsub_v1.subscriber.message.Message"], Any],
     on_callback_error: Callable[[Exception], Any],
     message: "google.cloud.pubsub_v1.subscriber.message.Message",
-):
+) -> Optional[Awaitable[None]]:
     """Wraps a user callback so that if an exception occurs the message is
     nacked.
 
     Args:
         callback: The user callback.
         message: The Pub/Sub message.
+
+    Returns:
+        If the callback returned an awaitable (i.e. it is a coroutine function),
+        an awaitable that awaits it, and nacks the message if it raises.
+        Otherwise ``None``.
     """
+    return _call_and_nack_on_error(callback, on_callback_error, message, (message,))
+
+
+def _wrap_batch_callback_errors(
+    callback: Callable[
+        [List["google.cloud.pubsub_v1.subscriber.message.Message"]], Any
+    ],
+    on_callback_error: Callable[[Exception], Any],
+    messages: List["google.cloud.pubsub_v1.subscriber.message.Message"],
+) -> Optional[Awaitable[None]]:
+    """Wraps a user batch callback so that if an exception occurs all messages
+    in the batch are nacked.
+
+    Args:
+        callback: The user callback.
+        messages: The batch of Pub/Sub messages.
+
+    Returns:
+        If the callback returned an awaitable (i.e. it is a coroutine function),
+        an awaitable that awaits it, and nacks the messages if it raises.
+        Otherwise ``None``.
+    """
+    return _call_and_nack_on_error(callback, on_callback_error, messages, messages)
+
+
+def _call_and_nack_on_error(
+    callback: Callable[[Any], Any],
+    on_callback_error: Callable[[Exception], Any],
+    callback_arg: Any,
+    messages: Sequence["google.cloud.pubsub_v1.subscriber.message.Message"],
+) -> Optional[Awaitable[None]]:
     try:
-        callback(message)
+        result = callback(callback_arg)
     except Exception as exc:
-        # Note: the likelihood of this failing is extremely low. This just adds
-        # a message to a queue, so if this doesn't work the world is in an
-        # unrecoverable state and this thread should just bail.
-        _LOGGER.exception(
-            "Top-level exception occurred in callback while processing a message"
-        )
+        _on_callback_error(on_callback_error, messages, exc)
+        return None
+
+    if inspect.isawaitable(result):
+        return _await_callback_errors(result, on_callback_error, messages)
+    return None
+
+
+async def _await_callback_errors(
+    result: Awaitable[Any],
+    on_callback_error: Callable[[Exception], Any],
+    messages: Sequence["google.cloud.pubsub_v1.subscriber.message.Message"],
+) -> None:
+    """Await the result of a coroutine user callback, nacking the messages on error."""
+    try:
+        await result
+    except Exception as exc:
+        _on_callback_error(on_callback_error, messages, exc)
+
+
+def _on_callback_error(
+    on_callback_error: Callable[[Exception], Any],
+    messages: Sequence["google.cloud.pubsub_v1.subscriber.message.Message"],
+    exc: Exception,
+) -> None:
+    # Note: the likelihood of this failing is extremely low. This just adds
+    # a message to a queue, so if this doesn't work the world is in an
+    # unrecoverable state and this thread should just bail.
+    _LOGGER.exception(
+        "Top-level exception occurred in callback while processing a message"
+    )
+    for message in messages:
         message.nack()
-        on_callback_error(exc)
+    on_callback_error(exc)
 
 
 def _get_status(
@@ -260,6 +332,12 @@ class StreamingPullManager(object):
             This setting affects when the on close callbacks get invoked, and
             consequently, when the StreamingPullFuture associated with the stream gets
             resolved.
+        max_ack_rpc_concurrency:
+            The maximum number of ack and modack RPCs sent concurrently. If 1
+            (default), the RPCs are sent one at a time.
+        num_streams:
+            The number of streams to pull messages from. All streams share the
+            flow control, the leaser, the dispatcher and the scheduler.
     """
 
     def __init__(
@@ -267,17 +345,31 @@ class StreamingPullManager(object):
         client: "subscriber.Client",
         subscription: str,
         flow_control: types.FlowControl = types.FlowControl(),
-        scheduler: ThreadScheduler = None,
+        scheduler: Optional[Scheduler] = None,
         use_legacy_flow_control: bool = False,
         await_callbacks_on_shutdown: bool = False,
+        max_ack_rpc_concurrency: int = 1,
+        num_streams: int = 1,
     ):
+        if num_streams < 1:
+            raise ValueError("num_streams must be at least 1.")
+        if not 0 < flow_control.low_watermark <= flow_control.high_watermark:
+            raise ValueError(
+                "The flow control watermarks must satisfy "
+                "0 < low_watermark <= high_watermark."
+            )
+
         self._client = client
         self._subscription = subscription
         self._exactly_once_enabled = False
         self._flow_control = flow_control
         self._use_legacy_flow_control = use_legacy_flow_control
         self._await_callbacks_on_shutdown = await_callbacks_on_shutdown
-        self._ack_histogram = histogram.Histogram()
+        self._max_ack_rpc_concurrency = max_ack_rpc_concurrency
+        self._num_streams = num_streams
+        self._ack_histogram = histogram.Histogram(
+            half_life=self._flow_control.ack_time_half_life
+        )
         self._last_histogram_size = 0
         self._stream_metadata = [
             ["x-goog-request-params", "subscription=" + subscription]
@@ -330,7 +422,7 @@ class StreamingPullManager(object):
         self._client_id = str(uuid.uuid4())
 
         if scheduler is None:
-            self._scheduler: Optional[ThreadScheduler] = ThreadScheduler()
+            self._scheduler: Optional[Scheduler] = ThreadScheduler()
         else:
             self._scheduler = scheduler
 
@@ -366,6 +458,52 @@ class StreamingPullManager(object):
         self._consumer: Optional[bidi.BackgroundConsumer] = None
         self._heartbeater: Optional[heartbeater.Heartbeater] = None
 
+        # The streams opened in addition to the first one (self._rpc), and their
+        # consumers, if num_streams > 1.
+        self._extra_rpcs: List[bidi.ResumableBidiRpc] = []
+        self._extra_consumers: List[bidi.BackgroundConsumer] = []
+
+        # Groups the released messages into batches, if the user callback
+        # receives batches of messages.
+        self._batcher: Optional[message_batcher.MessageBatcher] = None
+
+        self._metrics = metrics.Metrics()
+        self._add_gauges()
+
+    def _add_gauges(self) -> None:
+        """Register the gauges that are read from the manager's current state."""
+        add_gauge = self._metrics.add_gauge
+        add_gauge("messages_on_hold", lambda: self._messages_on_hold.size)
+        add_gauge("bytes_on_hold", lambda: self._on_hold_bytes)
+        add_gauge(
+            "leased_messages",
+            lambda: 0 if self._leaser is None else self._leaser.message_count,
+        )
+        add_gauge(
+            "leased_bytes", lambda: 0 if self._leaser is None else self._leaser.bytes
+        )
+        add_gauge("load", lambda: self.load)
+        add_gauge("ack_deadline_seconds", lambda: self.ack_deadline)
+        for percent in (50, 90, 99):
+            add_gauge(
+                "ack_time_p{}_seconds".format(percent),
+                functools.partial(self._ack_histogram.percentile, percent),
+            )
+        add_gauge(
+            "consumer_paused",
+            lambda: any(consumer.is_paused for consumer in self._all_consumers()),
+        )
+        add_gauge(
+            "retry_queue_size",
+            lambda: 0
+            if self._dispatcher is None
+            else self._dispatcher.retry_queue_size,
+        )
+        add_gauge(
+            "scheduler_queue_size",
+            lambda: 0 if self._scheduler is None else self._scheduler.queue.qsize(),
+        )
+
     @property
     def is_active(self) -> bool:
         """``True`` if this manager is actively streaming.
@@ -390,6 +528,11 @@ class StreamingPullManager(object):
         """The leaser helper."""
         return self._leaser
 
+    @property
+    def metrics(self) -> metrics.Metrics:
+        """The metrics of this streaming pull."""
+        return self._metrics
+
     @property
     def ack_histogram(self) -> histogram.Histogram:
         """The histogram tracking time-to-acknowledge."""
@@ -527,18 +670,26 @@ class StreamingPullManager(object):
                 ordering_keys, self._schedule_message_on_hold
             )
 
+    def _all_consumers(self) -> List[bidi.BackgroundConsumer]:
+        """Return the consumers of all streams."""
+        if self._consumer is None:
+            return list(self._extra_consumers)
+        return [self._consumer] + self._extra_consumers
+
     def maybe_pause_consumer(self) -> None:
-        """Check the current load and pause the consumer if needed."""
+        """Check the current load and pause the consumers if needed."""
         with self._pause_resume_lock:
-            if self.load >= _MAX_LOAD:
-                if self._consumer is not None and not self._consumer.is_paused:
-                    _LOGGER.debug(
-                        "Message backlog over load at %.2f, pausing.", self.load
-                    )
-                    self._consumer.pause()
+            load = self.load
+            if load >= self._flow_control.high_watermark:
+                running = [c for c in self._all_consumers() if not c.is_paused]
+                if running:
+                    _LOGGER.debug("Message backlog over load at %.2f, pausing.", load)
+                    self._metrics.increment("consumer_pauses_total")
+                for consumer in running:
+                    consumer.pause()
 
     def maybe_resume_consumer(self) -> None:
-        """Check the load and held messages and resume the consumer if needed.
+        """Check the load and held messages and resume the consumers if needed.
 
         If there are messages held internally, release those messages before
         resuming the consumer. That will avoid leaser overload.
@@ -548,24 +699,32 @@ class StreamingPullManager(object):
             # back within our limits.
             #
             # In order to not thrash too much, require us to have passed below
-            # the resume threshold (80% by default) of each flow control setting
+            # the low watermark (80% by default) of each flow control setting
             # before restarting.
-            if self._consumer is None or not self._consumer.is_paused:
+            paused = [c for c in self._all_consumers() if c.is_paused]
+            if not paused:
                 return
 
-            _LOGGER.debug("Current load: %.2f", self.load)
-
             # Before maybe resuming the background consumer, release any messages
             # currently on hold, if the current load allows for it.
-            self._maybe_release_messages()
+            load = self._maybe_release_messages(
+                max_released=self._flow_control.max_release_per_drop
+            )
 
-            if self.load < _RESUME_THRESHOLD:
-                _LOGGER.debug("Current load is %.2f, resuming consumer.", self.load)
-                self._consumer.resume()
+            # Messages can stay on hold below the high watermark if the number of
+            # released messages is limited, receive more only once they are gone.
+            if (
+                load < self._flow_control.low_watermark
+                and not self._messages_on_hold.size
+            ):
+                _LOGGER.debug("Current load is %.2f, resuming consumer.", load)
+                self._metrics.increment("consumer_resumes_total")
+                for consumer in paused:
+                    consumer.resume()
             else:
-                _LOGGER.debug("Did not resume, current load is %.2f.", self.load)
+                _LOGGER.debug("Did not resume, current load is %.2f.", load)
 
-    def _maybe_release_messages(self) -> None:
+    def _maybe_release_messages(self, max_released: int = 0) -> float:
         """Release (some of) the held messages if the current load allows for it.
 
         The method tries to release as many messages as the current leaser load
@@ -576,18 +735,43 @@ class StreamingPullManager(object):
         already overloaded, this method is effectively a no-op.
 
         The method assumes the caller has acquired the ``_pause_resume_lock``.
+
+        Args:
+            max_released:
+                The maximum number of messages to release, unlimited if 0.
+
+        Returns:
+            The load after releasing the messages.
         """
+        assert self._leaser is not None
+
+        # Compute the load once, and then only account for the released messages
+        # instead of recomputing the load from the leaser for every message.
+        max_messages = self._flow_control.max_messages
+        max_bytes = self._flow_control.max_bytes
+        high_watermark = self._flow_control.high_watermark
+        delivered_count = self._leaser.message_count - self._messages_on_hold.size
+        delivered_bytes = self._leaser.bytes - self._on_hold_bytes
+
         released_ack_ids = []
-        while self.load < _MAX_LOAD:
+        while (
+            delivered_count / max_messages < high_watermark
+            and delivered_bytes / max_bytes < high_watermark
+        ):
+            if max_released and len(released_ack_ids) >= max_released:
+                break
+
             msg = self._messages_on_hold.get()
             if not msg:
                 break
 
             self._schedule_message_on_hold(msg)
             released_ack_ids.append(msg.ack_id)
+            delivered_count += 1
+            delivered_bytes += msg.size
 
-        assert self._leaser is not None
         self._leaser.start_lease_expiry_timer(released_ack_ids)
+        return max(delivered_count / max_messages, delivered_bytes / max_bytes)
 
     def _schedule_message_on_hold(
         self, msg: "google.cloud.pubsub_v1.subscriber.message.Message"
@@ -616,10 +800,27 @@ class StreamingPullManager(object):
             self._messages_on_hold.size,
             self._on_hold_bytes,
         )
+        if self._batcher is not None:
+            self._batcher.add(msg)
+            return
+
         assert self._scheduler is not None
         assert self._callback is not None
         self._scheduler.schedule(self._callback, msg)
 
+    def _schedule_batch(
+        self, messages: List["google.cloud.pubsub_v1.subscriber.message.Message"]
+    ) -> None:
+        """Schedule a batch of released messages to be sent to the user.
+
+        Args:
+            messages: The batch of messages to send to the user.
+        """
+        _LOGGER.debug("Scheduling callback for a batch of %s messages.", len(messages))
+        assert self._scheduler is not None
+        assert self._callback is not None
+        self._scheduler.schedule(self._callback, messages)
+
     def send_unary_ack(
         self, ack_ids, ack_reqs_dict
     ) -> Tuple[List[requests.AckRequest], List[requests.AckRequest]]:
@@ -633,6 +834,7 @@ class StreamingPullManager(object):
 
         error_status = None
         ack_errors_dict = None
+        start = time.monotonic()
         try:
             self._client.acknowledge(subscription=self._subscription, ack_ids=ack_ids)
         except exceptions.GoogleAPICallError as exc:
@@ -643,6 +845,7 @@ class StreamingPullManager(object):
             )
             error_status = _get_status(exc)
             ack_errors_dict = _get_ack_errors(exc)
+            self._metrics.increment("ack_rpc_errors_total")
         except exceptions.RetryError as exc:
             exactly_once_delivery_enabled = self._exactly_once_delivery_enabled()
             # Makes sure to complete futures so they don't block forever.
@@ -659,6 +862,8 @@ class StreamingPullManager(object):
                     else:
                         req.future.set_result(AcknowledgeStatus.SUCCESS)
 
+            self._metrics.increment("ack_rpc_errors_total")
+
             _LOGGER.debug(
                 "RetryError while sending ack RPC. Waiting on a transient "
                 "error resolution for too long, will now trigger shutdown.",
@@ -668,6 +873,9 @@ class StreamingPullManager(object):
             # for too long, time to give up and shut the streaming pull down.
             self._on_rpc_done(exc)
             raise
+        finally:
+            self._metrics.observe("ack_rpc_latency_seconds", time.monotonic() - start)
+            self._metrics.observe("ack_rpc_batch_size", len(ack_ids))
 
         if self._exactly_once_delivery_enabled():
             requests_completed, requests_to_retry = _process_requests(
@@ -706,6 +914,7 @@ class StreamingPullManager(object):
 
         error_status = None
         modack_errors_dict = None
+        start = time.monotonic()
         try:
             if default_deadline is None:
                 # Send ack_ids with the same deadline seconds together.
@@ -736,6 +945,7 @@ class StreamingPullManager(object):
             )
             error_status = _get_status(exc)
             modack_errors_dict = _get_ack_errors(exc)
+            self._metrics.increment("modack_rpc_errors_total")
         except exceptions.RetryError as exc:
             exactly_once_delivery_enabled = self._exactly_once_delivery_enabled()
             # Makes sure to complete futures so they don't block forever.
@@ -753,6 +963,8 @@ class StreamingPullManager(object):
                     else:
                         req.future.set_result(AcknowledgeStatus.SUCCESS)
 
+            self._metrics.increment("modack_rpc_errors_total")
+
             _LOGGER.debug(
                 "RetryError while sending modack RPC. Waiting on a transient "
                 "error resolution for too long, will now trigger shutdown.",
@@ -762,6 +974,13 @@ class StreamingPullManager(object):
             # for too long, time to give up and shut the streaming pull down.
             self._on_rpc_done(exc)
             raise
+        finally:
+            # With several distinct deadlines, the requests are split over several
+            # RPCs, which are measured together.
+            self._metrics.observe(
+                "modack_rpc_latency_seconds", time.monotonic() - start
+            )
+            self._metrics.observe("modack_rpc_batch_size", len(modify_deadline_ack_ids))
 
         if self._exactly_once_delivery_enabled():
             requests_completed, requests_to_retry = _process_requests(
@@ -783,7 +1002,7 @@ class StreamingPullManager(object):
         return requests_completed, requests_to_retry
 
     def heartbeat(self) -> bool:
-        """Sends a heartbeat request over the streaming pull RPC.
+        """Sends a heartbeat request over each active streaming pull RPC.
 
         The request is empty by default, but may contain the current ack_deadline
         if the self._exactly_once_enabled flag has changed.
@@ -791,7 +1010,9 @@ class StreamingPullManager(object):
         Returns:
             If a heartbeat request has actually been sent.
         """
-        if self._rpc is not None and self._rpc.is_active:
+        rpcs = [] if self._rpc is None else [self._rpc]
+        active_rpcs = [rpc for rpc in rpcs + self._extra_rpcs if rpc.is_active]
+        if active_rpcs:
             send_new_ack_deadline = False
             with self._exactly_once_enabled_lock:
                 send_new_ack_deadline = self._send_new_ack_deadline
@@ -807,25 +1028,35 @@ class StreamingPullManager(object):
             else:
                 request = gapic_types.StreamingPullRequest()
 
-            self._rpc.send(request)
+            for rpc in active_rpcs:
+                rpc.send(request)
             return True
 
         return False
 
     def open(
         self,
-        callback: Callable[["google.cloud.pubsub_v1.subscriber.message.Message"], Any],
+        callback: Callable[[Any], Any],
         on_callback_error: Callable[[Exception], Any],
+        max_batch_size: Optional[int] = None,
+        max_batch_latency: float = 0.0,
     ) -> None:
         """Begin consuming messages.
 
         Args:
             callback:
                 A callback that will be called for each message received on the
-                stream.
+                stream, or for each batch of messages if ``max_batch_size`` is set.
             on_callback_error:
                 A callable that will be called if an exception is raised in
                 the provided `callback`.
+            max_batch_size:
+                If set, the callback receives lists of up to this many messages
+                instead of individual messages.
+            max_batch_latency:
+                The maximum number of seconds a message waits for its batch to
+                fill before the batch is sent to the callback anyway. Only used
+                if ``max_batch_size`` is set.
         """
         if self.is_active:
             raise ValueError("This manager is already open.")
@@ -833,37 +1064,56 @@ class StreamingPullManager(object):
         if self._closed:
             raise ValueError("This manager has been closed and can not be re-used.")
 
-        self._callback = functools.partial(
-            _wrap_callback_errors, callback, on_callback_error
-        )
+        if max_batch_size is None:
+            self._callback = functools.partial(
+                _wrap_callback_errors, callback, on_callback_error
+            )
+        else:
+            self._batcher = message_batcher.MessageBatcher(
+                self._schedule_batch, max_batch_size, max_batch_latency
+            )
+            self._callback = functools.partial(
+                _wrap_batch_callback_errors, callback, on_callback_error
+            )
 
-        # Create the RPC
+        # Create the RPCs
         stream_ack_deadline_seconds = self._stream_ack_deadline
 
         get_initial_request = functools.partial(
             self._get_initial_request, stream_ack_deadline_seconds
         )
-        self._rpc = bidi.ResumableBidiRpc(
-            start_rpc=self._client.streaming_pull,
-            initial_request=get_initial_request,
-            should_recover=self._should_recover,
-            should_terminate=self._should_terminate,
-            metadata=self._stream_metadata,
-            throttle_reopen=True,
-        )
-        self._rpc.add_done_callback(self._on_rpc_done)
+        rpcs = []
+        for _ in range(self._num_streams):
+            rpc = bidi.ResumableBidiRpc(
+                start_rpc=self._client.streaming_pull,
+                initial_request=get_initial_request,
+                should_recover=self._should_recover,
+                should_terminate=self._should_terminate,
+                metadata=self._stream_metadata,
+                throttle_reopen=True,
+            )
+            rpc.add_done_callback(self._on_rpc_done)
+            rpcs.append(rpc)
+        self._rpc, self._extra_rpcs = rpcs[0], rpcs[1:]
 
         _LOGGER.debug(
-            "Creating a stream, default ACK deadline set to {} seconds.".format(
-                self._stream_ack_deadline
+            "Creating {} stream(s), default ACK deadline set to {} seconds.".format(
+                self._num_streams, self._stream_ack_deadline
             )
         )
 
         # Create references to threads
         assert self._scheduler is not None
         scheduler_queue = self._scheduler.queue
-        self._dispatcher = dispatcher.Dispatcher(self, scheduler_queue)
+        self._dispatcher = dispatcher.Dispatcher(
+            self,
+            scheduler_queue,
+            max_ack_rpc_concurrency=self._max_ack_rpc_concurrency,
+        )
         self._consumer = bidi.BackgroundConsumer(self._rpc, self._on_response)
+        self._extra_consumers = [
+            bidi.BackgroundConsumer(rpc, self._on_response) for rpc in self._extra_rpcs
+        ]
         self._leaser = leaser.Leaser(self)
         self._heartbeater = heartbeater.Heartbeater(self)
 
@@ -872,6 +1122,8 @@ class StreamingPullManager(object):
 
         # Start consuming messages.
         self._consumer.start()
+        for consumer in self._extra_consumers:
+            consumer.start()
 
         # Start the lease maintainer thread.
         self._leaser.start()
@@ -919,15 +1171,34 @@ class StreamingPullManager(object):
                 assert self._consumer is not None
                 self._consumer.stop()
             self._consumer = None
+            for consumer in self._extra_consumers:
+                if consumer.is_active:
+                    consumer.stop()
+            self._extra_consumers = []
+
+            # Stop sending batches before the scheduler is shut down, and take the
+            # messages of the batch that was not sent yet.
+            unsent_messages = []
+            if self._batcher is not None:
+                _LOGGER.debug("Stopping batcher.")
+                unsent_messages = self._batcher.stop()
 
             # Shutdown all helper threads
             _LOGGER.debug("Stopping scheduler.")
             assert self._scheduler is not None
-            dropped_messages = self._scheduler.shutdown(
+            dropped_items = self._scheduler.shutdown(
                 await_msg_callbacks=self._await_callbacks_on_shutdown
             )
             self._scheduler = None
 
+            # The items scheduled with a batch callback are lists of messages.
+            dropped_messages = unsent_messages
+            for item in dropped_items:
+                if isinstance(item, list):
+                    dropped_messages.extend(item)
+                else:
+                    dropped_messages.append(item)
+
             # Leaser and dispatcher reference each other through the shared
             # StreamingPullManager instance, i.e. "self", thus do not set their
             # references to None until both have been shut down.
@@ -941,13 +1212,10 @@ class StreamingPullManager(object):
             assert self._leaser is not None
             self._leaser.stop()
 
-            total = len(dropped_messages) + len(
-                self._messages_on_hold._messages_on_hold
-            )
+            held_messages = self._messages_on_hold.drain()
+            total = len(dropped_messages) + len(held_messages)
             _LOGGER.debug(f"NACK-ing all not-yet-dispatched messages (total: {total}).")
-            messages_to_nack = itertools.chain(
-                dropped_messages, self._messages_on_hold._messages_on_hold
-            )
+            messages_to_nack = itertools.chain(dropped_messages, held_messages)
             for msg in messages_to_nack:
                 msg.nack()
 
@@ -964,6 +1232,7 @@ class StreamingPullManager(object):
             self._heartbeater = None
 
             self._rpc = None
+            self._extra_rpcs = []
             self._closed = True
             _LOGGER.debug("Finished stopping manager.")
 
@@ -986,6 +1255,19 @@ class StreamingPullManager(object):
             A request suitable for being the first request on the stream (and not
             suitable for any other purpose).
         """
+        # The server enforces the outstanding limits per stream, so split them
+        # across the streams. The client-side flow control applies to all of the
+        # streams together.
+        if self._use_legacy_flow_control:
+            max_outstanding_messages = max_outstanding_bytes = 0
+        else:
+            max_outstanding_messages = -(
+                -self._flow_control.max_messages // self._num_streams
+            )
+            max_outstanding_bytes = -(
+                -self._flow_control.max_bytes // self._num_streams
+            )
+
         # Put the request together.
         # We need to set streaming ack deadline, but it's not useful since we'll modack to send receipt
         # anyway. Set to some big-ish value in case we modack late.
@@ -995,12 +1277,8 @@ class StreamingPullManager(object):
             modify_deadline_seconds=[],
             subscription=self._subscription,
             client_id=self._client_id,
-            max_outstanding_messages=(
-                0 if self._use_legacy_flow_control else self._flow_control.max_messages
-            ),
-            max_outstanding_bytes=(
-                0 if self._use_legacy_flow_control else self._flow_control.max_bytes
-            ),
+            max_outstanding_messages=max_outstanding_messages,
+            max_outstanding_bytes=max_outstanding_bytes,
         )
 
         # Return the initial request.
@@ -1103,30 +1381,45 @@ class StreamingPullManager(object):
             ack_id_gen, self.ack_deadline, warn_on_invalid=False
         )
 
+        # Process the whole response in one pass, so that the leaser lock is only
+        # taken once and the load is only recomputed once per response.
+        if self._exactly_once_delivery_enabled():
+            received_messages = [
+                received_message
+                for received_message in received_messages
+                if received_message.ack_id not in expired_ack_ids
+            ]
+
         with self._pause_resume_lock:
             assert self._scheduler is not None
             assert self._leaser is not None
 
-            for received_message in received_messages:
-                if (
-                    not self._exactly_once_delivery_enabled()
-                    or received_message.ack_id not in expired_ack_ids
-                ):
-                    message = google.cloud.pubsub_v1.subscriber.message.Message(
-                        received_message.message,
-                        received_message.ack_id,
-                        received_message.delivery_attempt,
-                        self._scheduler.queue,
-                        self._exactly_once_delivery_enabled,
-                    )
-                    self._messages_on_hold.put(message)
-                    self._on_hold_bytes += message.size
-                    req = requests.LeaseRequest(
+            make_message = google.cloud.pubsub_v1.subscriber.message.Message
+            scheduler_queue = self._scheduler.queue
+            messages = [
+                make_message(
+                    received_message.message,
+                    received_message.ack_id,
+                    received_message.delivery_attempt,
+                    scheduler_queue,
+                    self._exactly_once_delivery_enabled,
+                )
+                for received_message in received_messages
+            ]
+
+            self._metrics.increment("messages_received_total", len(messages))
+            self._messages_on_hold.put_many(messages)
+            self._on_hold_bytes += sum(message.size for message in messages)
+            self._leaser.add(
+                [
+                    requests.LeaseRequest(
                         ack_id=message.ack_id,
                         byte_size=message.size,
                         ordering_key=message.ordering_key,
                     )
-                    self._leaser.add([req])
+                    for message in messages
+                ]
+            )
 
             self._maybe_release_messages()
 
@@ -16,7 +16,7 @@ from __future__ import absolute_import
 
 import os
 import typing
-from typing import cast, Any, Callable, Optional, Sequence, Union
+from typing import cast, Any, Callable, List, Optional, Sequence, Union
 import warnings
 
 from google.auth.credentials import AnonymousCredentials  # type: ignore
@@ -145,9 +145,11 @@ class Client(subscriber_client.SubscriberClient):
         subscription: str,
         callback: Callable[["subscriber.message.Message"], Any],
         flow_control: Union[types.FlowControl, Sequence] = (),
-        scheduler: Optional["subscriber.scheduler.ThreadScheduler"] = None,
+        scheduler: Optional["subscriber.scheduler.Scheduler"] = None,
         use_legacy_flow_control: bool = False,
         await_callbacks_on_shutdown: bool = False,
+        max_ack_rpc_concurrency: int = 1,
+        num_streams: int = 1,
     ) -> futures.StreamingPullFuture:
         """Asynchronously start receiving messages on a given subscription.
 
@@ -241,6 +243,16 @@ class Client(subscriber_client.SubscriberClient):
                 immediately after the background stream and its helper threads have been
                 terminated, but some of the message callback threads might still be
                 running at that point.
+            max_ack_rpc_concurrency:
+                The maximum number of ack and modack RPCs in flight at once. If 1
+                (default), the RPCs are sent one at a time, and a slow RPC delays
+                all acks and modacks after it. Higher values let the ack throughput
+                keep up with a high message throughput.
+            num_streams:
+                The number of streams to pull messages from. A single stream
+                limits the pull throughput, more streams raise it. All streams
+                share the flow control settings, the scheduler and the helper
+                threads that lease and acknowledge the messages.
 
         Returns:
             A future instance that can be used to manage the background stream.
@@ -254,6 +266,8 @@ class Client(subscriber_client.SubscriberClient):
             scheduler=scheduler,
             use_legacy_flow_control=use_legacy_flow_control,
             await_callbacks_on_shutdown=await_callbacks_on_shutdown,
+            max_ack_rpc_concurrency=max_ack_rpc_concurrency,
+            num_streams=num_streams,
         )
 
         future = futures.StreamingPullFuture(manager)
@@ -262,6 +276,132 @@ class Client(subscriber_client.SubscriberClient):
 
         return future
 
+    def subscribe_batch(
+        self,
+        subscription: str,
+        callback: Callable[[List["subscriber.message.Message"]], Any],
+        max_batch_size: int = 100,
+        max_batch_latency: float = 0.1,
+        flow_control: Union[types.FlowControl, Sequence] = (),
+        scheduler: Optional["subscriber.scheduler.Scheduler"] = None,
+        use_legacy_flow_control: bool = False,
+        await_callbacks_on_shutdown: bool = False,
+        max_ack_rpc_concurrency: int = 1,
+        num_streams: int = 1,
+    ) -> futures.StreamingPullFuture:
+        """Asynchronously start receiving batches of messages on a given
+        subscription.
+
+        This method works like :meth:`subscribe`, but the ``callback`` is called
+        with a list of up to ``max_batch_size`` messages instead of an individual
+        message. A batch is sent to the callback once it is full, or once its
+        first message has waited ``max_batch_latency`` seconds, whichever comes
+        first. It is the responsibility of the callback to either call ``ack()``
+        or ``nack()`` on each of the messages. If an exception occurs in the
+        callback, the exception is logged and all messages in the batch are
+        ``nack()`` ed.
+
+        The messages in a batch are leased until acknowledged, and they count
+        towards the ``flow_control`` limits just like the messages sent to a
+        per-message callback. The ``max_messages`` flow control setting should
+        thus be at least ``max_batch_size``, otherwise the batches are only sent
+        once ``max_batch_latency`` has passed.
+
+        A batch contains at most one message with any given ordering key. The
+        next message with the same ordering key is only sent to the callback once
+        the previous one has been acknowledged.
+
+        Example:
+
+        .. code-block:: python
+
+            from google.cloud import pubsub_v1
+
+            subscriber_client = pubsub_v1.SubscriberClient()
+
+            # existing subscription
+            subscription = subscriber_client.subscription_path(
+                'my-project-id', 'my-subscription')
+
+            def callback(messages):
+                insert_rows([message.data for message in messages])
+                for message in messages:
+                    message.ack()
+
+            future = subscriber_client.subscribe_batch(
+                subscription, callback, max_batch_size=500, max_batch_latency=1.0)
+
+        Args:
+            subscription:
+                The name of the subscription. The subscription should have already been
+                created (for example, by using :meth:`create_subscription`).
+            callback:
+                The callback function. This function receives a list of messages as
+                its only argument and will be called from a different thread/
+                process depending on the scheduling strategy.
+            max_batch_size:
+                The maximum number of messages passed to a single callback call.
+            max_batch_latency:
+                The maximum number of seconds a message waits for its batch to
+                fill before the batch is passed to the callback anyway.
+            flow_control:
+                The flow control settings. Use this to prevent situations where you are
+                inundated with too many messages at once.
+            scheduler:
+                An optional *scheduler* to use when executing the callback. This
+                controls how callbacks are executed concurrently. This object must not
+                be shared across multiple ``SubscriberClient`` instances.
+            use_legacy_flow_control (bool):
+                If set to ``True``, flow control at the Cloud Pub/Sub server is disabled,
+                though client-side flow control is still enabled. If set to ``False``
+                (default), both server-side and client-side flow control are enabled.
+            await_callbacks_on_shutdown:
+                If ``True``, after canceling the returned future, the latter's
+                ``result()`` method will block until the background stream and its
+                helper threads have been terminated, and all currently executing
+                callbacks are done processing.
+            max_ack_rpc_concurrency:
+                The maximum number of ack and modack RPCs in flight at once. If 1
+                (default), the RPCs are sent one at a time, and a slow RPC delays
+                all acks and modacks after it. Higher values let the ack throughput
+                keep up with a high message throughput.
+            num_streams:
+                The number of streams to pull messages from. A single stream
+                limits the pull throughput, more streams raise it. All streams
+                share the flow control settings, the scheduler and the helper
+                threads that lease and acknowledge the messages.
+
+        Returns:
+            A future instance that can be used to manage the background stream.
+
+        Raises:
+            ValueError: If ``max_batch_size`` is less than 1, or if
+                ``max_batch_latency`` is negative.
+        """
+        flow_control = types.FlowControl(*flow_control)
+
+        manager = streaming_pull_manager.StreamingPullManager(
+            self,
+            subscription,
+            flow_control=flow_control,
+            scheduler=scheduler,
+            use_legacy_flow_control=use_legacy_flow_control,
+            await_callbacks_on_shutdown=await_callbacks_on_shutdown,
+            max_ack_rpc_concurrency=max_ack_rpc_concurrency,
+            num_streams=num_streams,
+        )
+
+        future = futures.StreamingPullFuture(manager)
+
+        manager.open(
+            callback=callback,
+            on_callback_error=future.set_exception,
+            max_batch_size=max_batch_size,
+            max_batch_latency=max_batch_latency,
+        )
+
+        return future
+
     def close(self) -> None:
         """Close the underlying channel to release socket resources.
 
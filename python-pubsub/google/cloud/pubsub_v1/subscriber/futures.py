@@ -16,9 +16,10 @@ from __future__ import absolute_import
 
 import typing
 from typing import Any
-from typing import Union
+from typing import Dict, Mapping, Optional, Union
 
 from google.cloud.pubsub_v1 import futures
+from google.cloud.pubsub_v1.subscriber._protocol import metrics
 from google.cloud.pubsub_v1.subscriber.exceptions import AcknowledgeStatus
 
 if typing.TYPE_CHECKING:  # pragma: NO COVER
@@ -82,6 +83,36 @@ class StreamingPullFuture(futures.Future):
         """
         return self.__cancelled
 
+    def metrics(self) -> Dict[str, float]:
+        """Return a snapshot of the metrics of the streaming pull.
+
+        The snapshot includes counters such as ``messages_received_total`` and
+        ``consumer_pauses_total``, the distributions of the ack and modack RPC
+        latencies and batch sizes (each as ``_count``, ``_sum`` and ``_max``), and
+        gauges of the current state, such as ``messages_on_hold``,
+        ``leased_messages``, ``load``, ``ack_deadline_seconds`` and
+        ``scheduler_queue_size``.
+
+        Returns:
+            The values of the metrics, by name.
+        """
+        return self.__manager.metrics.snapshot()
+
+    def prometheus_metrics(self, labels: Optional[Mapping[str, str]] = None) -> str:
+        """Return the metrics of the streaming pull in the Prometheus text format.
+
+        This can be called from the handler of a metrics endpoint, for example.
+
+        Args:
+            labels:
+                The labels added to every metric, e.g.
+                ``{"subscription": "my-subscription"}``.
+
+        Returns:
+            The metrics, named with the ``pubsub_subscriber_`` prefix.
+        """
+        return metrics.to_prometheus_text(self.metrics(), labels=labels)
+
 
 class Future(futures.Future):
     """This future object is for subscribe-side calls.
@@ -16,11 +16,13 @@ from __future__ import absolute_import
 
 import datetime as dt
 import json
+import logging
 import math
 import time
 import typing
 from typing import Optional, Callable
 
+from google.cloud.pubsub_v1 import _compression
 from google.cloud.pubsub_v1.subscriber._protocol import requests
 from google.cloud.pubsub_v1.subscriber import futures
 from google.cloud.pubsub_v1.subscriber.exceptions import AcknowledgeStatus
@@ -33,6 +35,9 @@ if typing.TYPE_CHECKING:  # pragma: NO COVER
     from google.protobuf.internal import containers
 
 
+_LOGGER = logging.getLogger(__name__)
+
+
 _MESSAGE_REPR = """\
 Message {{
   data: {!r}
@@ -87,6 +92,23 @@ class Message(object):
             The time that this message was originally published.
     """
 
+    # The fields are read from the underlying protobuf message when they are first
+    # accessed, so that receiving a message only costs what the callback uses.
+    __slots__ = (
+        "_message",
+        "_ack_id",
+        "_delivery_attempt",
+        "_request_queue",
+        "_exactly_once_delivery_enabled_func",
+        "_received_timestamp",
+        "_message_id",
+        "_attributes",
+        "_data",
+        "_publish_time",
+        "_ordering_key",
+        "_size",
+    )
+
     def __init__(
         self,
         message: "types.PubsubMessage._meta._pb",  # type: ignore
@@ -125,28 +147,23 @@ class Message(object):
         self._delivery_attempt = delivery_attempt if delivery_attempt > 0 else None
         self._request_queue = request_queue
         self._exactly_once_delivery_enabled_func = exactly_once_delivery_enabled_func
-        self.message_id = message.message_id
 
         # The instantiation time is the time that this message
         # was received. Tracking this provides us a way to be smart about
         # the default lease deadline.
         self._received_timestamp = time.time()
 
-        # Store the message attributes directly to speed up attribute access, i.e.
-        # to avoid two lookups if self._message.<attribute> pattern was used in
-        # properties.
-        self._attributes = message.attributes
-        self._data = message.data
-        self._publish_time = dt.datetime.fromtimestamp(
-            message.publish_time.seconds + message.publish_time.nanos / 1e9,
-            tz=dt.timezone.utc,
-        )
-        self._ordering_key = message.ordering_key
-        self._size = message.ByteSize()
+        # Cached values of the fields read from the underlying message.
+        self._message_id: Optional[str] = None
+        self._attributes: Optional["containers.ScalarMap"] = None
+        self._data: Optional[bytes] = None
+        self._publish_time: Optional["datetime.datetime"] = None
+        self._ordering_key: Optional[str] = None
+        self._size: Optional[int] = None
 
     def __repr__(self):
         # Get an abbreviated version of the data.
-        abbv_data = self._message.data
+        abbv_data = self.data
         if len(abbv_data) > 50:
             abbv_data = abbv_data[:50] + b"..."
 
@@ -158,6 +175,13 @@ class Message(object):
         pretty_attrs = pretty_attrs.lstrip()
         return _MESSAGE_REPR.format(abbv_data, str(self.ordering_key), pretty_attrs)
 
+    @property
+    def message_id(self) -> str:
+        """The message ID. In general, you should not need to use this directly."""
+        if self._message_id is None:
+            self._message_id = self._message.message_id
+        return self._message_id
+
     @property
     def attributes(self) -> "containers.ScalarMap":
         """Return the attributes of the underlying Pub/Sub Message.
@@ -175,16 +199,36 @@ class Message(object):
             containers.ScalarMap: The message's attributes. This is a
             ``dict``-like object provided by ``google.protobuf``.
         """
+        if self._attributes is None:
+            self._attributes = self._message.attributes
         return self._attributes
 
     @property
     def data(self) -> bytes:
         """Return the data for the underlying Pub/Sub Message.
 
+        If the publisher compressed the data, it is transparently decompressed. If
+        decompression fails, the data is returned as received.
+
         Returns:
             bytes: The message data. This is always a bytestring; if you want
             a text string, call :meth:`bytes.decode`.
         """
+        if self._data is None:
+            data = self._message.data
+            # Data compressed by the publisher is decompressed in the user callback,
+            # and not on the thread reading the stream.
+            compression = self.attributes.get(_compression.COMPRESSION_ATTRIBUTE)
+            if compression:
+                try:
+                    data = _compression.decompress_data(data, compression)
+                except ValueError:
+                    _LOGGER.warning(
+                        "Failed to decompress the data of message %s.",
+                        self.message_id,
+                        exc_info=True,
+                    )
+            self._data = data
         return self._data
 
     @property
@@ -195,16 +239,25 @@ class Message(object):
             datetime.datetime: The date and time that the message was
             published.
         """
+        if self._publish_time is None:
+            publish_time = self._message.publish_time
+            self._publish_time = dt.datetime.fromtimestamp(
+                publish_time.seconds + publish_time.nanos / 1e9, tz=dt.timezone.utc
+            )
         return self._publish_time
 
     @property
     def ordering_key(self) -> str:
         """The ordering key used to publish the message."""
+        if self._ordering_key is None:
+            self._ordering_key = self._message.ordering_key
         return self._ordering_key
 
     @property
     def size(self) -> int:
         """Return the size of the underlying message, in bytes."""
+        if self._size is None:
+            self._size = self._message.ByteSize()
         return self._size
 
     @property
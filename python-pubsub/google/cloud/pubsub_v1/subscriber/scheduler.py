@@ -19,16 +19,28 @@ each message.
 """
 
 import abc
+import asyncio
 import concurrent.futures
+import datetime
+import functools
+import inspect
+import logging
 import queue
+import threading
 import typing
-from typing import Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 import warnings
 
+from google.cloud.pubsub_v1.subscriber import message as message_module
+from google.cloud.pubsub_v1.subscriber._protocol import helper_threads
+
 if typing.TYPE_CHECKING:  # pragma: NO COVER
     from google.cloud import pubsub_v1
 
 
+_LOGGER = logging.getLogger(__name__)
+
+
 class Scheduler(metaclass=abc.ABCMeta):
     """Abstract base class for schedulers.
 
@@ -101,7 +113,7 @@ class ThreadScheduler(Scheduler):
     def __init__(
         self, executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
     ):
-        self._queue: queue.Queue = queue.Queue()
+        self._queue: queue.Queue = helper_threads.BatchQueue()
         if executor is None:
             self._executor = _make_default_thread_pool_executor()
         else:
@@ -168,3 +180,436 @@ class ThreadScheduler(Scheduler):
 
         self._executor.shutdown(wait=await_msg_callbacks)
         return dropped_messages
+
+
+class AsyncioScheduler(Scheduler):
+    """An asyncio-based scheduler. It must not be shared across
+       SubscriberClients.
+
+    This scheduler is useful for I/O-bound message processing with coroutine
+    callbacks, since a single event loop can await many more callbacks at once
+    than a thread pool can run. The callbacks are awaited on the event loop, and
+    regular (non-coroutine) callbacks are called on the event loop thread, thus
+    they must not block.
+
+    Args:
+        loop:
+            An optional event loop to run the callbacks on. The loop must be
+            running in another thread, and it is not stopped on shutdown. If not
+            specified, a new event loop is created and run in a dedicated thread.
+        max_concurrency:
+            The maximum number of callbacks running concurrently. Defaults to 100.
+    """
+
+    def __init__(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        max_concurrency: int = 100,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        self._queue: queue.Queue = helper_threads.BatchQueue()
+        self._max_concurrency = max_concurrency
+
+        # Created on the event loop, some Python versions bind the semaphore to the
+        # current event loop upon creation. Only accessed from the event loop.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running: Set["asyncio.Future"] = set()
+
+        # The callbacks scheduled but not yet dispatched, by a unique token, which
+        # are guarded by _lock, since they are accessed from both threads.
+        self._lock = threading.Lock()
+        self._waiting: Dict[object, Tuple[concurrent.futures.Future, Any]] = {}
+        self._is_shutdown = False
+
+        self._thread: Optional[threading.Thread] = None
+        if loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                name="Thread-AsyncioScheduler", target=self._run_loop
+            )
+            # The dedicated loop thread must not keep the interpreter alive.
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self._loop = loop
+
+    @property
+    def queue(self):
+        """Queue: A thread-safe queue used for communication between callbacks
+        and the scheduling thread."""
+        return self._queue
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def schedule(self, callback: Callable, *args, **kwargs) -> None:
+        """Schedule the callback to be called asynchronously on the event loop.
+
+        Args:
+            callback: The function to call.
+            args: Positional arguments passed to the callback.
+            kwargs: Key-word arguments passed to the callback.
+
+        Returns:
+            None
+        """
+        token = object()
+        with self._lock:
+            if self._is_shutdown:
+                warnings.warn(
+                    "Scheduling a callback after scheduler shutdown.",
+                    category=RuntimeWarning,
+                    stacklevel=2,
+                )
+                return
+
+            future = asyncio.run_coroutine_threadsafe(
+                self._run_callback(token, callback, args, kwargs), self._loop
+            )
+            self._waiting[token] = (future, args[0] if args else None)
+
+    async def _run_callback(
+        self, token: object, callback: Callable, args: tuple, kwargs: dict
+    ) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async with self._semaphore:
+            with self._lock:
+                # The callback was not dispatched before the shutdown.
+                if self._waiting.pop(token, None) is None:
+                    return
+
+            task = asyncio.current_task()
+            assert task is not None
+            self._running.add(task)
+            try:
+                result = callback(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                _LOGGER.exception("Unhandled exception in a scheduled callback.")
+            finally:
+                self._running.discard(task)
+
+    async def _await_running(self) -> None:
+        """Wait for the callbacks currently running."""
+        if self._running:
+            await asyncio.wait(list(self._running))
+
+    def _stop_loop(self, _: concurrent.futures.Future) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def shutdown(
+        self, await_msg_callbacks: bool = False
+    ) -> List["pubsub_v1.subscriber.message.Message"]:
+        """Shut down the scheduler and immediately end all pending callbacks.
+
+        Args:
+            await_msg_callbacks:
+                If ``True``, the method will block until all currently running
+                callbacks are done. If ``False`` (default), the method will not
+                wait for the currently running callbacks to complete.
+
+        Returns:
+            The messages submitted to the scheduler that were not yet dispatched
+            to their callbacks.
+            It is assumed that each message was submitted to the scheduler as the
+            first positional argument to the provided callback.
+        """
+        with self._lock:
+            if self._is_shutdown:
+                return []
+            self._is_shutdown = True
+            waiting, self._waiting = self._waiting, {}
+
+        dropped_messages = []
+        for future, message in waiting.values():
+            future.cancel()
+            dropped_messages.append(message)
+
+        # The running callbacks are left to complete, even if not awaited here. Only
+        # then the dedicated event loop (if any) is stopped.
+        done = asyncio.run_coroutine_threadsafe(self._await_running(), self._loop)
+        if self._thread is not None:
+            done.add_done_callback(self._stop_loop)
+
+        if await_msg_callbacks:
+            done.result()
+            if self._thread is not None:
+                self._thread.join()
+
+        return dropped_messages
+
+
+class _ProcessMessage(object):
+    """A picklable copy of a message, passed to callbacks in worker processes.
+
+    The ack, nack and ack deadline modifications are only recorded, and then
+    applied to the original message in the subscriber process.
+    """
+
+    def __init__(
+        self,
+        ack_id: str,
+        message_id: str,
+        data: bytes,
+        attributes: Dict[str, str],
+        ordering_key: str,
+        publish_time: datetime.datetime,
+        delivery_attempt: Optional[int],
+        size: int,
+    ):
+        self.ack_id = ack_id
+        self.message_id = message_id
+        self.data = data
+        self.attributes = attributes
+        self.ordering_key = ordering_key
+        self.publish_time = publish_time
+        self.delivery_attempt = delivery_attempt
+        self.size = size
+        self._decisions: List[Tuple[str, Optional[int]]] = []
+
+    @classmethod
+    def from_message(
+        cls, message: "pubsub_v1.subscriber.message.Message"
+    ) -> "_ProcessMessage":
+        return cls(
+            ack_id=message.ack_id,
+            message_id=message.message_id,
+            data=message.data,
+            attributes=dict(message.attributes),
+            ordering_key=message.ordering_key,
+            publish_time=message.publish_time,
+            delivery_attempt=message.delivery_attempt,
+            size=message.size,
+        )
+
+    def __repr__(self):
+        return "_ProcessMessage(ack_id={!r}, message_id={!r})".format(
+            self.ack_id, self.message_id
+        )
+
+    def ack(self) -> None:
+        """Acknowledge the message once the callback returns."""
+        self._decisions.append(("ack", None))
+
+    def nack(self) -> None:
+        """Decline to acknowledge the message once the callback returns."""
+        self._decisions.append(("nack", None))
+
+    def modify_ack_deadline(self, seconds: int) -> None:
+        """Reset the message's ack deadline once the callback returns."""
+        self._decisions.append(("modack", seconds))
+
+
+def _is_message_or_batch(item: Any) -> bool:
+    if isinstance(item, list):
+        return bool(item) and all(
+            isinstance(message, message_module.Message) for message in item
+        )
+    return isinstance(item, message_module.Message)
+
+
+def _to_process_messages(item: Any) -> Any:
+    if isinstance(item, list):
+        return [_ProcessMessage.from_message(message) for message in item]
+    return _ProcessMessage.from_message(item)
+
+
+def _run_in_worker(callback: Callable[[Any], Any], item: Any) -> Any:
+    """Run the callback in a worker process, and return the message decisions.
+
+    Args:
+        callback: The user callback.
+        item: A message copy, or a list of them for batch callbacks.
+
+    Returns:
+        The decisions made for the message, or a list of decisions for each of
+        the messages in the batch.
+    """
+    callback(item)
+    if isinstance(item, list):
+        return [message._decisions for message in item]
+    return item._decisions
+
+
+def _apply_decisions(future: concurrent.futures.Future, item: Any) -> None:
+    """Apply the decisions made in a worker process to the original messages.
+
+    If the callback raised an exception, it is re-raised here.
+    """
+    if isinstance(item, list):
+        for message, decisions in zip(item, future.result()):
+            _apply_message_decisions(message, decisions)
+    else:
+        _apply_message_decisions(item, future.result())
+
+
+def _apply_message_decisions(
+    message: "pubsub_v1.subscriber.message.Message",
+    decisions: Sequence[Tuple[str, Optional[int]]],
+) -> None:
+    for decision, seconds in decisions:
+        if decision == "ack":
+            message.ack()
+        elif decision == "nack":
+            message.nack()
+        else:
+            message.modify_ack_deadline(seconds)  # type: ignore[arg-type]
+
+
+class ProcessScheduler(Scheduler):
+    """A process pool-based scheduler. It must not be shared across
+       SubscriberClients.
+
+    This scheduler is useful for CPU-bound message processing, which cannot run
+    in parallel in multiple threads of a single process. The callback passed to
+    :meth:`~.pubsub_v1.subscriber.client.Client.subscribe` is called in a worker
+    process with a picklable copy of the message, thus the callback must be
+    picklable as well (e.g. a module-level function).
+
+    The message copy has the ``ack_id``, ``message_id``, ``data``,
+    ``attributes``, ``ordering_key``, ``publish_time``, ``delivery_attempt`` and
+    ``size`` attributes, and the ``ack()``, ``nack()`` and
+    ``modify_ack_deadline()`` methods. Batch callbacks receive a list of such
+    copies. Once the callback returns, these calls are applied to the original
+    messages in the subscriber process, which also keeps managing the message
+    leases and the flow control. If the callback raises an exception, the
+    messages are nacked, just like with other schedulers.
+
+    Args:
+        executor:
+            An optional process pool executor to use. If not specified, a default
+            one with a worker process per CPU will be created.
+    """
+
+    def __init__(
+        self, executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+    ):
+        self._queue: queue.Queue = helper_threads.BatchQueue()
+        if executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor()
+        else:
+            self._executor = executor
+
+        # The futures of submitted callbacks, and their messages. Guarded by _lock,
+        # since the futures complete in another thread.
+        self._lock = threading.Lock()
+        self._pending: Dict[concurrent.futures.Future, Any] = {}
+
+    @property
+    def queue(self):
+        """Queue: A thread-safe queue used for communication between callbacks
+        and the scheduling thread."""
+        return self._queue
+
+    def schedule(self, callback: Callable, *args, **kwargs) -> None:
+        """Schedule the callback to be called asynchronously in a worker process.
+
+        If the callback is the wrapped user callback scheduled by the subscriber
+        (i.e. a :func:`functools.partial` whose first argument is the user
+        callback, called with a message or a list of messages), only the user
+        callback is called in the worker process, and the wrapper is called with
+        the results in this process. Otherwise, the callback and its arguments
+        must be picklable.
+
+        Args:
+            callback: The function to call.
+            args: Positional arguments passed to the callback.
+            kwargs: Key-word arguments passed to the callback.
+
+        Returns:
+            None
+        """
+        message = args[0] if args else None
+        is_subscriber_callback = (
+            isinstance(callback, functools.partial)
+            and callback.args
+            and len(args) == 1
+            and not kwargs
+            and _is_message_or_batch(message)
+        )
+
+        try:
+            if is_subscriber_callback:
+                future = self._executor.submit(
+                    _run_in_worker,
+                    callback.args[0],  # type: ignore[attr-defined]
+                    _to_process_messages(message),
+                )
+            else:
+                future = self._executor.submit(callback, *args, **kwargs)
+        except RuntimeError:
+            warnings.warn(
+                "Scheduling a callback after executor shutdown.",
+                category=RuntimeWarning,
+                stacklevel=2,
+            )
+            return
+
+        with self._lock:
+            self._pending[future] = message
+
+        if is_subscriber_callback:
+            # Re-create the wrapper around a stand-in for the user callback, which
+            # applies the results of the user callback to the original message.
+            stand_in = functools.partial(_apply_decisions, future)
+            wrapper = functools.partial(
+                callback.func,  # type: ignore[attr-defined]
+                stand_in,
+                *callback.args[1:],  # type: ignore[attr-defined]
+                **callback.keywords,  # type: ignore[attr-defined]
+            )
+            future.add_done_callback(functools.partial(self._on_done, wrapper))
+        else:
+            future.add_done_callback(functools.partial(self._on_done, None))
+
+    def _on_done(
+        self, wrapper: Optional[Callable], future: concurrent.futures.Future
+    ) -> None:
+        with self._lock:
+            message = self._pending.pop(future, None)
+
+        if future.cancelled():
+            return
+
+        if wrapper is not None:
+            wrapper(message)
+        elif future.exception() is not None:
+            _LOGGER.error(
+                "Unhandled exception in a scheduled callback.",
+                exc_info=future.exception(),
+            )
+
+    def shutdown(
+        self, await_msg_callbacks: bool = False
+    ) -> List["pubsub_v1.subscriber.message.Message"]:
+        """Shut down the scheduler and immediately end all pending callbacks.
+
+        Args:
+            await_msg_callbacks:
+                If ``True``, the method will block until all currently executing
+                callbacks are done processing. If ``False`` (default), the
+                method will not wait for the currently running callbacks to complete.
+
+        Returns:
+            The messages submitted to the scheduler that were not yet dispatched
+            to their callbacks.
+            It is assumed that each message was submitted to the scheduler as the
+            first positional argument to the provided callback.
+        """
+        with self._lock:
+            pending = list(self._pending.items())
+
+        # Callbacks already sent to a worker process can no longer be cancelled.
+        dropped_messages = [message for future, message in pending if future.cancel()]
+
+        self._executor.shutdown(wait=await_msg_callbacks)
+        return dropped_messages
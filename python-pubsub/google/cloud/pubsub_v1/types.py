@@ -19,7 +19,7 @@ import enum
 import inspect
 import sys
 import typing
-from typing import Dict, NamedTuple, Union
+from typing import Dict, NamedTuple, Optional, Union
 
 import proto  # type: ignore
 
@@ -98,6 +98,54 @@ class BatchSettings(NamedTuple):
     )
 
 
+class AdaptiveBatching(NamedTuple):
+    """The bounds for adapting the batch settings to the observed publish latency.
+
+    With adaptive batching, the publisher client adjusts the maximum number of
+    messages per batch and the maximum batch latency after every publish request,
+    similarly to TCP congestion control. Batches grow while publish requests
+    complete within the target latency and batches are full or wait for a free
+    commit worker, and shrink multiplicatively once publish requests get slower
+    than the target latency. The maximum latency shrinks while batches are
+    committed before they fill up.
+
+    Attributes:
+        min_messages (int):
+            The lower bound of the maximum number of messages per batch.
+            Defaults to 1.
+        max_messages (int):
+            The upper bound of the maximum number of messages per batch.
+            Defaults to 1000.
+        min_latency (float):
+            The lower bound of the maximum batch latency in seconds.
+            Defaults to 1ms.
+        max_latency (float):
+            The upper bound of the maximum batch latency in seconds.
+            Defaults to 100ms.
+        target_commit_latency (float):
+            The publish request duration in seconds above which batches are
+            considered too large. Defaults to 250ms.
+    """
+
+    min_messages: int = 1
+    """The lower bound of the maximum number of messages per batch."""
+
+    max_messages: int = 1000
+    """The upper bound of the maximum number of messages per batch."""
+
+    min_latency: float = 0.001  # 1 ms
+    """The lower bound of the maximum batch latency in seconds."""
+
+    max_latency: float = 0.1  # 100 ms
+    """The upper bound of the maximum batch latency in seconds."""
+
+    target_commit_latency: float = 0.25  # 250 ms
+    (
+        "The publish request duration in seconds above which batches are "
+        "considered too large."
+    )
+
+
 class LimitExceededBehavior(str, enum.Enum):
     """The possible actions when exceeding the publish flow control limits."""
 
@@ -119,6 +167,12 @@ class PublishFlowControl(NamedTuple):
         limit_exceeded_behavior (LimitExceededBehavior):
             The action to take when publish flow control limits are exceeded.
             Defaults to LimitExceededBehavior.IGNORE.
+        fair (bool):
+            Whether the threads blocked on publishing are admitted in FIFO order
+            once there is enough capacity. Admitting them in no particular order
+            is cheaper when many threads are blocked, but larger messages might
+            wait longer. Only relevant with LimitExceededBehavior.BLOCK.
+            Defaults to true.
     """
 
     message_limit: int = 10 * BatchSettings.__new__.__defaults__[2]  # type: ignore
@@ -130,6 +184,47 @@ class PublishFlowControl(NamedTuple):
     limit_exceeded_behavior: LimitExceededBehavior = LimitExceededBehavior.IGNORE
     """The action to take when publish flow control limits are exceeded."""
 
+    fair: bool = True
+    (
+        "Whether the threads blocked on publishing are admitted in FIFO order "
+        "once there is enough capacity."
+    )
+
+
+class CompressionAlgorithm(str, enum.Enum):
+    """The algorithms available for compressing the published message data."""
+
+    ZLIB = "zlib"
+    LZMA = "lzma"
+
+
+class PublishCompression(NamedTuple):
+    """The settings for compressing the data of published messages.
+
+    Compressed messages are marked with a reserved attribute, and are
+    transparently decompressed by the subscriber client.
+
+    Attributes:
+        algorithm (CompressionAlgorithm):
+            The compression algorithm to use. Defaults to
+            CompressionAlgorithm.ZLIB.
+        threshold (int):
+            The minimum size of the message data in bytes for it to be compressed.
+            Defaults to 1 KiB.
+        level (Optional[int]):
+            The compression level (zlib) or preset (lzma). Defaults to the
+            algorithm's own default.
+    """
+
+    algorithm: CompressionAlgorithm = CompressionAlgorithm.ZLIB
+    """The compression algorithm to use."""
+
+    threshold: int = 1024  # 1 KiB
+    """The minimum size of the message data in bytes for it to be compressed."""
+
+    level: Optional[int] = None
+    """The compression level (zlib) or preset (lzma)."""
+
 
 # Define the default publisher options.
 #
@@ -151,6 +246,23 @@ class PublisherOptions(NamedTuple):
         timeout (OptionalTimeout):
             Timeout settings for message publishing by the client. It should be
             compatible with :class:`~.pubsub_v1.types.TimeoutType`.
+        max_commit_workers (int):
+            The maximum number of worker threads committing batches, which is also
+            the maximum number of publish requests in flight at any time.
+            Defaults to 32.
+        compression (Optional[PublishCompression]):
+            Compression settings for the published message data. Message data is
+            not compressed by default.
+        adaptive_batching (Optional[AdaptiveBatching]):
+            The bounds for adapting the batch settings to the observed publish
+            latency. Batch settings are static by default. Not supported by the
+            asyncio publisher client.
+        lightweight_futures (bool):
+            Whether to return a :class:`~.pubsub_v1.publisher.futures.MessageFuture`
+            from publishing calls, which shares its synchronization state with the
+            other messages in the batch. These futures cannot be used with the
+            :mod:`concurrent.futures` module functions. Defaults to false. Not
+            supported by the asyncio publisher client.
     """
 
     enable_message_ordering: bool = False
@@ -174,6 +286,30 @@ class PublisherOptions(NamedTuple):
         "compatible with :class:`~.pubsub_v1.types.TimeoutType`."
     )
 
+    max_commit_workers: int = 32
+    (
+        "The maximum number of worker threads committing batches, which is also "
+        "the maximum number of publish requests in flight at any time."
+    )
+
+    compression: Optional[PublishCompression] = None
+    (
+        "Compression settings for the published message data. Message data is not "
+        "compressed by default."
+    )
+
+    adaptive_batching: Optional[AdaptiveBatching] = None
+    (
+        "The bounds for adapting the batch settings to the observed publish "
+        "latency. Batch settings are static by default."
+    )
+
+    lightweight_futures: bool = False
+    (
+        "Whether to return lightweight futures from publishing calls, which share "
+        "their synchronization state with the other messages in the batch."
+    )
+
 
 # Define the type class and default values for flow control settings.
 #
@@ -203,6 +339,24 @@ class FlowControl(NamedTuple):
             Bounds the delay before a message redelivery if the subscriber
             fails to extend the deadline. Must be between 10 and 600 (inclusive). Ignored
             if set to 0.
+        ack_time_half_life (Optional[float]):
+            The time in seconds after which a past time-to-acknowledge counts half
+            as much when estimating the lease deadline, so that the deadline follows
+            a changing workload. By default, all past times count equally.
+        high_watermark (float):
+            The load at which the message stream is paused, as a fraction of the
+            ``max_messages`` or ``max_bytes`` limit, whichever is closer. Received
+            messages are also only delivered to the callback below this load.
+            Defaults to 1.0.
+        low_watermark (float):
+            The load below which a paused message stream is resumed. A wider gap
+            to ``high_watermark`` pauses and resumes the stream less often, in
+            exchange for bigger swings in the number of messages being processed.
+            Defaults to 0.8.
+        max_release_per_drop (int):
+            The maximum number of messages on hold that are delivered to the
+            callback each time processed messages are removed from the lease
+            management, to smooth out the delivery. Unlimited if set to 0 (default).
     """
 
     max_bytes: int = 100 * 1024 * 1024  # 100 MiB
@@ -238,6 +392,29 @@ class FlowControl(NamedTuple):
         "if set to 0."
     )
 
+    ack_time_half_life: Optional[float] = None
+    (
+        "The time in seconds after which a past time-to-acknowledge counts half as "
+        "much when estimating the lease deadline. By default, all past times count "
+        "equally."
+    )
+
+    high_watermark: float = 1.0
+    (
+        "The load at which the message stream is paused, as a fraction of the "
+        "max_messages or max_bytes limit, whichever is closer."
+    )
+
+    low_watermark: float = 0.8
+    "The load below which a paused message stream is resumed."
+
+    max_release_per_drop: int = 0  # unlimited by default
+    (
+        "The maximum number of messages on hold that are delivered to the callback "
+        "each time processed messages are removed from the lease management. "
+        "Unlimited if set to 0."
+    )
+
 
 # The current api core helper does not find new proto messages of type proto.Message,
 # thus we need our own helper. Adjusted from
@@ -277,8 +454,11 @@ _shared_modules = [
 _local_modules = [pubsub_gapic_types]
 
 names = [
+    "AdaptiveBatching",
     "BatchSettings",
+    "CompressionAlgorithm",
     "LimitExceededBehavior",
+    "PublishCompression",
     "PublishFlowControl",
     "PublisherOptions",
     "FlowControl",
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+import pathlib
+
+import nox
+
+
+PERFORMANCE_TEST_PYTHON_VERSIONS = ["3.8"]
+
+CURRENT_DIRECTORY = pathlib.Path(__file__).parent.absolute()
+REPO_ROOT_DIRECTORY = CURRENT_DIRECTORY.parent.parent
+
+nox.options.sessions = ["performance"]
+
+# Error if a python version is missing
+nox.options.error_on_missing_interpreters = True
+
+
+@nox.session(python=PERFORMANCE_TEST_PYTHON_VERSIONS)
+def performance(session):
+    """Run the performance test suite."""
+    # Install all test dependencies, then install this package into the
+    # virtualenv's dist-packages.
+    session.install("mock", "pytest")
+    session.install("-e", str(REPO_ROOT_DIRECTORY))
+
+    file_path = f"perf_{session.python}_sponge_log.xml"
+    session.run(
+        "py.test",
+        "-s",
+        f"--junitxml={file_path}",
+        str(CURRENT_DIRECTORY),
+        *session.posargs,
+    )
@@ -0,0 +1,31 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A load-generation harness for the streaming pull of the subscriber.
+
+The harness serves messages from a fake subscriber service in the same
+process, so that runs are deterministic and need no network or project.
+"""
+
+from subscriber_benchmark.harness import SCENARIOS
+from subscriber_benchmark.harness import Scenario
+from subscriber_benchmark.harness import run_scenario
+from subscriber_benchmark.harness import save_results
+
+__all__ = (
+    "SCENARIOS",
+    "Scenario",
+    "run_scenario",
+    "save_results",
+)
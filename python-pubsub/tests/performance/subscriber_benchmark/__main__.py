@@ -0,0 +1,73 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run the subscriber benchmark scenarios.
+
+Run from the ``tests/performance`` directory::
+
+    python -m subscriber_benchmark --output results.json
+"""
+
+import argparse
+
+from subscriber_benchmark import harness
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output",
+        default="subscriber_benchmark.json",
+        help="The JSON file the results are written to.",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[scenario.name for scenario in harness.SCENARIOS],
+        help="A scenario to run, can be repeated. Runs all scenarios by default.",
+    )
+    parser.add_argument(
+        "--num-messages",
+        type=int,
+        help="Override the number of messages of the scenarios.",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for scenario in harness.SCENARIOS:
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        if args.num_messages:
+            scenario = scenario._replace(num_messages=args.num_messages)
+
+        result = harness.run_scenario(scenario)
+        latency = result["ack_latency_seconds"]
+        print(
+            "{}: {:.0f} messages/s, ack latency p50 {:.4f}s p99 {:.4f}s, "
+            "{} threads, {:.1f} MiB peak".format(
+                scenario.name,
+                result["throughput_messages_per_second"],
+                latency["p50"],
+                latency["p99"],
+                result["max_threads"],
+                result["peak_memory_bytes"] / 2**20,
+            )
+        )
+        results.append(result)
+
+    harness.save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
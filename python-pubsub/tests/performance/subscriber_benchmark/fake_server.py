@@ -0,0 +1,251 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An in-process fake of the subscriber service of the Pub/Sub API."""
+
+import collections
+import concurrent.futures
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Sequence, Set, Tuple
+
+import grpc
+from google.protobuf import any_pb2
+from google.protobuf import empty_pb2
+from google.rpc import code_pb2
+from google.rpc import error_details_pb2
+from google.rpc import status_pb2
+from grpc_status import rpc_status
+
+from google.pubsub_v1 import types as gapic_types
+
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVER_THREAD_PREFIX = "FakeSubscriberServer"
+
+_SERVICE_NAME = "google.pubsub.v1.Subscriber"
+
+# Like the subscriber transport, do not limit the size of the messages, so that
+# responses of large messages can be sent.
+CHANNEL_OPTIONS = (
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+)
+
+# How long the stream handlers wait for messages or capacity before checking
+# whether the stream is still active.
+_POLL_INTERVAL = 0.1
+
+
+class FakeSubscriberServicer(object):
+    """Serve a fixed list of messages over streaming pulls.
+
+    The servicer sends every message exactly once, in order, in responses of
+    up to ``response_size`` messages, and keeps at most
+    ``max_outstanding_messages`` unacknowledged messages on each stream, as
+    requested by the client in the initial request. Messages whose ack
+    deadline expires are not redelivered.
+
+    With exactly-once delivery, the first ack RPC that contains one of the
+    ``fail_ack_ids`` fails with a transient error for all of its ack IDs, so
+    that the client has to retry them.
+
+    Args:
+        messages: The messages to deliver.
+        response_size: The maximum number of messages in a response.
+        exactly_once: Whether the subscription has exactly-once delivery.
+        fail_ack_ids: The ack IDs whose first ack fails.
+    """
+
+    def __init__(
+        self,
+        messages: Sequence[gapic_types.PubsubMessage],
+        response_size: int,
+        exactly_once: bool = False,
+        fail_ack_ids: Sequence[str] = (),
+    ):
+        self._response_size = response_size
+        self._exactly_once = exactly_once
+        self._fail_ack_ids: Set[str] = set(fail_ack_ids)
+
+        # Guards all state below, and is notified when messages are acked.
+        self._condition = threading.Condition()
+        self._pending = collections.deque(
+            ("ack-{}".format(message.message_id), message) for message in messages
+        )
+        self._stream_ids = itertools.count()
+        # The send time and the stream of each unacked message.
+        self._outstanding: Dict[str, Tuple[float, int]] = {}
+        self._outstanding_per_stream: Dict[int, int] = collections.Counter()
+        self._acked: Set[str] = set()
+
+        self.ack_latencies: List[float] = []
+        self.duplicate_acks = 0
+        self.failed_ack_rpcs = 0
+        self.modack_rpcs = 0
+        self.streams_opened = 0
+        self.all_acked = threading.Event()
+        if not self._pending:
+            self.all_acked.set()
+
+    def streaming_pull(self, request_iterator, context):
+        initial_request = next(request_iterator)
+        max_outstanding = initial_request.max_outstanding_messages or float("inf")
+
+        with self._condition:
+            stream_id = next(self._stream_ids)
+            self.streams_opened += 1
+
+        # The client keeps the request stream open for heartbeats and stream
+        # acks, which need to be drained for the stream to make progress.
+        threading.Thread(
+            name="{}-Requests-{}".format(SERVER_THREAD_PREFIX, stream_id),
+            target=self._drain_requests,
+            args=(request_iterator,),
+            daemon=True,
+        ).start()
+
+        properties = gapic_types.StreamingPullResponse.SubscriptionProperties(
+            exactly_once_delivery_enabled=self._exactly_once
+        )
+        while context.is_active():
+            with self._condition:
+                capacity = max_outstanding - self._outstanding_per_stream[stream_id]
+                if not self._pending or capacity < 1:
+                    self._condition.wait(_POLL_INTERVAL)
+                    continue
+
+                now = time.perf_counter()
+                received_messages = []
+                while self._pending and len(received_messages) < min(
+                    capacity, self._response_size
+                ):
+                    ack_id, message = self._pending.popleft()
+                    self._outstanding[ack_id] = (now, stream_id)
+                    received_messages.append(
+                        gapic_types.ReceivedMessage(ack_id=ack_id, message=message)
+                    )
+                self._outstanding_per_stream[stream_id] += len(received_messages)
+
+            yield gapic_types.StreamingPullResponse(
+                received_messages=received_messages,
+                subscription_properties=properties,
+            )
+
+    def _drain_requests(self, request_iterator):
+        try:
+            for _ in request_iterator:
+                pass
+        except Exception:
+            _LOGGER.debug("Request stream ended with an error.", exc_info=True)
+
+    def acknowledge(self, request, context):
+        ack_ids = list(request.ack_ids)
+
+        with self._condition:
+            if self._exactly_once and self._fail_ack_ids.intersection(ack_ids):
+                self._fail_ack_ids.difference_update(ack_ids)
+                self.failed_ack_rpcs += 1
+                fail = True
+            else:
+                fail = False
+                self._record_acks(ack_ids)
+
+        if fail:
+            context.abort_with_status(_transient_ack_failure(ack_ids))
+        return empty_pb2.Empty()
+
+    def _record_acks(self, ack_ids: Sequence[str]) -> None:
+        now = time.perf_counter()
+        for ack_id in ack_ids:
+            if ack_id in self._acked:
+                self.duplicate_acks += 1
+                continue
+            sent_at, stream_id = self._outstanding.pop(ack_id)
+            self._outstanding_per_stream[stream_id] -= 1
+            self._acked.add(ack_id)
+            self.ack_latencies.append(now - sent_at)
+
+        self._condition.notify_all()
+        if not self._pending and not self._outstanding:
+            self.all_acked.set()
+
+    def modify_ack_deadline(self, request, context):
+        with self._condition:
+            self.modack_rpcs += 1
+        return empty_pb2.Empty()
+
+
+def _transient_ack_failure(ack_ids: Sequence[str]) -> grpc.Status:
+    """Return the status of an ack RPC whose ack IDs should all be retried."""
+    info = error_details_pb2.ErrorInfo(
+        reason="EXACTLY_ONCE_ACKID_FAILURE",
+        domain="pubsub.googleapis.com",
+        metadata={ack_id: "TRANSIENT_FAILURE_UNORDERED_ACK_ID" for ack_id in ack_ids},
+    )
+    detail = any_pb2.Any()
+    detail.Pack(info)
+    return rpc_status.to_status(
+        status_pb2.Status(
+            code=code_pb2.FAILED_PRECONDITION,
+            message="Some acknowledgements failed.",
+            details=[detail],
+        )
+    )
+
+
+def start_server(
+    servicer: FakeSubscriberServicer, max_workers: int = 32
+) -> Tuple[grpc.Server, str]:
+    """Start serving the servicer on a local port.
+
+    Every open stream occupies one of the ``max_workers`` threads.
+
+    Args:
+        servicer: The servicer to serve.
+        max_workers: The maximum number of RPCs handled at once.
+
+    Returns:
+        The started server and its address.
+    """
+    handler = grpc.method_handlers_generic_handler(
+        _SERVICE_NAME,
+        {
+            "StreamingPull": grpc.stream_stream_rpc_method_handler(
+                servicer.streaming_pull,
+                request_deserializer=gapic_types.StreamingPullRequest.deserialize,
+                response_serializer=gapic_types.StreamingPullResponse.serialize,
+            ),
+            "Acknowledge": grpc.unary_unary_rpc_method_handler(
+                servicer.acknowledge,
+                request_deserializer=gapic_types.AcknowledgeRequest.deserialize,
+                response_serializer=empty_pb2.Empty.SerializeToString,
+            ),
+            "ModifyAckDeadline": grpc.unary_unary_rpc_method_handler(
+                servicer.modify_ack_deadline,
+                request_deserializer=gapic_types.ModifyAckDeadlineRequest.deserialize,
+                response_serializer=empty_pb2.Empty.SerializeToString,
+            ),
+        },
+    )
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix=SERVER_THREAD_PREFIX
+    )
+    server = grpc.server(executor, handlers=[handler], options=CHANNEL_OPTIONS)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, "localhost:{}".format(port)
@@ -0,0 +1,290 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run load scenarios against the subscriber and collect their results."""
+
+import json
+import platform
+import random
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, NamedTuple, Sequence
+
+import grpc
+
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.subscriber import client as subscriber_client
+from google.pubsub_v1 import types as gapic_types
+from google.pubsub_v1.services.subscriber.transports import SubscriberGrpcTransport
+
+from subscriber_benchmark import fake_server
+
+
+SUBSCRIPTION = "projects/benchmark/subscriptions/benchmark"
+
+CALLBACK_LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential")
+
+# How often the number of threads is sampled, in seconds.
+_THREAD_SAMPLE_INTERVAL = 0.01
+
+
+class Scenario(NamedTuple):
+    """The load put on the subscriber in a benchmark run.
+
+    All random choices are derived from ``seed``, so that runs of the same
+    scenario deliver the same messages, with the same callback latencies and
+    the same injected errors.
+    """
+
+    name: str = "default"
+    """The name of the scenario in the results."""
+
+    num_messages: int = 10000
+    """The number of messages to deliver."""
+
+    response_size: int = 100
+    """The maximum number of messages in a streaming pull response."""
+
+    message_size: int = 100
+    """The size of the message data, in bytes."""
+
+    num_ordering_keys: int = 0
+    """The number of distinct ordering keys. With 0, messages have no key."""
+
+    hot_key_share: float = 0.0
+    """The share of the messages that have the first ordering key, the rest is
+    spread evenly across all keys."""
+
+    callback_latency: str = "constant"
+    """The distribution of the callback latencies, one of
+    ``CALLBACK_LATENCY_DISTRIBUTIONS``."""
+
+    mean_callback_latency: float = 0.0
+    """The mean latency of the callback, in seconds."""
+
+    exactly_once: bool = False
+    """Whether the subscription has exactly-once delivery."""
+
+    ack_failure_rate: float = 0.0
+    """With exactly-once delivery, the share of the messages whose first ack
+    fails with a transient error."""
+
+    num_streams: int = 1
+    """The number of streams to pull from."""
+
+    flow_control: types.FlowControl = types.FlowControl()
+    """The flow control settings of the subscriber."""
+
+    seed: int = 0
+    """The seed of the random choices."""
+
+    timeout: float = 300.0
+    """How long to wait for all messages to be acked, in seconds."""
+
+
+SCENARIOS = (
+    Scenario(name="baseline"),
+    Scenario(name="large_responses", response_size=1000),
+    Scenario(name="large_messages", num_messages=2000, message_size=64 * 1024),
+    Scenario(name="ordering_keys", num_ordering_keys=100),
+    Scenario(name="hot_ordering_key", num_ordering_keys=100, hot_key_share=0.5),
+    Scenario(
+        name="slow_callbacks",
+        num_messages=2000,
+        callback_latency="exponential",
+        mean_callback_latency=0.005,
+    ),
+    Scenario(name="exactly_once", exactly_once=True, ack_failure_rate=0.01),
+    Scenario(name="multiple_streams", num_streams=4),
+)
+
+
+def _ordering_keys(scenario: Scenario, rng: random.Random) -> List[str]:
+    if not scenario.num_ordering_keys:
+        return [""] * scenario.num_messages
+
+    keys = ["key-{}".format(i) for i in range(scenario.num_ordering_keys)]
+    return [
+        keys[0] if rng.random() < scenario.hot_key_share else rng.choice(keys)
+        for _ in range(scenario.num_messages)
+    ]
+
+
+def _callback_latencies(scenario: Scenario, rng: random.Random) -> List[float]:
+    mean = scenario.mean_callback_latency
+    if scenario.callback_latency == "constant":
+        return [mean] * scenario.num_messages
+    if scenario.callback_latency == "uniform":
+        return [rng.uniform(0, 2 * mean) for _ in range(scenario.num_messages)]
+    if scenario.callback_latency == "exponential":
+        return [
+            rng.expovariate(1 / mean) if mean else 0.0
+            for _ in range(scenario.num_messages)
+        ]
+    raise ValueError(
+        "callback_latency must be one of {}, got {!r}.".format(
+            CALLBACK_LATENCY_DISTRIBUTIONS, scenario.callback_latency
+        )
+    )
+
+
+def _percentile(sorted_values: Sequence[float], percent: int) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, len(sorted_values) * percent // 100)
+    return sorted_values[index]
+
+
+def _client_threads(baseline: Sequence[int]) -> int:
+    return sum(
+        1
+        for thread in threading.enumerate()
+        if thread.ident not in baseline
+        and not thread.name.startswith(fake_server.SERVER_THREAD_PREFIX)
+    )
+
+
+def _scenario_dict(scenario: Scenario) -> Dict[str, Any]:
+    values = scenario._asdict()
+    values["flow_control"] = scenario.flow_control._asdict()
+    return values
+
+
+def run_scenario(scenario: Scenario) -> Dict[str, Any]:
+    """Deliver the messages of a scenario to a subscriber and measure it.
+
+    The subscriber pulls from a fake server in the same process, so the
+    measured memory includes the server's allocations. The thread count only
+    includes the threads started by the subscriber.
+
+    Args:
+        scenario: The scenario to run.
+
+    Returns:
+        The results of the run, which can be serialized as JSON.
+    """
+    rng = random.Random(scenario.seed)
+    data = b"x" * scenario.message_size
+    messages = [
+        gapic_types.PubsubMessage(data=data, message_id=str(i), ordering_key=key)
+        for i, key in enumerate(_ordering_keys(scenario, rng))
+    ]
+    latencies = _callback_latencies(scenario, rng)
+    fail_ack_ids = [
+        "ack-{}".format(i)
+        for i in range(scenario.num_messages)
+        if rng.random() < scenario.ack_failure_rate
+    ]
+
+    def callback(message):
+        latency = latencies[int(message.message_id)]
+        if latency:
+            time.sleep(latency)
+        message.ack()
+
+    servicer = fake_server.FakeSubscriberServicer(
+        messages,
+        scenario.response_size,
+        exactly_once=scenario.exactly_once,
+        fail_ack_ids=fail_ack_ids,
+    )
+    server, address = fake_server.start_server(
+        servicer, max_workers=scenario.num_streams + 16
+    )
+
+    baseline = {thread.ident for thread in threading.enumerate()}
+    max_threads = 0
+    sampling = threading.Event()
+
+    def sample_threads():
+        nonlocal max_threads
+        while not sampling.wait(_THREAD_SAMPLE_INTERVAL):
+            max_threads = max(max_threads, _client_threads(baseline))
+
+    sampler = threading.Thread(
+        name="{}-Sampler".format(fake_server.SERVER_THREAD_PREFIX),
+        target=sample_threads,
+        daemon=True,
+    )
+    sampler.start()
+    tracemalloc.start()
+    try:
+        client = subscriber_client.Client(
+            transport=SubscriberGrpcTransport(
+                channel=grpc.insecure_channel(
+                    address, options=fake_server.CHANNEL_OPTIONS
+                )
+            )
+        )
+        start = time.perf_counter()
+        future = client.subscribe(
+            SUBSCRIPTION,
+            callback,
+            flow_control=scenario.flow_control,
+            num_streams=scenario.num_streams,
+        )
+        completed = servicer.all_acked.wait(scenario.timeout)
+        elapsed = time.perf_counter() - start
+
+        subscriber_metrics = future.metrics()
+        future.cancel()
+        future.result(timeout=scenario.timeout)
+        client.close()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        sampling.set()
+        sampler.join()
+        server.stop(grace=None)
+
+    ack_latencies = sorted(servicer.ack_latencies)
+    return {
+        "scenario": _scenario_dict(scenario),
+        "completed": completed,
+        "elapsed_seconds": elapsed,
+        "messages_acked": len(ack_latencies),
+        "throughput_messages_per_second": len(ack_latencies) / elapsed,
+        "ack_latency_seconds": {
+            "p50": _percentile(ack_latencies, 50),
+            "p90": _percentile(ack_latencies, 90),
+            "p99": _percentile(ack_latencies, 99),
+            "max": ack_latencies[-1] if ack_latencies else 0.0,
+        },
+        "duplicate_acks": servicer.duplicate_acks,
+        "failed_ack_rpcs": servicer.failed_ack_rpcs,
+        "modack_rpcs": servicer.modack_rpcs,
+        "streams_opened": servicer.streams_opened,
+        "max_threads": max_threads,
+        "peak_memory_bytes": peak_memory,
+        "subscriber_metrics": subscriber_metrics,
+    }
+
+
+def save_results(results: Sequence[Dict[str, Any]], path: str) -> None:
+    """Write the results of benchmark runs to a JSON file.
+
+    Args:
+        results: The results returned by :func:`run_scenario`.
+        path: The path of the file.
+    """
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python_version": platform.python_version(),
+        "grpc_version": grpc.__version__,
+        "pubsub_version": subscriber_client.__version__,
+        "results": list(results),
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
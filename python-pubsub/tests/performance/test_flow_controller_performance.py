@@ -0,0 +1,89 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import threading
+import time
+import unittest
+
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher.flow_controller import FlowController
+from google.pubsub_v1 import types as gapic_types
+
+
+def _wait_for_blocked_threads(flow_controller, count, timeout=60):
+    """Wait until the given number of threads is blocked on adding a message."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with flow_controller._operational_lock:
+            blocked = len(flow_controller._waiting) + flow_controller._unordered_waiters
+        if blocked >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("Threads did not block on adding messages in time.")
+
+
+class TestFlowControllerPerformance(unittest.TestCase):
+    def test_many_blocked_threads(self, num_threads=1000, message_limit=10):
+        """
+        Compare admitting many threads blocked on publish flow control in FIFO
+        order against admitting them in no particular order.
+        """
+
+        def run(fair):
+            settings = types.PublishFlowControl(
+                message_limit=message_limit,
+                byte_limit=10 * 1000 * 1000,
+                limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+                fair=fair,
+            )
+            flow_controller = FlowController(settings)
+            message = gapic_types.PubsubMessage(data=b"x" * 100)
+            admitted: queue.Queue = queue.Queue()
+
+            def produce():
+                flow_controller.add(message)
+                admitted.put(message)
+
+            for _ in range(message_limit):
+                flow_controller.add(message)
+
+            threads = [
+                threading.Thread(target=produce, daemon=True)
+                for _ in range(num_threads)
+            ]
+            for thread in threads:
+                thread.start()
+            _wait_for_blocked_threads(flow_controller, num_threads)
+
+            # Release messages as fast as the blocked threads get admitted.
+            start = time.perf_counter()
+            for _ in range(message_limit):
+                flow_controller.release(message)
+            for _ in range(num_threads):
+                flow_controller.release(admitted.get(timeout=60))
+            elapsed = time.perf_counter() - start
+
+            for thread in threads:
+                thread.join()
+            self.assertEqual(flow_controller._message_count, 0)
+            return elapsed
+
+        fair_time = run(fair=True)
+        unfair_time = run(fair=False)
+
+        print()
+        print(f"Admitting {num_threads} blocked threads ({message_limit} at a time)")
+        print(f"\tFIFO admission:      {fair_time:.3f}s")
+        print(f"\tUnordered admission: {unfair_time:.3f}s")
@@ -0,0 +1,219 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import threading
+import time
+import tracemalloc
+import unittest
+
+import mock
+
+import google.auth.credentials
+from google.cloud.pubsub_v1 import publisher
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher import client as client_module
+from google.cloud.pubsub_v1.publisher._batch import thread
+from google.pubsub_v1 import types as gapic_types
+
+
+def _make_messages():
+    """Return messages covering a range of data, attribute and key shapes."""
+    datas = [b"", b"x" * 10, b"x" * 1000, b"x" * 100000]
+    attributes = [
+        {},
+        {"key": "value"},
+        {f"key_{i}": "value" * 10 for i in range(20)},
+    ]
+    ordering_keys = ["", "some-ordering-key"]
+    return [
+        gapic_types.PubsubMessage(data=data, attributes=attrs, ordering_key=key)
+        for data, attrs, key in itertools.product(datas, attributes, ordering_keys)
+    ]
+
+
+def _request_byte_size(message):
+    """The size computation used before incremental size accounting."""
+    return gapic_types.PublishRequest(messages=[message])._pb.ByteSize()
+
+
+def _make_client(**kwargs):
+    """Create a publisher client whose publish RPCs succeed immediately."""
+    creds = mock.Mock(spec=google.auth.credentials.Credentials)
+    client = publisher.Client(credentials=creds, **kwargs)
+
+    def gapic_publish(topic, messages, retry, timeout):
+        return gapic_types.PublishResponse(message_ids=["0"] * len(messages))
+
+    client._gapic_publish = gapic_publish
+    return client
+
+
+def _time_it(func, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            func(message)
+    return time.perf_counter() - start
+
+
+class TestPublisherPerformance(unittest.TestCase):
+    def test_message_size_accounting(self, rounds=2000):
+        """
+        Compare the per-message size computation in Batch.publish() against
+        building a throwaway PublishRequest and calling ByteSize() on it.
+        """
+        messages = _make_messages()
+        for message in messages:
+            self.assertEqual(
+                thread._framed_message_size(message), _request_byte_size(message)
+            )
+
+        request_time = _time_it(_request_byte_size, messages, rounds)
+        framed_time = _time_it(thread._framed_message_size, messages, rounds)
+
+        total = rounds * len(messages)
+        print()
+        print(f"Message size accounting ({total} messages)")
+        print(f"\tPublishRequest.ByteSize(): {request_time:.3f}s")
+        print(f"\t_framed_message_size():    {framed_time:.3f}s")
+        print(f"\tSpeedup: {request_time / framed_time:.1f}x")
+
+    def test_publish_many(self, num_messages=20000):
+        """
+        Compare publishing pre-built records one by one against publish_many().
+        """
+        records = [(b"x" * 100, {"key": "value"}, "") for _ in range(num_messages)]
+        batch_settings = types.BatchSettings(max_messages=1000)
+        publisher_options = types.PublisherOptions(
+            flow_control=types.PublishFlowControl(
+                message_limit=num_messages,
+                limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+            )
+        )
+
+        client = _make_client(
+            batch_settings=batch_settings, publisher_options=publisher_options
+        )
+        start = time.perf_counter()
+        for data, attrs, ordering_key in records:
+            client.publish("topic", data, ordering_key=ordering_key, **attrs)
+        single_time = time.perf_counter() - start
+        client.stop()
+
+        client = _make_client(
+            batch_settings=batch_settings, publisher_options=publisher_options
+        )
+        start = time.perf_counter()
+        futures = client.publish_many("topic", records)
+        bulk_time = time.perf_counter() - start
+        client.stop()
+
+        print()
+        print(f"Publishing {num_messages} messages")
+        print(f"\tpublish():      {single_time:.3f}s")
+        print(f"\tpublish_many(): {bulk_time:.3f}s")
+        self.assertEqual(len(futures), num_messages)
+        self.assertTrue(all(future.result(timeout=10) == "0" for future in futures))
+
+    def test_lightweight_futures(self, num_messages=50000):
+        """
+        Compare publishing and resolving the futures of many messages with the
+        default futures and with lightweight futures.
+        """
+        records = [(b"x" * 100, None, "") for _ in range(num_messages)]
+        batch_settings = types.BatchSettings(max_messages=1000)
+
+        results = {}
+        for lightweight in (False, True):
+            client = _make_client(
+                batch_settings=batch_settings,
+                publisher_options=types.PublisherOptions(
+                    lightweight_futures=lightweight
+                ),
+            )
+            tracemalloc.start()
+            start = time.perf_counter()
+            futures = client.publish_many("topic", records)
+            client._commit_sequencers()
+            message_ids = [future.result(timeout=10) for future in futures]
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            client.stop()
+
+            self.assertEqual(message_ids, ["0"] * num_messages)
+            results[lightweight] = (elapsed, peak)
+
+        print()
+        print(f"Publishing {num_messages} messages and waiting for the results")
+        for lightweight, label in ((False, "Future"), (True, "MessageFuture")):
+            elapsed, peak = results[lightweight]
+            print(f"\t{label + ':':15} {elapsed:.3f}s, peak {peak / 2**20:.1f} MiB")
+
+    def test_concurrent_publish_to_ordering_keys(
+        self, num_threads=(1, 2, 4, 8), num_messages=5000
+    ):
+        """
+        Compare concurrent publishing to distinct ordering keys with striped
+        sequencer locks against a single lock shared by all sequencers.
+        """
+        batch_settings = types.BatchSettings(max_messages=100)
+        publisher_options = types.PublisherOptions(enable_message_ordering=True)
+
+        def run(threads, stripes):
+            # A single stripe serializes all publishes like a client-wide lock.
+            with mock.patch.object(client_module, "_SEQUENCER_LOCK_STRIPES", stripes):
+                return publish_concurrently(threads)
+
+        def publish_concurrently(threads):
+            client = _make_client(
+                batch_settings=batch_settings, publisher_options=publisher_options
+            )
+            results = [None] * threads
+
+            def produce(index):
+                ordering_key = f"key-{index}"
+                results[index] = [
+                    client.publish("topic", b"x" * 100, ordering_key=ordering_key)
+                    for _ in range(num_messages)
+                ]
+
+            workers = [
+                threading.Thread(target=produce, args=(i,)) for i in range(threads)
+            ]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+
+            # Ordered batches are committed one after another, wait for all of
+            # them before stopping the client.
+            for futures in results:
+                self.assertEqual(len(futures), num_messages)
+                self.assertTrue(all(f.result(timeout=10) == "0" for f in futures))
+            client.stop()
+            return threads * num_messages / elapsed
+
+        print()
+        print(f"Concurrent publishing ({num_messages} messages per thread)")
+        for threads in num_threads:
+            single = run(threads, stripes=1)
+            striped = run(threads, stripes=client_module._SEQUENCER_LOCK_STRIPES)
+            print(
+                f"\t{threads} thread(s): single lock {single:,.0f} msg/s, "
+                f"striped locks {striped:,.0f} msg/s"
+            )
@@ -0,0 +1,86 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import unittest
+
+import subscriber_benchmark
+
+# Set to a path to keep the results of the benchmark, e.g. to compare them with
+# the results of another revision.
+_OUTPUT_ENV = "SUBSCRIBER_BENCHMARK_OUTPUT"
+
+_NUM_MESSAGES = 1000
+
+
+class TestSubscriberBenchmark(unittest.TestCase):
+    def test_scenarios(self):
+        results = []
+        for scenario in subscriber_benchmark.SCENARIOS:
+            scenario = scenario._replace(num_messages=_NUM_MESSAGES, timeout=120)
+            result = subscriber_benchmark.run_scenario(scenario)
+            results.append(result)
+
+            latency = result["ack_latency_seconds"]
+            print(
+                f"\n{scenario.name}: "
+                f"{result['throughput_messages_per_second']:.0f} messages/s, "
+                f"ack latency p50 {latency['p50']:.4f}s p90 {latency['p90']:.4f}s "
+                f"p99 {latency['p99']:.4f}s, {result['max_threads']} threads, "
+                f"{result['peak_memory_bytes'] / 2**20:.1f} MiB peak"
+            )
+            self.assertTrue(result["completed"])
+            self.assertEqual(result["messages_acked"], _NUM_MESSAGES)
+            self.assertEqual(result["duplicate_acks"], 0)
+            self.assertEqual(result["streams_opened"], scenario.num_streams)
+            if scenario.ack_failure_rate:
+                self.assertGreater(result["failed_ack_rpcs"], 0)
+
+        path = os.environ.get(_OUTPUT_ENV)
+        if path:
+            subscriber_benchmark.save_results(results, path)
+            return
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            subscriber_benchmark.save_results(results, path)
+            with open(path) as f:
+                saved = json.load(f)
+
+        self.assertEqual(
+            [result["scenario"]["name"] for result in saved["results"]],
+            [scenario.name for scenario in subscriber_benchmark.SCENARIOS],
+        )
+
+    def test_scenario_is_deterministic(self):
+        scenario = subscriber_benchmark.Scenario(
+            num_messages=200,
+            num_ordering_keys=10,
+            hot_key_share=0.5,
+            exactly_once=True,
+            ack_failure_rate=0.05,
+            seed=7,
+        )
+
+        first = subscriber_benchmark.run_scenario(scenario)
+        second = subscriber_benchmark.run_scenario(scenario)
+
+        self.assertTrue(first["completed"])
+        self.assertEqual(first["messages_acked"], second["messages_acked"])
+        self.assertEqual(
+            first["subscriber_metrics"]["messages_received_total"],
+            second["subscriber_metrics"]["messages_received_total"],
+        )
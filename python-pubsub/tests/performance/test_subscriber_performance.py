@@ -0,0 +1,448 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import queue
+import random
+import threading
+import time
+import types as stdlib_types
+import unittest
+
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.subscriber import message as message_module
+from google.cloud.pubsub_v1.subscriber._protocol import helper_threads
+from google.cloud.pubsub_v1.subscriber._protocol import leaser
+from google.cloud.pubsub_v1.subscriber._protocol import messages_on_hold
+from google.cloud.pubsub_v1.subscriber._protocol import requests
+from google.cloud.pubsub_v1.subscriber._protocol import streaming_pull_manager
+from google.pubsub_v1 import types as gapic_types
+
+
+class _Dispatcher(object):
+    """A dispatcher that drops all requests."""
+
+    def modify_ack_deadline(self, items, ack_deadline):
+        pass
+
+
+class _Scheduler(object):
+    """A scheduler that drops all scheduled callbacks."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def schedule(self, callback, *args, **kwargs):
+        pass
+
+
+def _record_response(num_messages):
+    """Return a serialized pull response, as if it was recorded off the wire."""
+    response = gapic_types.StreamingPullResponse(
+        received_messages=[
+            gapic_types.ReceivedMessage(
+                ack_id=f"ack_{i}",
+                message=gapic_types.PubsubMessage(
+                    data=b"x" * 100,
+                    attributes={"key": "value"},
+                    message_id=str(i),
+                ),
+            )
+            for i in range(num_messages)
+        ]
+    )
+    return gapic_types.StreamingPullResponse.serialize(response)
+
+
+class _RecordingScheduler(_Scheduler):
+    """A scheduler that records the scheduled messages instead of running them."""
+
+    def __init__(self):
+        super().__init__()
+        self.scheduled = []
+
+    def schedule(self, callback, *args, **kwargs):
+        self.scheduled.append(args[0])
+
+
+class _Consumer(object):
+    """A background consumer that only tracks whether it is paused."""
+
+    is_active = True
+
+    def __init__(self):
+        self.is_paused = False
+
+    def pause(self):
+        self.is_paused = True
+
+    def resume(self):
+        self.is_paused = False
+
+
+def _make_manager(flow_control=None, scheduler=None):
+    """Create a streaming pull manager that processes responses without a stream."""
+    if flow_control is None:
+        flow_control = types.FlowControl(max_messages=10**9, max_bytes=10**12)
+    manager = streaming_pull_manager.StreamingPullManager(
+        client=None,
+        subscription="subscription",
+        flow_control=flow_control,
+        scheduler=_Scheduler() if scheduler is None else scheduler,
+    )
+    manager._callback = lambda message: None
+    manager._dispatcher = _Dispatcher()
+    manager._leaser = leaser.Leaser(manager)
+    return manager
+
+
+def _simulate_flow_control(flow_control, steps=5000, response_size=50, seed=42):
+    """Stream responses while unpaused, and complete random in-flight messages.
+
+    Returns:
+        The metrics snapshot, and the standard deviation of the number of
+        messages in flight at each step.
+    """
+    rng = random.Random(seed)
+    scheduler = _RecordingScheduler()
+    manager = _make_manager(flow_control, scheduler)
+    manager._consumer = _Consumer()
+    response = gapic_types.StreamingPullResponse.deserialize(
+        _record_response(response_size)
+    )
+
+    in_flight_counts = []
+    for step in range(steps):
+        if not manager._consumer.is_paused:
+            # Every response carries new ack IDs.
+            for received_message in response.received_messages:
+                received_message.ack_id = (
+                    f"{step}_{received_message.message.message_id}"
+                )
+            manager._on_response(response)
+
+        in_flight = scheduler.scheduled
+        rng.shuffle(in_flight)
+        done = [in_flight.pop() for _ in range(min(len(in_flight), rng.randint(0, 20)))]
+        manager._leaser.remove(
+            [
+                requests.DropRequest(
+                    ack_id=msg.ack_id, byte_size=msg.size, ordering_key=""
+                )
+                for msg in done
+            ]
+        )
+        manager.maybe_resume_consumer()
+        in_flight_counts.append(len(in_flight))
+
+    mean = sum(in_flight_counts) / steps
+    variance = sum((count - mean) ** 2 for count in in_flight_counts) / steps
+    return manager.metrics.snapshot(), variance**0.5
+
+
+def _on_response_per_message(manager, response):
+    """Process a response with the per-message bookkeeping used before batching."""
+    received_messages = response._pb.received_messages
+    ack_ids = (message.ack_id for message in received_messages)
+    manager._send_lease_modacks(ack_ids, manager.ack_deadline, warn_on_invalid=False)
+
+    with manager._pause_resume_lock:
+        for received_message in received_messages:
+            if not manager._exactly_once_delivery_enabled():
+                message = message_module.Message(
+                    received_message.message,
+                    received_message.ack_id,
+                    received_message.delivery_attempt,
+                    manager._scheduler.queue,
+                    manager._exactly_once_delivery_enabled,
+                )
+                manager._messages_on_hold.put(message)
+                manager._on_hold_bytes += message.size
+                req = requests.LeaseRequest(
+                    ack_id=message.ack_id,
+                    byte_size=message.size,
+                    ordering_key=message.ordering_key,
+                )
+                manager._leaser.add([req])
+
+        manager._maybe_release_messages()
+
+
+class _ScanningMessagesOnHold(messages_on_hold.MessagesOnHold):
+    """Messages on hold in a single queue, scanned for a sendable message on get()."""
+
+    def get(self):
+        while self._messages_on_hold:
+            msg = self._messages_on_hold.popleft()
+            pending_queue = self._pending_ordered_messages.get(msg.ordering_key)
+            if pending_queue is None:
+                self._pending_ordered_messages[msg.ordering_key] = collections.deque()
+                self._size -= 1
+                return msg
+            pending_queue.append(msg)
+        return None
+
+    def put(self, message):
+        self._messages_on_hold.append(message)
+        self._size += 1
+
+
+def _skewed_messages(num_messages, num_keys, hot_share, seed=42):
+    """Return messages with ordering keys, most of them with one of two hot keys."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(num_messages):
+        if rng.random() < hot_share:
+            key = "hot_{}".format(i % 2)
+        else:
+            key = "key_{}".format(rng.randrange(num_keys))
+        messages.append(stdlib_types.SimpleNamespace(ack_id=str(i), ordering_key=key))
+    return messages
+
+
+def _deliver_all(moh, messages, max_in_flight):
+    """Release all messages, completing the oldest one when too many are in flight.
+
+    Returns:
+        The number of delivered messages, and the longest time spent in get().
+    """
+    moh.put_many(messages)
+    in_flight = collections.deque()
+    delivered = 0
+    slowest_get = 0.0
+
+    while moh.size or in_flight:
+        while len(in_flight) < max_in_flight:
+            start = time.perf_counter()
+            msg = moh.get()
+            slowest_get = max(slowest_get, time.perf_counter() - start)
+            if msg is None:
+                break
+            in_flight.append(msg)
+
+        done = in_flight.popleft()
+        delivered += 1
+        moh.activate_ordering_keys([done.ordering_key], in_flight.append)
+
+    return delivered, slowest_get
+
+
+class _EagerMessage(message_module.Message):
+    """A message that reads all of its fields on construction."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.message_id
+        self.attributes
+        self.data
+        self.publish_time
+        self.ordering_key
+        self.size
+
+
+def _ack_all(request_queue, num_producers, acks_per_producer):
+    """Ack messages from several threads, and drain the acks like the dispatcher.
+
+    Returns:
+        The time until all acks have been drained, and the number of drained acks.
+    """
+    proto_message = gapic_types.PubsubMessage(data=b"x" * 100)._pb
+    messages = [
+        [
+            message_module.Message(
+                proto_message, f"ack_{p}_{i}", 0, request_queue, lambda: False
+            )
+            for i in range(acks_per_producer)
+        ]
+        for p in range(num_producers)
+    ]
+
+    drained = []
+    worker = helper_threads.QueueCallbackWorker(
+        request_queue, drained.extend, max_items=100, max_latency=0.01
+    )
+    consumer = threading.Thread(target=worker)
+    consumer.start()
+
+    def ack_messages(producer_messages):
+        for message in producer_messages:
+            message.ack()
+
+    producers = [
+        threading.Thread(target=ack_messages, args=(producer_messages,))
+        for producer_messages in messages
+    ]
+    start = time.perf_counter()
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    request_queue.put(helper_threads.STOP)
+    consumer.join()
+
+    return time.perf_counter() - start, len(drained)
+
+
+class TestSubscriberPerformance(unittest.TestCase):
+    def test_on_response(self, num_messages=1000, rounds=50):
+        """
+        Compare processing a replayed pull response in a single pass against
+        processing it message by message.
+        """
+        recorded = _record_response(num_messages)
+
+        def run(process):
+            elapsed = 0.0
+            for _ in range(rounds):
+                manager = _make_manager()
+                response = gapic_types.StreamingPullResponse.deserialize(recorded)
+
+                start = time.perf_counter()
+                process(manager, response)
+                elapsed += time.perf_counter() - start
+
+                self.assertEqual(manager._leaser.message_count, num_messages)
+            return elapsed
+
+        per_message_time = run(_on_response_per_message)
+        batched_time = run(lambda manager, response: manager._on_response(response))
+
+        print()
+        print(f"Processing {rounds} responses of {num_messages} messages")
+        print(f"\tPer message: {per_message_time:.3f}s")
+        print(f"\tBatched:     {batched_time:.3f}s")
+
+    def test_messages_on_hold_skewed_keys(
+        self, num_messages=20000, num_keys=1000, max_in_flight=100
+    ):
+        """
+        Compare delivering messages with skewed ordering keys from per-key queues
+        against scanning a single queue past the messages of busy keys.
+        """
+        print()
+        print(f"Delivering {num_messages} messages with {num_keys} ordering keys")
+
+        for hot_share in (0.0, 0.5, 0.9):
+            messages = _skewed_messages(num_messages, num_keys, hot_share)
+            print(f"\t{hot_share:.0%} of messages with 2 hot keys:")
+            for name, moh_class in (
+                ("Scanning", _ScanningMessagesOnHold),
+                ("Per key ", messages_on_hold.MessagesOnHold),
+            ):
+                moh = moh_class()
+                start = time.perf_counter()
+                delivered, slowest_get = _deliver_all(moh, messages, max_in_flight)
+                elapsed = time.perf_counter() - start
+
+                self.assertEqual(delivered, num_messages)
+                print(
+                    f"\t\t{name}: {elapsed:.3f}s, "
+                    f"slowest get() {slowest_get * 1000:.3f}ms"
+                )
+
+    def test_ack_path(self, num_producers=8, acks_per_producer=25000):
+        """
+        Compare sending acks from message callbacks to the dispatcher through a
+        regular queue against a batch queue.
+        """
+        print()
+        print(
+            f"Sending {num_producers * acks_per_producer} acks from "
+            f"{num_producers} threads"
+        )
+
+        for name, queue_class in (
+            ("Queue     ", queue.Queue),
+            ("BatchQueue", helper_threads.BatchQueue),
+        ):
+            elapsed, drained = _ack_all(queue_class(), num_producers, acks_per_producer)
+            self.assertEqual(drained, num_producers * acks_per_producer)
+            rate = drained / elapsed
+            print(f"\t{name}: {elapsed:.3f}s ({rate:,.0f} acks/s)")
+
+    def test_message_construction(self, num_messages=1000, rounds=200):
+        """
+        Compare creating the messages of a pull response with all fields read
+        eagerly against reading them on first access.
+        """
+        response = gapic_types.StreamingPullResponse.deserialize(
+            _record_response(num_messages)
+        )
+        received_messages = response._pb.received_messages
+        request_queue = queue.Queue()
+
+        def run(message_class, access):
+            elapsed = 0.0
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for received_message in received_messages:
+                    access(
+                        message_class(
+                            received_message.message,
+                            received_message.ack_id,
+                            received_message.delivery_attempt,
+                            request_queue,
+                        )
+                    )
+                elapsed += time.perf_counter() - start
+            return elapsed / rounds
+
+        def receive(message):
+            # The fields the streaming pull manager reads for every message.
+            message.size
+            message.ordering_key
+
+        def receive_and_read_data(message):
+            receive(message)
+            message.data
+
+        print()
+        print(f"Creating the messages of a response with {num_messages} messages")
+        for name, access in (
+            ("Received            ", receive),
+            ("Received, data read ", receive_and_read_data),
+        ):
+            eager_time = run(_EagerMessage, access)
+            lazy_time = run(message_module.Message, access)
+            print(
+                f"\t{name}: eager {eager_time * 1000:.3f}ms, "
+                f"lazy {lazy_time * 1000:.3f}ms"
+            )
+
+    def test_flow_control_watermarks(self, max_messages=500):
+        """
+        Compare the pause/resume transitions and the variation of the number of
+        messages in flight for different flow control watermarks.
+        """
+        print()
+        print(f"Flow control with max_messages={max_messages}")
+        for name, settings in (
+            ("Watermarks 1.0/0.8        ", {}),
+            ("Watermarks 1.0/0.5        ", {"low_watermark": 0.5}),
+            ("1.0/0.8, 10 per drop      ", {"max_release_per_drop": 10}),
+            (
+                "1.0/0.5, 10 per drop      ",
+                {"low_watermark": 0.5, "max_release_per_drop": 10},
+            ),
+        ):
+            flow_control = types.FlowControl(
+                max_messages=max_messages, max_bytes=10**12, **settings
+            )
+            snapshot, in_flight_stdev = _simulate_flow_control(flow_control)
+            print(
+                f"\t{name}: {snapshot.get('consumer_pauses_total', 0):.0f} pauses, "
+                f"{snapshot.get('consumer_resumes_total', 0):.0f} resumes, "
+                f"{snapshot['messages_received_total']:.0f} received, "
+                f"in flight stdev {in_flight_stdev:.1f}"
+            )
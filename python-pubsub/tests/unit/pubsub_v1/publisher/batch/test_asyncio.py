@@ -0,0 +1,235 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import sys
+
+# special case python < 3.8
+if sys.version_info.major == 3 and sys.version_info.minor < 8:
+    import mock
+else:
+    from unittest import mock
+
+import pytest
+
+import google.api_core.exceptions
+from google.auth import credentials
+from google.cloud.pubsub_v1 import publisher
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher import exceptions
+from google.cloud.pubsub_v1.publisher._batch.base import BatchStatus
+from google.cloud.pubsub_v1.publisher._batch.base import BatchCancellationReason
+from google.cloud.pubsub_v1.publisher._batch.asyncio import Batch
+from google.pubsub_v1 import types as gapic_types
+
+
+def create_client():
+    creds = mock.Mock(spec=credentials.Credentials)
+    return publisher.AsyncClient(credentials=creds)
+
+
+def create_batch(topic="topic_name", batch_done_callback=None, **batch_settings):
+    """Return a batch object suitable for testing."""
+    client = create_client()
+    settings = types.BatchSettings(**batch_settings)
+    return Batch(client, topic, settings, batch_done_callback=batch_done_callback)
+
+
+@pytest.mark.asyncio
+async def test_client():
+    client = create_client()
+    batch = Batch(client, "topic_name", types.BatchSettings())
+    assert batch.client is client
+
+
+def test_make_lock_not_supported():
+    with pytest.raises(NotImplementedError):
+        Batch.make_lock()
+
+
+@pytest.mark.asyncio
+async def test_commit_schedules_commit_on_client():
+    batch = create_batch()
+
+    with mock.patch.object(batch.client, "_schedule_commit") as schedule_commit:
+        batch.commit()
+        batch.commit()  # no-op, the commit already started
+
+    schedule_commit.assert_called_once_with(batch._commit)
+    assert batch.status == BatchStatus.STARTING
+
+
+@pytest.mark.asyncio
+async def test_publish_and_commit():
+    batch_done_callback = mock.Mock()
+    batch = create_batch(batch_done_callback=batch_done_callback)
+    messages = (
+        gapic_types.PubsubMessage(data=b"foobarbaz"),
+        gapic_types.PubsubMessage(data=b"spameggs"),
+    )
+    futures = [batch.publish(message) for message in messages]
+    assert all(isinstance(future, asyncio.Future) for future in futures)
+    assert batch.messages == list(messages)
+
+    gapic_publish = mock.AsyncMock(
+        return_value=gapic_types.PublishResponse(message_ids=["a", "b"])
+    )
+    with mock.patch.object(batch.client, "_gapic_publish", gapic_publish):
+        batch._set_status(BatchStatus.STARTING)
+        await batch._commit()
+
+    gapic_publish.assert_awaited_once_with(
+        topic="topic_name",
+        messages=list(messages),
+        retry=mock.ANY,
+        timeout=mock.ANY,
+    )
+    assert batch.status == BatchStatus.SUCCESS
+    assert [future.result() for future in futures] == ["a", "b"]
+    batch_done_callback.assert_called_once_with(True)
+
+
+@pytest.mark.asyncio
+async def test_commit_skips_futures_cancelled_by_the_application():
+    batch = create_batch()
+    future = batch.publish(gapic_types.PubsubMessage(data=b"foo"))
+    future2 = batch.publish(gapic_types.PubsubMessage(data=b"bar"))
+    future.cancel()
+
+    gapic_publish = mock.AsyncMock(
+        return_value=gapic_types.PublishResponse(message_ids=["a", "b"])
+    )
+    with mock.patch.object(batch.client, "_gapic_publish", gapic_publish):
+        await batch._commit()
+
+    assert future.cancelled()
+    assert future2.result() == "b"
+
+
+@pytest.mark.asyncio
+async def test_commit_api_error():
+    batch_done_callback = mock.Mock()
+    batch = create_batch(batch_done_callback=batch_done_callback)
+    future = batch.publish(gapic_types.PubsubMessage(data=b"foo"))
+
+    error = google.api_core.exceptions.InternalServerError("uh oh")
+    gapic_publish = mock.AsyncMock(side_effect=error)
+    with mock.patch.object(batch.client, "_gapic_publish", gapic_publish):
+        await batch._commit()
+
+    assert batch.status == BatchStatus.ERROR
+    assert future.exception() is error
+    batch_done_callback.assert_called_once_with(False)
+
+
+@pytest.mark.asyncio
+async def test_commit_wrong_number_of_message_ids():
+    batch_done_callback = mock.Mock()
+    batch = create_batch(batch_done_callback=batch_done_callback)
+    future = batch.publish(gapic_types.PubsubMessage(data=b"foo"))
+    batch.publish(gapic_types.PubsubMessage(data=b"bar"))
+
+    gapic_publish = mock.AsyncMock(
+        return_value=gapic_types.PublishResponse(message_ids=["a"])
+    )
+    with mock.patch.object(batch.client, "_gapic_publish", gapic_publish):
+        await batch._commit()
+
+    assert batch.status == BatchStatus.ERROR
+    assert isinstance(future.exception(), exceptions.PublishError)
+    batch_done_callback.assert_called_once_with(False)
+
+
+@pytest.mark.asyncio
+async def test_commit_no_messages():
+    batch = create_batch()
+
+    gapic_publish = mock.AsyncMock()
+    with mock.patch.object(batch.client, "_gapic_publish", gapic_publish):
+        await batch._commit()
+
+    gapic_publish.assert_not_called()
+    assert batch.status == BatchStatus.SUCCESS
+
+
+@pytest.mark.asyncio
+async def test_commit_already_started():
+    batch = create_batch()
+    batch._set_status(BatchStatus.IN_PROGRESS)
+
+    gapic_publish = mock.AsyncMock()
+    with mock.patch.object(batch.client, "_gapic_publish", gapic_publish):
+        await batch._commit()
+
+    gapic_publish.assert_not_called()
+    assert batch.status == BatchStatus.IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_publish_commits_when_full():
+    batch = create_batch(max_messages=2)
+
+    with mock.patch.object(batch.client, "_schedule_commit") as schedule_commit:
+        assert batch.publish(gapic_types.PubsubMessage(data=b"foo")) is not None
+        assert batch.publish(gapic_types.PubsubMessage(data=b"bar")) is None
+
+    schedule_commit.assert_called_once_with(batch._commit)
+    assert len(batch.messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_publish_not_accepting_messages():
+    batch = create_batch()
+    batch._set_status(BatchStatus.IN_PROGRESS)
+
+    assert batch.publish(gapic_types.PubsubMessage(data=b"foo")) is None
+    assert batch.messages == []
+
+
+@pytest.mark.asyncio
+async def test_publish_dict():
+    batch = create_batch()
+    future = batch.publish({"data": b"foobarbaz", "attributes": {"spam": "eggs"}})
+
+    assert future is not None
+    expected_message = gapic_types.PubsubMessage(
+        data=b"foobarbaz", attributes={"spam": "eggs"}
+    )
+    assert batch.messages == [expected_message]
+
+
+@pytest.mark.asyncio
+async def test_publish_single_message_size_exceeds_server_size_limit():
+    batch = create_batch(max_bytes=1000 * 1000 * 1000)
+    message = gapic_types.PubsubMessage(data=b"x" * 10 * 1000 * 1000)
+
+    with pytest.raises(exceptions.MessageTooLargeError):
+        batch.publish(message)
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    batch = create_batch()
+    futures = (
+        batch.publish(gapic_types.PubsubMessage(data=b"foo")),
+        batch.publish(gapic_types.PubsubMessage(data=b"bar")),
+    )
+
+    batch.cancel(BatchCancellationReason.PRIOR_ORDERED_MESSAGE_FAILED)
+
+    assert batch.status == BatchStatus.ERROR
+    for future in futures:
+        exc = future.exception()
+        assert type(exc) is RuntimeError
+        assert exc.args == (BatchCancellationReason.PRIOR_ORDERED_MESSAGE_FAILED.value,)
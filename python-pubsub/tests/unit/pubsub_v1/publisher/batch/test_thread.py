@@ -35,6 +35,7 @@ from google.cloud.pubsub_v1.publisher._batch.base import BatchStatus
 from google.cloud.pubsub_v1.publisher._batch.base import BatchCancellationReason
 from google.cloud.pubsub_v1.publisher._batch import thread
 from google.cloud.pubsub_v1.publisher._batch.thread import Batch
+from google.cloud.pubsub_v1.publisher.futures import MessageFuture
 from google.pubsub_v1 import types as gapic_types
 
 
@@ -99,11 +100,9 @@ def test_client():
 def test_commit():
     batch = create_batch()
 
-    with mock.patch.object(
-        Batch, "_start_commit_thread", autospec=True
-    ) as _start_commit_thread:
+    with mock.patch.object(Batch, "_submit_commit", autospec=True) as _submit_commit:
         batch.commit()
-        _start_commit_thread.assert_called_once()
+        _submit_commit.assert_called_once()
 
     # The batch's status needs to be something other than "accepting messages",
     # since the commit started.
@@ -111,14 +110,24 @@ def test_commit():
     assert batch.status == BatchStatus.STARTING
 
 
+def test_commit_submits_to_client_executor():
+    batch = create_batch()
+    executor = mock.Mock(spec=["submit"])
+    batch.client._commit_executor = executor
+
+    batch.commit()
+
+    executor.submit.assert_called_once_with(batch._commit)
+
+
 def test_commit_no_op():
     batch = create_batch()
     batch._status = BatchStatus.IN_PROGRESS
-    with mock.patch.object(threading, "Thread", autospec=True) as Thread:
+    with mock.patch.object(Batch, "_submit_commit", autospec=True) as _submit_commit:
         batch.commit()
 
-    # Make sure a thread was not created.
-    Thread.assert_not_called()
+    # Make sure the commit was not scheduled.
+    _submit_commit.assert_not_called()
 
     # Check that batch status is unchanged.
     assert batch.status == BatchStatus.IN_PROGRESS
@@ -159,6 +168,82 @@ def test_blocking__commit():
     assert futures[1].result() == "b"
 
 
+def test_blocking__commit_records_commit_latency():
+    batch = create_batch()
+    batch.publish({"data": b"foo"})
+    batch.publish({"data": b"bar"})
+
+    publish_response = gapic_types.PublishResponse(message_ids=["a", "b"])
+    with mock.patch.object(
+        type(batch.client), "_gapic_publish", return_value=publish_response
+    ), mock.patch.object(type(batch.client), "_record_commit") as record_commit:
+        batch._commit()
+
+    record_commit.assert_called_once_with(2, mock.ANY)
+
+
+def create_lightweight_batch():
+    creds = mock.Mock(spec=credentials.Credentials)
+    client = publisher.Client(
+        credentials=creds,
+        publisher_options=types.PublisherOptions(lightweight_futures=True),
+    )
+    return Batch(client, "topic_name", types.BatchSettings())
+
+
+def test_lightweight_futures__commit():
+    batch = create_lightweight_batch()
+    futures = (
+        batch.publish({"data": b"foo"}),
+        batch.publish({"data": b"bar"}),
+    )
+    assert all(isinstance(future, MessageFuture) for future in futures)
+    assert batch._futures == []
+
+    publish_response = gapic_types.PublishResponse(message_ids=["a", "b"])
+    with mock.patch.object(
+        type(batch.client), "_gapic_publish", return_value=publish_response
+    ), mock.patch.object(
+        type(batch.client), "_release_flow_control"
+    ) as release_flow_control:
+        batch._commit()
+
+    assert batch.status == BatchStatus.SUCCESS
+    assert futures[0].result() == "a"
+    assert futures[1].result() == "b"
+    release_flow_control.assert_called_once_with(batch.messages)
+
+
+def test_lightweight_futures__commit_api_error():
+    batch = create_lightweight_batch()
+    future = batch.publish({"data": b"foo"})
+
+    error = google.api_core.exceptions.InternalServerError("uh oh")
+    with mock.patch.object(
+        type(batch.client), "_gapic_publish", side_effect=error
+    ), mock.patch.object(
+        type(batch.client), "_release_flow_control"
+    ) as release_flow_control:
+        batch._commit()
+
+    assert batch.status == BatchStatus.ERROR
+    assert future.exception() is error
+    release_flow_control.assert_called_once_with(batch.messages)
+
+
+def test_lightweight_futures_cancel():
+    batch = create_lightweight_batch()
+    future = batch.publish({"data": b"foo"})
+
+    with mock.patch.object(
+        type(batch.client), "_release_flow_control"
+    ) as release_flow_control:
+        batch.cancel(BatchCancellationReason.PRIOR_ORDERED_MESSAGE_FAILED)
+
+    assert isinstance(future.exception(), RuntimeError)
+    release_flow_control.assert_called_once_with(batch.messages)
+
+
 def test_blocking__commit_custom_retry():
     batch = create_batch(commit_retry=mock.sentinel.custom_retry)
     batch.publish({"data": b"This is my message."})
@@ -323,6 +408,30 @@ def test_block__commmit_retry_error():
         assert future.exception() == error
 
 
+@pytest.mark.parametrize(
+    "message",
+    [
+        gapic_types.PubsubMessage(),
+        gapic_types.PubsubMessage(data=b"x"),
+        gapic_types.PubsubMessage(data=b"x" * 127),
+        gapic_types.PubsubMessage(data=b"x" * 128),
+        gapic_types.PubsubMessage(data=b"x" * 20000),
+        gapic_types.PubsubMessage(data=b"foo", attributes={"": ""}),
+        gapic_types.PubsubMessage(
+            data=b"foo", attributes={"spam": "eggs", "k\u00fc": "\u00fc" * 100}
+        ),
+        gapic_types.PubsubMessage(data=b"foo", ordering_key="\u043a\u043b\u044e\u0447"),
+        gapic_types.PubsubMessage(data=b"foo", message_id="123"),
+        gapic_types.PubsubMessage(
+            data=b"foo", publish_time=datetime.datetime(2020, 1, 1, 12, 30)
+        ),
+    ],
+)
+def test_framed_message_size(message):
+    expected = gapic_types.PublishRequest(messages=[message])._pb.ByteSize()
+    assert thread._framed_message_size(message) == expected
+
+
 def test_publish_updating_batch_size():
     batch = create_batch(topic="topic_foo")
     messages = (
@@ -179,6 +179,20 @@ def test_basic_publish():
     batch.publish.assert_called_once_with(message)
 
 
+def test_publish_schedules_commit_of_new_batch():
+    client = create_client()
+    message = create_message()
+    sequencer = create_ordered_sequencer(client)
+
+    with mock.patch.object(client, "_schedule_batch_commit") as schedule:
+        sequencer.publish(message)
+        sequencer.publish(message)
+
+    schedule.assert_called_once_with(
+        "topic_name", _ORDERING_KEY, sequencer._ordered_batches[0]
+    )
+
+
 def test_publish_custom_retry():
     client = create_client()
     message = create_message()
@@ -118,6 +118,18 @@ def test_publish_custom_timeout():
     assert sequencer._current_batch._commit_timeout is mock.sentinel.custom_timeout
 
 
+def test_publish_schedules_commit_of_new_batch():
+    client = create_client()
+    message = create_message()
+    sequencer = unordered_sequencer.UnorderedSequencer(client, "topic_name")
+
+    with mock.patch.object(client, "_schedule_batch_commit") as schedule:
+        sequencer.publish(message)
+        sequencer.publish(message)
+
+    schedule.assert_called_once_with("topic_name", "", sequencer._current_batch)
+
+
 def test_publish_batch_full():
     client = create_client()
     message = create_message()
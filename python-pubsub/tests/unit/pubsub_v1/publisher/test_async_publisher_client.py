@@ -0,0 +1,384 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import sys
+import zlib
+
+# special case python < 3.8
+if sys.version_info.major == 3 and sys.version_info.minor < 8:
+    import mock
+else:
+    from unittest import mock
+
+import pytest
+
+import google.api_core.exceptions
+from google.cloud import pubsub_v1
+from google.cloud.pubsub_v1 import publisher
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher import exceptions
+from google.cloud.pubsub_v1.publisher._batch import asyncio as asyncio_batch
+from google.pubsub_v1 import types as gapic_types
+
+
+def _make_gapic_publish(calls, delay=0.0, error=None):
+    async def gapic_publish(topic, messages, retry, timeout):
+        calls.append([message.data for message in messages])
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return gapic_types.PublishResponse(
+            message_ids=[message.data.decode() for message in messages]
+        )
+
+    return gapic_publish
+
+
+@pytest.mark.asyncio
+async def test_init(creds):
+    client = publisher.AsyncClient(credentials=creds)
+
+    assert isinstance(client, pubsub_v1.AsyncPublisherClient.__mro__[1])
+    assert client._batch_class is asyncio_batch.Batch
+    assert client.batch_settings.max_messages == 100
+    assert client.publisher_options.enable_message_ordering is False
+
+
+@pytest.mark.asyncio
+async def test_init_emulator(monkeypatch):
+    monkeypatch.setenv("PUBSUB_EMULATOR_HOST", "/foo/bar:123")
+    client = publisher.AsyncClient()
+
+    assert client.transport._host == "/foo/bar:123"
+
+
+@pytest.mark.asyncio
+async def test_init_adaptive_batching_not_supported(creds):
+    publisher_options = types.PublisherOptions(
+        adaptive_batching=types.AdaptiveBatching()
+    )
+
+    with pytest.raises(ValueError):
+        publisher.AsyncClient(credentials=creds, publisher_options=publisher_options)
+
+
+@pytest.mark.asyncio
+async def test_init_lightweight_futures_not_supported(creds):
+    publisher_options = types.PublisherOptions(lightweight_futures=True)
+
+    with pytest.raises(ValueError):
+        publisher.AsyncClient(credentials=creds, publisher_options=publisher_options)
+
+
+@pytest.mark.asyncio
+async def test_publish(creds):
+    client = publisher.AsyncClient(
+        credentials=creds,
+        batch_settings=types.BatchSettings(max_latency=0.01),
+    )
+    calls = []
+    client._gapic_publish = _make_gapic_publish(calls)
+
+    future = await client.publish("topic", b"1", spam="eggs")
+    future2 = await client.publish("topic", b"2")
+
+    assert isinstance(future, asyncio.Future)
+    assert await future == "1"
+    assert await future2 == "2"
+    assert calls == [[b"1", b"2"]]
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_attrs_bytestring(creds):
+    client = publisher.AsyncClient(credentials=creds)
+    batch = mock.Mock(spec=asyncio_batch.Batch)
+    batch.publish.return_value = asyncio.get_running_loop().create_future()
+    client._set_batch("topic", batch)
+
+    await client.publish("topic", b"foo", bar=b"baz")
+
+    message = batch.publish.call_args[0][0]
+    assert message.attributes == {"bar": "baz"}
+
+
+@pytest.mark.asyncio
+async def test_publish_data_not_bytestring_error(creds):
+    client = publisher.AsyncClient(credentials=creds)
+
+    with pytest.raises(TypeError):
+        await client.publish("topic", "This is a text string.")
+
+
+@pytest.mark.asyncio
+async def test_publish_message_ordering_not_enabled_error(creds):
+    client = publisher.AsyncClient(credentials=creds)
+
+    with pytest.raises(ValueError):
+        await client.publish("topic", b"bytestring body", ordering_key="ABC")
+
+
+@pytest.mark.asyncio
+async def test_publish_stopped_client(creds):
+    client = publisher.AsyncClient(credentials=creds)
+    await client.stop()
+
+    with pytest.raises(RuntimeError):
+        await client.publish("topic", b"foo")
+
+    with pytest.raises(RuntimeError):
+        await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_error_exceeding_flow_control_limits(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=1,
+            limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+        )
+    )
+    client = publisher.AsyncClient(
+        credentials=creds, publisher_options=publisher_options
+    )
+    client._gapic_publish = _make_gapic_publish([])
+
+    future = await client.publish("topic", b"1")
+    future2 = await client.publish("topic", b"2")
+
+    with pytest.raises(exceptions.FlowControlLimitError):
+        await future2
+
+    await client.stop()
+    assert await future == "1"
+
+
+@pytest.mark.asyncio
+async def test_publish_blocks_on_flow_control_until_published(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=1,
+            limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+        )
+    )
+    client = publisher.AsyncClient(
+        credentials=creds,
+        batch_settings=types.BatchSettings(max_latency=0.01),
+        publisher_options=publisher_options,
+    )
+    calls = []
+    client._gapic_publish = _make_gapic_publish(calls)
+
+    future = await client.publish("topic", b"1")
+    future2 = await asyncio.wait_for(client.publish("topic", b"2"), timeout=1)
+
+    # The second message could only be accepted once the first one was published.
+    assert future.done()
+    assert await future2 == "2"
+    assert calls == [[b"1"], [b"2"]]
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_with_ordering_keys(creds):
+    client = publisher.AsyncClient(
+        credentials=creds,
+        batch_settings=types.BatchSettings(max_messages=3, max_latency=0.01),
+        publisher_options=types.PublisherOptions(enable_message_ordering=True),
+    )
+    calls = []
+    client._gapic_publish = _make_gapic_publish(calls, delay=0.01)
+
+    futures = [
+        await client.publish("topic", str(i).encode(), ordering_key="key")
+        for i in range(5)
+    ]
+
+    assert await asyncio.gather(*futures) == ["0", "1", "2", "3", "4"]
+    # Batches of the same ordering key are published one after another.
+    assert calls == [[b"0", b"1"], [b"2", b"3"], [b"4"]]
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_with_ordering_key_uses_extended_retry_deadline(creds):
+    client = publisher.AsyncClient(
+        credentials=creds,
+        publisher_options=types.PublisherOptions(enable_message_ordering=True),
+    )
+    batch = mock.Mock(spec=asyncio_batch.Batch)
+    batch.publish.return_value = asyncio.get_running_loop().create_future()
+    batch_class = mock.Mock(spec=(), return_value=batch)
+    client._batch_class = batch_class
+
+    await client.publish("topic", b"foo", ordering_key="key")
+
+    retry = batch_class.call_args.kwargs["commit_retry"]
+    assert retry._deadline == 2.0**32
+
+
+@pytest.mark.asyncio
+async def test_publish_to_paused_ordering_key(creds):
+    client = publisher.AsyncClient(
+        credentials=creds,
+        batch_settings=types.BatchSettings(max_latency=0.01),
+        publisher_options=types.PublisherOptions(enable_message_ordering=True),
+    )
+    error = google.api_core.exceptions.InvalidArgument("bad")
+    client._gapic_publish = _make_gapic_publish([], error=error)
+
+    future = await client.publish("topic", b"1", ordering_key="key")
+    with pytest.raises(google.api_core.exceptions.InvalidArgument):
+        await future
+
+    future2 = await client.publish("topic", b"2", ordering_key="key")
+    assert isinstance(future2, asyncio.Future)
+    with pytest.raises(exceptions.PublishToPausedOrderingKeyException):
+        await future2
+
+    # Publishing works again after resuming.
+    client._gapic_publish = _make_gapic_publish([])
+    client.resume_publish("topic", "key")
+    future3 = await client.publish("topic", b"3", ordering_key="key")
+    assert await future3 == "3"
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_message_too_large_releases_flow_control(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            byte_limit=100 * 1000 * 1000,
+            limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+        )
+    )
+    client = publisher.AsyncClient(
+        credentials=creds, publisher_options=publisher_options
+    )
+
+    with pytest.raises(exceptions.MessageTooLargeError):
+        await client.publish("topic", b"x" * 10 * 1000 * 1000)
+
+    assert client._flow_controller._message_count == 0
+    assert client._flow_controller._total_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_commit_timer_created_on_publish(creds):
+    client = publisher.AsyncClient(credentials=creds)
+    batch = mock.Mock(spec=asyncio_batch.Batch)
+    batch.publish.return_value = asyncio.get_running_loop().create_future()
+    client._set_batch("topic", batch)
+
+    assert client._commit_timer is None
+    await client.publish("topic", b"foo")
+    timer = client._commit_timer
+    await client.publish("topic", b"bar")
+
+    assert timer is not None
+    assert client._commit_timer is timer
+
+    await client.stop()
+    await asyncio.sleep(0)
+    assert client._commit_timer is None
+    assert timer.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_commit_timer_not_created_if_max_latency_is_inf(creds):
+    client = publisher.AsyncClient(
+        credentials=creds, batch_settings=types.BatchSettings(max_latency=float("inf"))
+    )
+    batch = mock.Mock(spec=asyncio_batch.Batch)
+    batch.publish.return_value = asyncio.get_running_loop().create_future()
+    client._set_batch("topic", batch)
+
+    await client.publish("topic", b"foo")
+
+    assert client._commit_timer is None
+
+
+@pytest.mark.asyncio
+async def test_commits_are_bounded_by_max_commit_workers(creds):
+    client = publisher.AsyncClient(
+        credentials=creds,
+        batch_settings=types.BatchSettings(max_messages=1),
+        publisher_options=types.PublisherOptions(max_commit_workers=2),
+    )
+    in_flight = 0
+    max_in_flight = 0
+
+    async def gapic_publish(topic, messages, retry, timeout):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return gapic_types.PublishResponse(message_ids=["0"] * len(messages))
+
+    client._gapic_publish = gapic_publish
+
+    futures = [await client.publish("topic", b"foo") for _ in range(6)]
+    await client.stop()
+
+    assert all(future.done() for future in futures)
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_publishes_outstanding_messages(creds):
+    client = publisher.AsyncClient(
+        credentials=creds,
+        batch_settings=types.BatchSettings(max_latency=float("inf")),
+    )
+    calls = []
+    client._gapic_publish = _make_gapic_publish(calls, delay=0.01)
+
+    future = await client.publish("topic", b"1")
+    await client.stop()
+
+    assert future.result() == "1"
+    assert calls == [[b"1"]]
+
+
+@pytest.mark.asyncio
+async def test_resume_publish_ordering_keys_not_enabled(creds):
+    client = publisher.AsyncClient(credentials=creds)
+
+    with pytest.raises(ValueError):
+        client.resume_publish("topic", "ord_key")
+
+
+@pytest.mark.asyncio
+async def test_publish_compresses_data_above_threshold(creds):
+    client = publisher.AsyncClient(
+        credentials=creds,
+        publisher_options=types.PublisherOptions(
+            compression=types.PublishCompression(threshold=100)
+        ),
+    )
+    batch = mock.Mock(spec=asyncio_batch.Batch)
+    batch.publish.return_value = asyncio.get_running_loop().create_future()
+    client._set_batch("topic", batch)
+
+    await client.publish("topic", b"x" * 1000)
+
+    message = batch.publish.call_args[0][0]
+    assert zlib.decompress(message.data) == b"x" * 1000
+    assert message.attributes == {"googclient_compression": "zlib"}
@@ -0,0 +1,104 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher._batch_sizer import AdaptiveBatchSizer
+
+
+def create_sizer(initial_messages=100, initial_latency=0.01, **bounds):
+    batch_settings = types.BatchSettings(
+        max_bytes=12345, max_messages=initial_messages, max_latency=initial_latency
+    )
+    return AdaptiveBatchSizer(batch_settings, types.AdaptiveBatching(**bounds))
+
+
+@pytest.mark.parametrize(
+    "bounds",
+    [
+        {"min_messages": 0},
+        {"min_messages": 10, "max_messages": 5},
+        {"min_latency": 0},
+        {"min_latency": 0.5, "max_latency": 0.1},
+    ],
+)
+def test_invalid_bounds(bounds):
+    with pytest.raises(ValueError):
+        create_sizer(**bounds)
+
+
+def test_initial_settings_are_clamped():
+    sizer = create_sizer(initial_messages=5000, initial_latency=float("inf"))
+
+    assert sizer.settings == types.BatchSettings(
+        max_bytes=12345, max_messages=1000, max_latency=0.1
+    )
+
+
+def test_full_batches_grow_additively():
+    sizer = create_sizer()
+
+    settings = sizer.record_commit(message_count=99, latency=0.01, queue_depth=0)
+
+    assert settings.max_messages == 110
+    assert settings.max_latency == pytest.approx(0.0125)
+    assert settings.max_bytes == 12345
+    assert sizer.settings is settings
+
+
+def test_backlog_grows_multiplicatively():
+    sizer = create_sizer()
+
+    settings = sizer.record_commit(message_count=10, latency=0.01, queue_depth=3)
+
+    assert settings.max_messages == 150
+    assert settings.max_latency == pytest.approx(0.0125)
+
+
+def test_slow_commits_shrink_multiplicatively():
+    sizer = create_sizer(target_commit_latency=0.5)
+
+    settings = sizer.record_commit(message_count=99, latency=0.6, queue_depth=3)
+
+    assert settings.max_messages == 50
+    assert settings.max_latency == 0.01
+
+
+def test_partial_batches_shorten_latency():
+    sizer = create_sizer()
+
+    settings = sizer.record_commit(message_count=10, latency=0.01, queue_depth=0)
+
+    assert settings.max_messages == 100
+    assert settings.max_latency == pytest.approx(0.008)
+
+
+def test_settings_stay_within_bounds():
+    sizer = create_sizer(
+        min_messages=10, max_messages=200, min_latency=0.005, max_latency=0.02
+    )
+
+    for _ in range(20):
+        sizer.record_commit(message_count=1, latency=0.01, queue_depth=5)
+    assert sizer.settings.max_messages == 200
+    assert sizer.settings.max_latency == 0.02
+
+    for _ in range(20):
+        sizer.record_commit(message_count=1, latency=1.0, queue_depth=0)
+    assert sizer.settings.max_messages == 10
+
+    for _ in range(20):
+        sizer.record_commit(message_count=1, latency=0.01, queue_depth=0)
+    assert sizer.settings.max_latency == 0.005
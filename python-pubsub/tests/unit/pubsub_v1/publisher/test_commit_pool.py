@@ -0,0 +1,112 @@
+# Copyright 2023, Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from google.cloud.pubsub_v1.publisher._commit_pool import CommitWorkerPool
+
+
+def test_invalid_max_workers():
+    with pytest.raises(ValueError):
+        CommitWorkerPool(max_workers=0, thread_name_prefix="Test")
+
+
+def test_submit_runs_work_on_daemon_threads():
+    pool = CommitWorkerPool(max_workers=2, thread_name_prefix="Test-CommitPool")
+    done = threading.Event()
+    seen = []
+
+    def work():
+        thread = threading.current_thread()
+        seen.append((thread.name, thread.daemon))
+        done.set()
+
+    pool.submit(work)
+    assert done.wait(timeout=5)
+
+    assert seen == [("Test-CommitPool_0", True)]
+    pool.shutdown()
+
+
+def test_worker_count_is_bounded():
+    pool = CommitWorkerPool(max_workers=2, thread_name_prefix="Test-CommitPool")
+    release = threading.Event()
+    finished = threading.Semaphore(0)
+
+    def work():
+        release.wait(timeout=5)
+        finished.release()
+
+    for _ in range(5):
+        pool.submit(work)
+
+    assert len(pool._threads) == 2
+
+    release.set()
+    for _ in range(5):
+        assert finished.acquire(timeout=5)
+    pool.shutdown()
+
+
+def test_worker_survives_exceptions():
+    pool = CommitWorkerPool(max_workers=1, thread_name_prefix="Test-CommitPool")
+    done = threading.Event()
+
+    def fail():
+        raise ValueError("boom")
+
+    pool.submit(fail)
+    pool.submit(done.set)
+
+    assert done.wait(timeout=5)
+    assert len(pool._threads) == 1
+    pool.shutdown()
+
+
+def test_shutdown_stops_workers_after_pending_work():
+    pool = CommitWorkerPool(max_workers=1, thread_name_prefix="Test-CommitPool")
+    done = threading.Event()
+    pool.submit(done.set)
+
+    pool.shutdown()
+    pool.shutdown()  # idempotent
+
+    pool._threads[0].join(timeout=5)
+    assert done.is_set()
+    assert not pool._threads[0].is_alive()
+
+    with pytest.raises(RuntimeError):
+        pool.submit(done.set)
+
+
+def test_queue_size():
+    pool = CommitWorkerPool(max_workers=1, thread_name_prefix="Test")
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+
+    pool.submit(block)
+    assert started.wait(timeout=5)
+    pool.submit(lambda: None)
+    pool.submit(lambda: None)
+
+    assert pool.queue_size == 2
+
+    release.set()
+    pool.shutdown()
@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import
 
+import asyncio
 import threading
 import time
 from typing import Callable
@@ -26,6 +27,7 @@ import pytest
 import google
 from google.cloud.pubsub_v1 import types
 from google.cloud.pubsub_v1.publisher import exceptions
+from google.cloud.pubsub_v1.publisher.flow_controller import AsyncFlowController
 from google.cloud.pubsub_v1.publisher.flow_controller import FlowController
 from google.pubsub_v1 import types as grpc_types
 
@@ -83,6 +85,87 @@ def test_overflow_no_error_on_ignore():
     flow_controller.add(grpc_types.PubsubMessage(data=b"bar"))
 
 
+def test_try_add_many_all_fit():
+    settings = types.PublishFlowControl(
+        message_limit=2,
+        byte_limit=10000,
+        limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+    )
+    flow_controller = FlowController(settings)
+    msg1 = grpc_types.PubsubMessage(data=b"foo")
+    msg2 = grpc_types.PubsubMessage(data=b"bar")
+
+    assert flow_controller.try_add_many([msg1, msg2])
+
+    with pytest.raises(exceptions.FlowControlLimitError):
+        flow_controller.add(grpc_types.PubsubMessage(data=b"baz"))
+
+
+@pytest.mark.parametrize(
+    "message_limit, byte_limit",
+    [(1, 10000), (10, 150)],
+)
+def test_try_add_many_does_not_add_anything_on_overflow(message_limit, byte_limit):
+    settings = types.PublishFlowControl(
+        message_limit=message_limit,
+        byte_limit=byte_limit,
+        limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+    )
+    flow_controller = FlowController(settings)
+    messages = [
+        grpc_types.PubsubMessage(data=b"x" * 100),
+        grpc_types.PubsubMessage(data=b"y" * 100),
+    ]
+
+    assert not flow_controller.try_add_many(messages)
+
+    # Nothing was added, a single message still fits.
+    flow_controller.add(messages[0])
+
+
+def test_try_add_many_ignore_behavior():
+    settings = types.PublishFlowControl(
+        message_limit=1,
+        byte_limit=1,
+        limit_exceeded_behavior=types.LimitExceededBehavior.IGNORE,
+    )
+    flow_controller = FlowController(settings)
+    messages = [grpc_types.PubsubMessage(data=b"x" * 100)] * 5
+
+    assert flow_controller.try_add_many(messages)
+
+
+def test_try_add_many_does_not_overtake_blocked_threads():
+    settings = types.PublishFlowControl(
+        message_limit=10,
+        byte_limit=10000,
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+    )
+    flow_controller = FlowController(settings)
+    # Simulate another thread already waiting for capacity.
+    flow_controller._waiting[threading.Thread()] = None
+
+    assert not flow_controller.try_add_many([grpc_types.PubsubMessage(data=b"x")])
+
+
+def test_release_many():
+    settings = types.PublishFlowControl(
+        message_limit=2,
+        byte_limit=10000,
+        limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+    )
+    flow_controller = FlowController(settings)
+    msg1 = grpc_types.PubsubMessage(data=b"foo")
+    msg2 = grpc_types.PubsubMessage(data=b"bar")
+    assert flow_controller.try_add_many([msg1, msg2])
+
+    flow_controller.release_many([msg1, msg2])
+
+    assert flow_controller._message_count == 0
+    assert flow_controller._total_bytes == 0
+    assert flow_controller.try_add_many([msg1, msg2])
+
+
 def test_message_count_overflow_error():
     settings = types.PublishFlowControl(
         message_limit=1,
@@ -201,11 +284,13 @@ def test_incorrectly_releasing_too_many_messages():
     assert expected_size_info in error_msg
 
 
-def test_blocking_on_overflow_until_free_capacity():
+@pytest.mark.parametrize("fair", [True, False])
+def test_blocking_on_overflow_until_free_capacity(fair):
     settings = types.PublishFlowControl(
         message_limit=1,
         byte_limit=150,
         limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+        fair=fair,
     )
     flow_controller = FlowController(settings)
 
@@ -401,6 +486,81 @@ def test_blocked_messages_are_accepted_in_fifo_order():
             pytest.fail(f"Queued message was not released in time (i={i}).")
 
 
+def test_unfair_blocking_admits_all_blocked_threads():
+    settings = types.PublishFlowControl(
+        message_limit=3,
+        byte_limit=1_000_000,  # Unlimited for practical purposes in the test.
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+        fair=False,
+    )
+    flow_controller = FlowController(settings)
+    message = grpc_types.PubsubMessage(data=b"x")
+
+    for _ in range(3):
+        flow_controller.add(message)
+
+    adding_done_events = [threading.Event() for _ in range(20)]
+    for adding_done in adding_done_events:
+        _run_in_daemon(flow_controller.add, [message], adding_done)
+
+    # Wait until all threads are blocked.
+    for _ in range(50):
+        with flow_controller._operational_lock:
+            if flow_controller._unordered_waiters == 20:
+                break
+        time.sleep(0.01)
+    assert not any(adding_done.is_set() for adding_done in adding_done_events)
+
+    # Blocked threads do not reserve capacity, nor do they queue up in FIFO order.
+    assert not flow_controller._waiting
+    assert flow_controller._reserved_slots == 0
+
+    for i in range(20):
+        flow_controller.release(message)
+        admitted = 0
+        for _ in range(50):
+            admitted = sum(adding_done.is_set() for adding_done in adding_done_events)
+            if admitted == i + 1:
+                break
+            time.sleep(0.01)
+        assert admitted == i + 1, "Each release should admit exactly one thread."
+
+    assert flow_controller._message_count == 3
+    assert flow_controller._unordered_waiters == 0
+
+
+def test_unfair_blocking_passes_wake_up_on_while_capacity_remains():
+    settings = types.PublishFlowControl(
+        message_limit=10,
+        byte_limit=1_000_000,  # Unlimited for practical purposes in the test.
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+        fair=False,
+    )
+    flow_controller = FlowController(settings)
+    message = grpc_types.PubsubMessage(data=b"x")
+
+    for _ in range(10):
+        flow_controller.add(message)
+
+    adding_done_events = [threading.Event() for _ in range(3)]
+    for adding_done in adding_done_events:
+        _run_in_daemon(flow_controller.add, [message], adding_done)
+    for _ in range(50):
+        with flow_controller._operational_lock:
+            if flow_controller._unordered_waiters == 3:
+                break
+        time.sleep(0.01)
+
+    # Free capacity for all three threads at once, but only notify one of them.
+    with flow_controller._operational_lock:
+        flow_controller._message_count -= 3
+        flow_controller._has_capacity.notify()
+
+    for adding_done in adding_done_events:
+        assert adding_done.wait(timeout=1)
+    assert flow_controller._message_count == 10
+
+
 def test_warning_on_internal_reservation_stats_error_when_unblocking():
     settings = types.PublishFlowControl(
         message_limit=1,
@@ -446,3 +606,142 @@ def test_warning_on_internal_reservation_stats_error_when_unblocking():
     matches = [warning for warning in warned if warning.category is RuntimeWarning]
     assert len(matches) == 1
     assert "too many bytes reserved" in str(matches[0].message).lower()
+
+
+@pytest.mark.asyncio
+async def test_async_overflow_error_on_error_behavior():
+    settings = types.PublishFlowControl(
+        message_limit=1,
+        byte_limit=10000,
+        limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+    )
+    flow_controller = AsyncFlowController(settings)
+
+    await flow_controller.add(grpc_types.PubsubMessage(data=b"foo"))
+    with pytest.raises(exceptions.FlowControlLimitError) as error:
+        await flow_controller.add(grpc_types.PubsubMessage(data=b"bar"))
+
+    assert "messages: 2 / 1" in str(error.value)
+
+
+@pytest.mark.asyncio
+async def test_async_overflow_no_error_on_ignore():
+    settings = types.PublishFlowControl(
+        message_limit=1,
+        byte_limit=2,
+        limit_exceeded_behavior=types.LimitExceededBehavior.IGNORE,
+    )
+    flow_controller = AsyncFlowController(settings)
+
+    # there should be no overflow errors
+    await flow_controller.add(grpc_types.PubsubMessage(data=b"foo"))
+    await flow_controller.add(grpc_types.PubsubMessage(data=b"bar"))
+
+
+@pytest.mark.asyncio
+async def test_async_blocking_admits_waiters_in_fifo_order():
+    settings = types.PublishFlowControl(
+        message_limit=1,
+        byte_limit=10000,
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+    )
+    flow_controller = AsyncFlowController(settings)
+    msg1 = grpc_types.PubsubMessage(data=b"1")
+    msg2 = grpc_types.PubsubMessage(data=b"2")
+    msg3 = grpc_types.PubsubMessage(data=b"3")
+
+    await flow_controller.add(msg1)
+    adding_2 = asyncio.ensure_future(flow_controller.add(msg2))
+    adding_3 = asyncio.ensure_future(flow_controller.add(msg3))
+    await asyncio.sleep(0)
+    assert not adding_2.done()
+    assert not adding_3.done()
+
+    flow_controller.release(msg1)
+    await asyncio.sleep(0)
+    assert adding_2.done()
+    assert not adding_3.done()
+
+    flow_controller.release(msg2)
+    await asyncio.wait_for(adding_3, timeout=1)
+    assert flow_controller._message_count == 1
+
+
+@pytest.mark.asyncio
+async def test_async_blocking_on_overflow_until_free_bytes():
+    msg1 = grpc_types.PubsubMessage(data=b"x" * 100)
+    msg2 = grpc_types.PubsubMessage(data=b"y" * 100)
+    settings = types.PublishFlowControl(
+        message_limit=10,
+        byte_limit=150,
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+    )
+    flow_controller = AsyncFlowController(settings)
+
+    await flow_controller.add(msg1)
+    adding_2 = asyncio.ensure_future(flow_controller.add(msg2))
+    await asyncio.sleep(0)
+    assert not adding_2.done()
+
+    flow_controller.release(msg1)
+    await asyncio.wait_for(adding_2, timeout=1)
+    assert flow_controller._total_bytes == msg2._pb.ByteSize()
+
+
+@pytest.mark.asyncio
+async def test_async_error_if_message_would_block_forever():
+    settings = types.PublishFlowControl(
+        message_limit=1,
+        byte_limit=1,
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+    )
+    flow_controller = AsyncFlowController(settings)
+
+    with pytest.raises(exceptions.FlowControlLimitError) as error:
+        await flow_controller.add(grpc_types.PubsubMessage(data=b"xyz"))
+
+    assert "would block forever" in str(error.value)
+    assert flow_controller._message_count == 0
+
+
+@pytest.mark.asyncio
+async def test_async_cancelled_waiter_does_not_take_capacity():
+    settings = types.PublishFlowControl(
+        message_limit=1,
+        byte_limit=10000,
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+    )
+    flow_controller = AsyncFlowController(settings)
+    msg1 = grpc_types.PubsubMessage(data=b"1")
+    msg2 = grpc_types.PubsubMessage(data=b"2")
+    msg3 = grpc_types.PubsubMessage(data=b"3")
+
+    await flow_controller.add(msg1)
+    adding_2 = asyncio.ensure_future(flow_controller.add(msg2))
+    adding_3 = asyncio.ensure_future(flow_controller.add(msg3))
+    await asyncio.sleep(0)
+
+    adding_2.cancel()
+    flow_controller.release(msg1)
+    await asyncio.wait_for(adding_3, timeout=1)
+
+    assert adding_2.cancelled()
+    assert flow_controller._message_count == 1
+    assert not flow_controller._waiting
+
+
+@pytest.mark.asyncio
+async def test_async_release_more_than_added():
+    settings = types.PublishFlowControl(
+        message_limit=1,
+        byte_limit=10000,
+        limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+    )
+    flow_controller = AsyncFlowController(settings)
+
+    with warnings.catch_warnings(record=True) as warned:
+        flow_controller.release(grpc_types.PubsubMessage(data=b"foo"))
+
+    assert len(warned) == 1
+    assert issubclass(warned[0].category, RuntimeWarning)
+    assert flow_controller._message_count == 0
@@ -14,6 +14,9 @@
 
 from __future__ import absolute_import
 
+import concurrent.futures
+import threading
+
 import pytest
 
 from google.cloud.pubsub_v1.publisher import futures
@@ -38,3 +41,95 @@ class TestFuture(object):
         future.set_exception(RuntimeError("Something bad happened."))
         with pytest.raises(RuntimeError):
             future.result()
+
+
+class TestMessageFuture(object):
+    def test_cancel(self):
+        future = futures.MessageFuture(futures._BatchFuture(), 0)
+        assert future.cancel() is False
+        assert future.cancelled() is False
+
+    def test_result_on_success(self):
+        batch_future = futures._BatchFuture()
+        first = futures.MessageFuture(batch_future, 0)
+        second = futures.MessageFuture(batch_future, 1)
+        assert first.running()
+        assert not first.done()
+
+        batch_future.set_result(["1", "2"])
+
+        assert first.done()
+        assert not second.running()
+        assert first.result() == "1"
+        assert second.result() == "2"
+        assert second.exception() is None
+
+    def test_result_on_failure(self):
+        batch_future = futures._BatchFuture()
+        future = futures.MessageFuture(batch_future, 0)
+        error = RuntimeError("Something bad happened.")
+
+        batch_future.set_exception(error)
+
+        assert future.exception() is error
+        with pytest.raises(RuntimeError):
+            future.result()
+
+    def test_result_timeout(self):
+        future = futures.MessageFuture(futures._BatchFuture(), 0)
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            future.result(timeout=0.01)
+        with pytest.raises(concurrent.futures.TimeoutError):
+            future.exception(timeout=0.01)
+
+    def test_result_waits_for_batch(self):
+        batch_future = futures._BatchFuture()
+        future = futures.MessageFuture(batch_future, 0)
+
+        timer = threading.Timer(0.01, batch_future.set_result, args=(["1"],))
+        timer.start()
+
+        assert future.result(timeout=5) == "1"
+        timer.join()
+
+    def test_add_done_callback(self):
+        batch_future = futures._BatchFuture()
+        first = futures.MessageFuture(batch_future, 0)
+        second = futures.MessageFuture(batch_future, 1)
+        called_with = []
+
+        first.add_done_callback(called_with.append)
+        second.add_done_callback(called_with.append)
+        assert called_with == []
+
+        batch_future.set_result(["1", "2"])
+
+        assert called_with == [first, second]
+
+    def test_add_done_callback_after_done(self):
+        batch_future = futures._BatchFuture()
+        future = futures.MessageFuture(batch_future, 0)
+        batch_future.set_exception(RuntimeError("Something bad happened."))
+        called_with = []
+
+        future.add_done_callback(called_with.append)
+
+        assert called_with == [future]
+
+    def test_add_done_callback_error_does_not_stop_others(self):
+        batch_future = futures._BatchFuture()
+        future = futures.MessageFuture(batch_future, 0)
+        called_with = []
+
+        future.add_done_callback(lambda _: 1 / 0)
+        future.add_done_callback(called_with.append)
+        batch_future.set_result(["1"])
+
+        assert called_with == [future]
+
+    def test_no_instance_dict(self):
+        future = futures.MessageFuture(futures._BatchFuture(), 0)
+
+        with pytest.raises(AttributeError):
+            future.foo = "bar"
@@ -16,6 +16,9 @@ from __future__ import absolute_import
 from __future__ import division
 
 import inspect
+import itertools
+import lzma
+import os
 import sys
 
 import grpc
@@ -27,8 +30,10 @@ else:
     from unittest import mock
 
 import pytest
+import threading
 import time
 import warnings
+import zlib
 
 from google.api_core import gapic_v1
 from google.api_core import retry as retries
@@ -37,7 +42,9 @@ from google.cloud.pubsub_v1 import publisher
 from google.cloud.pubsub_v1 import types
 
 from google.cloud.pubsub_v1.publisher import exceptions
+from google.cloud.pubsub_v1.publisher._batch.base import BatchStatus
 from google.cloud.pubsub_v1.publisher._sequencer import ordered_sequencer
+from google.cloud.pubsub_v1.publisher.futures import MessageFuture
 
 from google.pubsub_v1 import types as gapic_types
 from google.pubsub_v1.services.publisher import client as publisher_client
@@ -98,6 +105,13 @@ def test_init(creds):
     assert client.batch_settings.max_messages == 100
 
 
+def test_init_commit_executor(creds):
+    publisher_options = types.PublisherOptions(max_commit_workers=3)
+    client = publisher.Client(publisher_options=publisher_options, credentials=creds)
+
+    assert client._commit_executor.max_workers == 3
+
+
 def test_init_default_client_info(creds):
     client = publisher.Client(credentials=creds)
 
@@ -232,6 +246,373 @@ def test_publish(creds):
     )
 
 
+def test_publish_many(creds):
+    client = publisher.Client(credentials=creds)
+
+    batch = mock.Mock(spec=client._batch_class)
+    batch.publish.side_effect = [mock.Mock(), mock.Mock(), mock.Mock()]
+    topic = "topic/path"
+    client._set_batch(topic, batch)
+
+    attrs = {"bar": b"baz"}
+    futures = client.publish_many(
+        topic, [(b"spam", None, ""), (b"foo", attrs, ""), (b"eggs", {}, "")]
+    )
+
+    assert len(futures) == 3
+    for future in futures:
+        future.add_done_callback.assert_called_once()
+    batch.publish.assert_has_calls(
+        [
+            mock.call(gapic_types.PubsubMessage(data=b"spam")),
+            mock.call(
+                gapic_types.PubsubMessage(data=b"foo", attributes={"bar": "baz"})
+            ),
+            mock.call(gapic_types.PubsubMessage(data=b"eggs")),
+        ]
+    )
+    # The caller's attributes are not modified.
+    assert attrs == {"bar": b"baz"}
+
+
+def test_publish_many_releases_flow_control_when_done(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=2,
+            limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+        )
+    )
+    batch_settings = types.BatchSettings(max_latency=float("inf"))
+    client = publisher.Client(
+        credentials=creds,
+        publisher_options=publisher_options,
+        batch_settings=batch_settings,
+    )
+    messages = [(b"spam", None, ""), (b"eggs", None, "")]
+
+    publish_response = gapic_types.PublishResponse(message_ids=["1", "2"])
+    with mock.patch.object(client, "_gapic_publish", return_value=publish_response):
+        futures = client.publish_many("topic", messages)
+        client._commit_sequencers()
+        assert [future.result(timeout=5) for future in futures] == ["1", "2"]
+
+    # Capacity was released.
+    assert client._flow_controller._message_count == 0
+
+
+def test_publish_lightweight_futures(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=3,
+            limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+        ),
+        lightweight_futures=True,
+    )
+    batch_settings = types.BatchSettings(max_latency=float("inf"))
+    client = publisher.Client(
+        credentials=creds,
+        publisher_options=publisher_options,
+        batch_settings=batch_settings,
+    )
+    messages = [(b"spam", None, ""), (b"eggs", None, "")]
+
+    publish_response = gapic_types.PublishResponse(message_ids=["1", "2", "3"])
+    with mock.patch.object(client, "_gapic_publish", return_value=publish_response):
+        futures = [client.publish("topic", b"ham")]
+        futures.extend(client.publish_many("topic", messages))
+        assert all(isinstance(future, MessageFuture) for future in futures)
+
+        client._commit_sequencers()
+        assert [future.result(timeout=5) for future in futures] == ["1", "2", "3"]
+
+    # Capacity was released by the batch, before resolving the futures.
+    assert client._flow_controller._message_count == 0
+
+
+def test_publish_many_error_exceeding_flow_control_limits(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=10,
+            byte_limit=150,
+            limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+        )
+    )
+    client = publisher.Client(credentials=creds, publisher_options=publisher_options)
+
+    mock_batch = mock.Mock(spec=client._batch_class)
+    topic = "topic/path"
+    client._set_batch(topic, mock_batch)
+
+    future1, future2 = client.publish_many(
+        topic, [(b"a" * 100, None, ""), (b"b" * 100, None, "")]
+    )
+
+    assert future1 is mock_batch.publish.return_value
+    with pytest.raises(exceptions.FlowControlLimitError):
+        future2.result()
+    mock_batch.publish.assert_called_once()
+
+
+def test_publish_many_validates_all_messages_first(creds):
+    client = publisher.Client(credentials=creds)
+    batch = mock.Mock(spec=client._batch_class)
+    client._set_batch("topic", batch)
+
+    with pytest.raises(TypeError):
+        client.publish_many("topic", [(b"ok", None, ""), ("not bytes", None, "")])
+    with pytest.raises(TypeError):
+        client.publish_many("topic", [(b"ok", None, ""), (b"ok", {"a": 1}, "")])
+    with pytest.raises(ValueError):
+        client.publish_many("topic", [(b"ok", None, ""), (b"ok", None, "key")])
+
+    batch.publish.assert_not_called()
+
+
+def test_publish_many_with_ordering_keys(creds):
+    client = publisher.Client(
+        publisher_options=types.PublisherOptions(enable_message_ordering=True),
+        credentials=creds,
+    )
+    sequencers = {}
+
+    def get_sequencer(topic, ordering_key):
+        return sequencers.setdefault(ordering_key, mock.Mock())
+
+    with mock.patch.object(
+        client, "_get_or_create_sequencer", side_effect=get_sequencer
+    ) as get_or_create:
+        client.publish_many(
+            "topic", [(b"1", None, "a"), (b"2", None, "a"), (b"3", None, "b")]
+        )
+
+    assert get_or_create.call_count == 2
+    assert sequencers["a"].publish.call_count == 2
+    assert sequencers["b"].publish.call_count == 1
+    retry = sequencers["a"].publish.call_args.kwargs["retry"]
+    assert retry._deadline == 2.0**32
+
+
+def test_publish_many_more_messages_than_flow_control_limit_blocks(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=5,
+            limit_exceeded_behavior=types.LimitExceededBehavior.BLOCK,
+        )
+    )
+    batch_settings = types.BatchSettings(max_latency=0.01)
+    client = publisher.Client(
+        credentials=creds,
+        publisher_options=publisher_options,
+        batch_settings=batch_settings,
+    )
+
+    def gapic_publish(topic, messages, retry, timeout):
+        return gapic_types.PublishResponse(message_ids=["0"] * len(messages))
+
+    client._gapic_publish = gapic_publish
+
+    futures = []
+    publish_thread = threading.Thread(
+        target=lambda: futures.extend(
+            client.publish_many("topic", [(b"x", None, "")] * 20)
+        ),
+        daemon=True,
+    )
+    publish_thread.start()
+    publish_thread.join(timeout=10)
+
+    # Blocked messages were admitted once the messages before them were published.
+    assert not publish_thread.is_alive()
+    assert [future.result(timeout=5) for future in futures] == ["0"] * 20
+    client.stop()
+    assert client._flow_controller._message_count == 0
+
+
+def test_publish_many_message_too_large_publishes_nothing(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=10,
+            byte_limit=100 * 1000 * 1000,
+            limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+        )
+    )
+    client = publisher.Client(credentials=creds, publisher_options=publisher_options)
+    batch = mock.Mock(spec=client._batch_class)
+    client._set_batch("topic", batch)
+
+    with pytest.raises(exceptions.MessageTooLargeError):
+        client.publish_many(
+            "topic",
+            [(b"1", None, ""), (b"x" * 10 * 1000 * 1000, None, ""), (b"3", None, "")],
+        )
+
+    batch.publish.assert_not_called()
+    assert client._flow_controller._message_count == 0
+    assert client._flow_controller._total_bytes == 0
+
+
+def test_publish_many_stopped_client(creds):
+    client = publisher.Client(credentials=creds)
+    client.stop()
+
+    with pytest.raises(RuntimeError):
+        client.publish_many("topic", [(b"1", None, "")])
+
+
+def test_publish_many_stopped_while_reserving_releases_flow_control(creds):
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=10,
+            limit_exceeded_behavior=types.LimitExceededBehavior.ERROR,
+        )
+    )
+    client = publisher.Client(credentials=creds, publisher_options=publisher_options)
+    try_add_many = client._flow_controller.try_add_many
+
+    def stop_after_reserving(messages):
+        added = try_add_many(messages)
+        client.stop()
+        return added
+
+    with mock.patch.object(
+        client._flow_controller, "try_add_many", side_effect=stop_after_reserving
+    ):
+        with pytest.raises(RuntimeError):
+            client.publish_many("topic", [(b"1", None, ""), (b"2", None, "")])
+
+    assert client._flow_controller._message_count == 0
+    assert client._flow_controller._total_bytes == 0
+
+
+def test_publish_compresses_data_above_threshold(creds):
+    publisher_options = types.PublisherOptions(
+        compression=types.PublishCompression(threshold=100)
+    )
+    client = publisher.Client(credentials=creds, publisher_options=publisher_options)
+    batch = mock.Mock(spec=client._batch_class)
+    client._set_batch("topic", batch)
+
+    client.publish("topic", b"small", spam="eggs")
+    client.publish("topic", b"x" * 1000, spam="eggs")
+
+    small, large = [call.args[0] for call in batch.publish.call_args_list]
+    assert small == gapic_types.PubsubMessage(
+        data=b"small", attributes={"spam": "eggs"}
+    )
+    assert zlib.decompress(large.data) == b"x" * 1000
+    assert large.attributes == {"spam": "eggs", "googclient_compression": "zlib"}
+
+
+def test_publish_compression_lzma(creds):
+    compression = types.PublishCompression(
+        algorithm=types.CompressionAlgorithm.LZMA, threshold=0, level=1
+    )
+    client = publisher.Client(
+        credentials=creds,
+        publisher_options=types.PublisherOptions(compression=compression),
+    )
+    batch = mock.Mock(spec=client._batch_class)
+    client._set_batch("topic", batch)
+
+    client.publish("topic", b"x" * 1000)
+
+    message = batch.publish.call_args.args[0]
+    assert lzma.decompress(message.data) == b"x" * 1000
+    assert message.attributes == {"googclient_compression": "lzma"}
+
+
+def test_publish_compression_skips_incompressible_data(creds):
+    publisher_options = types.PublisherOptions(
+        compression=types.PublishCompression(threshold=0)
+    )
+    client = publisher.Client(credentials=creds, publisher_options=publisher_options)
+    batch = mock.Mock(spec=client._batch_class)
+    client._set_batch("topic", batch)
+    data = os.urandom(1000)
+
+    client.publish("topic", data)
+
+    assert batch.publish.call_args.args[0] == gapic_types.PubsubMessage(data=data)
+
+
+def test_publish_compression_reserved_attribute(creds):
+    publisher_options = types.PublisherOptions(compression=types.PublishCompression())
+    client = publisher.Client(credentials=creds, publisher_options=publisher_options)
+
+    with pytest.raises(ValueError):
+        client.publish("topic", b"foo", googclient_compression="zlib")
+
+    assert client._flow_controller._message_count == 0
+
+
+def test_publish_many_compression(creds):
+    publisher_options = types.PublisherOptions(
+        compression=types.PublishCompression(threshold=100)
+    )
+    client = publisher.Client(credentials=creds, publisher_options=publisher_options)
+    batch = mock.Mock(spec=client._batch_class)
+    client._set_batch("topic", batch)
+    attrs = {"spam": "eggs"}
+
+    client.publish_many("topic", [(b"x" * 1000, attrs, ""), (b"small", None, "")])
+
+    large, small = [call.args[0] for call in batch.publish.call_args_list]
+    assert zlib.decompress(large.data) == b"x" * 1000
+    assert large.attributes == {"spam": "eggs", "googclient_compression": "zlib"}
+    assert small == gapic_types.PubsubMessage(data=b"small")
+    # The caller's attributes are not modified.
+    assert attrs == {"spam": "eggs"}
+
+
+def test_adaptive_batching_adjusts_batch_settings(creds):
+    publisher_options = types.PublisherOptions(
+        adaptive_batching=types.AdaptiveBatching(
+            min_messages=10, max_messages=1000, target_commit_latency=1.0
+        )
+    )
+    batch_settings = types.BatchSettings(max_messages=5, max_latency=0.05)
+    client = publisher.Client(
+        credentials=creds,
+        batch_settings=batch_settings,
+        publisher_options=publisher_options,
+    )
+
+    # The initial settings are clamped to the bounds.
+    assert client.batch_settings.max_messages == 10
+
+    client._record_commit(message_count=9, latency=0.1)
+    assert client.batch_settings.max_messages == 11
+
+    client._record_commit(message_count=11, latency=2.0)
+    assert client.batch_settings.max_messages == 10
+
+
+def test_adaptive_batching_new_batches_use_adjusted_settings(creds):
+    publisher_options = types.PublisherOptions(
+        adaptive_batching=types.AdaptiveBatching()
+    )
+    client = publisher.Client(
+        credentials=creds,
+        batch_settings=types.BatchSettings(max_messages=10),
+        publisher_options=publisher_options,
+    )
+    client._record_commit(message_count=9, latency=0.01)
+
+    client.publish("topic", b"foo")
+
+    sequencer = client._get_or_create_sequencer("topic", "")
+    assert sequencer._current_batch.settings.max_messages == 11
+
+
+def test_record_commit_without_adaptive_batching(creds):
+    batch_settings = types.BatchSettings(max_messages=5)
+    client = publisher.Client(credentials=creds, batch_settings=batch_settings)
+
+    client._record_commit(message_count=4, latency=0.01)
+
+    assert client.batch_settings == batch_settings
+
+
 def test_publish_error_exceeding_flow_control_limits(creds):
     publisher_options = types.PublisherOptions(
         flow_control=types.PublishFlowControl(
@@ -445,6 +826,46 @@ def test_stop(creds):
         client.stop()
 
 
+def test_stop_shuts_down_commit_executor(creds):
+    client = publisher.Client(credentials=creds)
+    client._commit_executor = mock.Mock(spec=["shutdown"])
+
+    client.stop()
+
+    client._commit_executor.shutdown.assert_called_once_with()
+
+
+def test_commits_share_bounded_worker_pool(creds):
+    publisher_options = types.PublisherOptions(max_commit_workers=2)
+    batch_settings = types.BatchSettings(max_messages=1, max_latency=float("inf"))
+    client = publisher.Client(
+        batch_settings=batch_settings,
+        publisher_options=publisher_options,
+        credentials=creds,
+    )
+
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def fake_publish(topic, messages, retry, timeout):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return gapic_types.PublishResponse(message_ids=["1"] * len(messages))
+
+    with mock.patch.object(client, "_gapic_publish", side_effect=fake_publish):
+        futures = [client.publish("topic", b"msg") for _ in range(8)]
+        for future in futures:
+            future.result(timeout=5)
+
+    assert max_in_flight <= 2
+
+
 def test_gapic_instance_method(creds):
     client = publisher.Client(credentials=creds)
 
@@ -503,12 +924,13 @@ def test_commit_thread_created_on_publish(creds):
         # created, so let's put a sentinel there to mimic real behavior.
         client._commit_thread = mock.Mock()
 
-        # Second publish should not create a commit thread since one (the mock)
-        # already exists.
-        assert client.publish("topic", b"bytestring body", ordering_key="") is not None
-        # Call count should remain 1.
+        # Publishing to another topic opens another batch, but the same long-lived
+        # commit thread takes care of it.
+        assert client.publish("topic2", b"bytestring body", ordering_key="") is not None
         _start_commit_thread.assert_called_once()
 
+    assert len(client._commit_deadlines) == 2
+
 
 def test_commit_thread_not_created_on_publish_if_max_latency_is_inf(creds):
     # Max latency is infinite so a commit thread is not created.
@@ -517,46 +939,128 @@ def test_commit_thread_not_created_on_publish_if_max_latency_is_inf(creds):
 
     assert client.publish("topic", b"bytestring body", ordering_key="") is not None
     assert client._commit_thread is None
+    assert client._commit_deadlines == []
 
 
-def test_wait_and_commit_sequencers(creds):
-    # Max latency is infinite so a commit thread is not created.
-    # We don't want a commit thread to interfere with this test.
+def test_commit_thread_commits_batches_at_their_deadlines(creds):
+    batch_settings = types.BatchSettings(max_latency=0.2)
+    client = publisher.Client(batch_settings=batch_settings, credentials=creds)
+
+    commit_times = {}
+    commit_done = threading.Event()
+
+    def gapic_publish(topic, messages, retry, timeout):
+        commit_times[topic] = time.monotonic()
+        if len(commit_times) == 2:
+            commit_done.set()
+        return gapic_types.PublishResponse(message_ids=["1"] * len(messages))
+
+    client._gapic_publish = gapic_publish
+
+    start = time.monotonic()
+    client.publish("topic", b"foo")
+    time.sleep(0.1)
+    client.publish("topic2", b"bar")
+
+    assert commit_done.wait(timeout=5)
+    client.stop()
+
+    # Each batch waits for the full max latency since it was opened, regardless
+    # of when other batches have been opened.
+    assert commit_times["topic"] - start >= 0.2
+    assert commit_times["topic2"] - start >= 0.3
+    assert commit_times["topic2"] - commit_times["topic"] >= 0.05
+
+
+def test_commit_thread_skips_batches_already_committed(creds):
     batch_settings = types.BatchSettings(max_latency=float("inf"))
     client = publisher.Client(batch_settings=batch_settings, credentials=creds)
 
-    # Mock out time so no sleep is actually done.
-    with mock.patch.object(time, "sleep"):
-        with mock.patch.object(client, "_commit_sequencers") as _commit_sequencers:
-            assert (
-                client.publish("topic", b"bytestring body", ordering_key="") is not None
-            )
-            # Call _wait_and_commit_sequencers to simulate what would happen if a
-            # commit thread actually ran.
-            client._wait_and_commit_sequencers()
-            assert _commit_sequencers.call_count == 1
+    sequencer = mock.Mock(spec=ordered_sequencer.OrderedSequencer)
+    client._set_sequencer(topic="topic", sequencer=sequencer, ordering_key="key")
+    batch = mock.Mock(spec=client._batch_class, status=BatchStatus.IN_PROGRESS)
+    batch2 = mock.Mock(spec=client._batch_class, status=BatchStatus.ACCEPTING_MESSAGES)
 
+    client._commit_batch(("topic", "key"), batch)
+    sequencer.commit.assert_not_called()
 
-def test_stopped_client_does_not_commit_sequencers(creds):
-    # Max latency is infinite so a commit thread is not created.
-    # We don't want a commit thread to interfere with this test.
+    # Only the batch still accepting messages is committed through its sequencer.
+    client._commit_batch(("topic", "key"), batch2)
+    sequencer.commit.assert_called_once_with()
+
+    # Batches of sequencers that have been cleaned up are ignored.
+    client._commit_batch(("topic", "other_key"), batch2)
+    sequencer.commit.assert_called_once_with()
+
+
+def test_wait_and_commit_sequencers_processes_due_deadlines(creds):
     batch_settings = types.BatchSettings(max_latency=float("inf"))
     client = publisher.Client(batch_settings=batch_settings, credentials=creds)
+    batch = mock.Mock(spec=client._batch_class)
 
-    # Mock out time so no sleep is actually done.
-    with mock.patch.object(time, "sleep"):
-        with mock.patch.object(client, "_commit_sequencers") as _commit_sequencers:
-            assert (
-                client.publish("topic", b"bytestring body", ordering_key="") is not None
-            )
+    with client._batch_lock:
+        client._commit_deadlines.extend(
+            [(0.0, 0, ("topic", "key"), batch), (0.0, 1, ("topic", ""), batch)]
+        )
 
-            client.stop()
+    # Stop the client once the due deadlines have been processed.
+    def wait(timeout=None):
+        assert not client._commit_deadlines
+        client._is_stopped = True
 
-            # Call _wait_and_commit_sequencers to simulate what would happen if a
-            # commit thread actually ran after the client was stopped.
+    with mock.patch.object(client, "_commit_batch") as _commit_batch:
+        with mock.patch.object(client._commit_deadlines_changed, "wait", wait):
             client._wait_and_commit_sequencers()
-            # Should not be called since Client is stopped.
-            assert _commit_sequencers.call_count == 0
+
+    assert _commit_batch.mock_calls == [
+        mock.call(("topic", "key"), batch),
+        mock.call(("topic", ""), batch),
+    ]
+
+
+def test_cleanup_scheduled_once(creds):
+    batch_settings = types.BatchSettings(max_latency=600)
+    client = publisher.Client(batch_settings=batch_settings, credentials=creds)
+
+    with mock.patch.object(client, "_start_commit_thread", autospec=True):
+        client.ensure_cleanup_and_commit_timer_runs()
+        client.ensure_cleanup_and_commit_timer_runs()
+
+    assert len(client._commit_deadlines) == 1
+    assert client._commit_deadlines[0][2:] == (None, None)
+
+
+def test_wait_and_commit_sequencers_cleanup(creds):
+    batch_settings = types.BatchSettings(max_latency=float("inf"))
+    client = publisher.Client(batch_settings=batch_settings, credentials=creds)
+    client._cleanup_scheduled = True
+    client._commit_deadlines.append((0.0, 0, None, None))
+
+    def wait(timeout=None):
+        client._is_stopped = True
+
+    with mock.patch.object(client, "_commit_sequencers") as _commit_sequencers:
+        with mock.patch.object(client._commit_deadlines_changed, "wait", wait):
+            client._wait_and_commit_sequencers()
+
+    assert _commit_sequencers.call_count == 1
+    assert not client._cleanup_scheduled
+
+
+def test_stopped_client_does_not_commit_sequencers(creds):
+    batch_settings = types.BatchSettings(max_latency=600)
+    client = publisher.Client(batch_settings=batch_settings, credentials=creds)
+
+    with mock.patch.object(client, "_commit_sequencers") as _commit_sequencers:
+        assert client.publish("topic", b"bytestring body", ordering_key="") is not None
+        client.ensure_cleanup_and_commit_timer_runs()
+
+        client.stop()
+
+        # The commit thread exits without waiting for the remaining deadlines.
+        client._commit_thread.join(timeout=5)
+        assert not client._commit_thread.is_alive()
+        assert _commit_sequencers.call_count == 0
 
 
 def test_publish_with_ordering_key(creds):
@@ -615,15 +1119,18 @@ def test_ordered_sequencer_cleaned_up(creds):
     sequencer.is_finished.return_value = False
     client._set_sequencer(topic=topic, sequencer=sequencer, ordering_key=ordering_key)
 
-    assert len(client._sequencers) == 1
+    def sequencer_count():
+        return sum(len(shard) for shard in client._sequencer_shards)
+
+    assert sequencer_count() == 1
     # 'sequencer' is not finished yet so don't remove it.
     client._commit_sequencers()
-    assert len(client._sequencers) == 1
+    assert sequencer_count() == 1
 
     sequencer.is_finished.return_value = True
     # 'sequencer' is finished so remove it.
     client._commit_sequencers()
-    assert len(client._sequencers) == 0
+    assert sequencer_count() == 0
 
 
 def test_resume_publish(creds):
@@ -655,3 +1162,28 @@ def test_resume_publish_ordering_keys_not_enabled(creds):
     # Throw on calling resume_publish() when enable_message_ordering is False.
     with pytest.raises(ValueError):
         client.resume_publish("topic", "ord_key")
+
+
+def test_publish_does_not_block_on_unrelated_ordering_key(creds):
+    client = publisher.Client(
+        credentials=creds,
+        publisher_options=types.PublisherOptions(enable_message_ordering=True),
+    )
+    # Find two ordering keys that live in different sequencer shards.
+    key_a = "key-a"
+    key_b = next(
+        "key-b-{}".format(i)
+        for i in itertools.count()
+        if client._shard_index(("topic", "key-b-{}".format(i)))
+        != client._shard_index(("topic", key_a))
+    )
+    batch = mock.Mock(spec=client._batch_class)
+    batch.publish.return_value = mock.sentinel.future
+    client._set_batch("topic", batch, ordering_key=key_b)
+
+    lock_a = client._sequencer_locks[client._shard_index(("topic", key_a))]
+    with lock_a:
+        # Would deadlock if both keys were guarded by the same lock.
+        future = client.publish("topic", b"foo", ordering_key=key_b)
+
+    assert future is mock.sentinel.future
@@ -16,6 +16,7 @@ import collections
 import queue
 import sys
 import threading
+import time
 
 from google.cloud.pubsub_v1.subscriber._protocol import dispatcher
 from google.cloud.pubsub_v1.subscriber._protocol import helper_threads
@@ -451,136 +452,262 @@ def test_ack_splitting_large_payload():
     assert sent_ack_ids.most_common(1)[0][1] == 1  # each message ACK-ed exactly once
 
 
-def test_retry_acks_in_new_thread():
+def make_ack_request(ack_id, future=None):
+    return requests.AckRequest(
+        ack_id=ack_id, byte_size=0, time_to_ack=20, ordering_key="", future=future
+    )
+
+
+def test_retry_acks_scheduled():
     manager = mock.create_autospec(
         streaming_pull_manager.StreamingPullManager, instance=True
     )
     dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
 
-    f = futures.Future()
-    items = [
-        requests.AckRequest(
-            ack_id="ack_id_string",
-            byte_size=0,
-            time_to_ack=20,
-            ordering_key="",
-            future=f,
-        )
-    ]
-    # failure triggers creation of new retry thread
+    items = [make_ack_request("ack_id_string", future=futures.Future())]
+    # failure schedules a retry
     manager.send_unary_ack.side_effect = [([], items)]
-    with mock.patch("time.sleep", return_value=None):
-        with mock.patch.object(threading, "Thread", autospec=True) as Thread:
-            dispatcher_.ack(items)
+    with mock.patch.object(dispatcher_._retry_scheduler, "add") as add:
+        dispatcher_.ack(items)
 
-            assert len(Thread.mock_calls) == 2
-            ctor_call = Thread.mock_calls[0]
-            assert ctor_call.kwargs["name"] == "Thread-RetryAcks"
-            assert ctor_call.kwargs["target"].args[0] == items
-            assert ctor_call.kwargs["daemon"]
+    add.assert_called_once_with(items)
 
 
-def test_retry_acks():
+def test_retry_modacks_scheduled():
     manager = mock.create_autospec(
         streaming_pull_manager.StreamingPullManager, instance=True
     )
     dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
 
-    f = futures.Future()
     items = [
-        requests.AckRequest(
-            ack_id="ack_id_string",
-            byte_size=0,
-            time_to_ack=20,
-            ordering_key="",
-            future=f,
-        )
+        requests.ModAckRequest(ack_id="ack_id_string", seconds=20, future=None),
     ]
-    # first and second `send_unary_ack` calls fail, third one succeeds
-    manager.send_unary_ack.side_effect = [([], items), ([], items), (items, [])]
-    with mock.patch("time.sleep", return_value=None):
-        dispatcher_._retry_acks(items)
+    # failure schedules a retry
+    manager.send_unary_modack.side_effect = [([], items)]
+    with mock.patch.object(dispatcher_._retry_scheduler, "add") as add:
+        dispatcher_.modify_ack_deadline(items)
 
-    manager.send_unary_ack.assert_has_calls(
-        [
-            mock.call(
-                ack_ids=["ack_id_string"], ack_reqs_dict={"ack_id_string": items[0]}
-            ),
-            mock.call(
-                ack_ids=["ack_id_string"], ack_reqs_dict={"ack_id_string": items[0]}
-            ),
-            mock.call(
-                ack_ids=["ack_id_string"], ack_reqs_dict={"ack_id_string": items[0]}
-            ),
-        ]
-    )
+    add.assert_called_once_with(items)
 
 
-def test_retry_modacks_in_new_thread():
+def test_retry_queue_size():
     manager = mock.create_autospec(
         streaming_pull_manager.StreamingPullManager, instance=True
     )
     dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
+    assert dispatcher_.retry_queue_size == 0
 
-    f = futures.Future()
-    items = [
-        requests.ModAckRequest(
-            ack_id="ack_id_string",
-            seconds=20,
-            future=f,
+    # Without a running retry thread, the requests stay queued.
+    with mock.patch.object(threading, "Thread", autospec=True):
+        dispatcher_._retry_scheduler.add(
+            [make_ack_request("ack_id_1"), make_ack_request("ack_id_2")],
+            retry_delays=iter([60]),
         )
-    ]
-    # failure triggers creation of new retry thread
-    manager.send_unary_modack.side_effect = [([], items)]
-    with mock.patch("time.sleep", return_value=None):
-        with mock.patch.object(threading, "Thread", autospec=True) as Thread:
-            dispatcher_.modify_ack_deadline(items)
+        dispatcher_._retry_scheduler.add(
+            [make_ack_request("ack_id_3")], retry_delays=iter([60])
+        )
+
+    assert dispatcher_.retry_queue_size == 3
 
-            assert len(Thread.mock_calls) == 2
-            ctor_call = Thread.mock_calls[0]
-            assert ctor_call.kwargs["name"] == "Thread-RetryModAcks"
-            assert ctor_call.kwargs["target"].args[0] == items
-            assert ctor_call.kwargs["daemon"]
 
+def add_and_capture_retry_thread(retry_scheduler, items):
+    threads = []
+    thread_class = threading.Thread
 
+    def make_thread(*args, **kwargs):
+        threads.append(thread_class(*args, **kwargs))
+        return threads[-1]
+
+    with mock.patch.object(threading, "Thread", side_effect=make_thread):
+        retry_scheduler.add(items)
+
+    assert len(threads) == 1
+    return threads[0]
+
+
+@mock.patch.object(
+    dispatcher, "_MIN_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS", 0.01
+)
+def test_retry_acks():
+    manager = mock.create_autospec(
+        streaming_pull_manager.StreamingPullManager, instance=True
+    )
+    dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
+
+    items = [make_ack_request("ack_id_string", future=futures.Future())]
+    # first and second `send_unary_ack` calls fail, third one succeeds
+    manager.send_unary_ack.side_effect = [([], items), ([], items), (items, [])]
+    retry_thread = add_and_capture_retry_thread(retry_scheduler, items)
+    assert retry_thread.name == dispatcher._RETRY_THREAD_NAME
+    assert retry_thread.daemon
+
+    # The thread exits once the requests have succeeded.
+    retry_thread.join(timeout=5)
+    assert not retry_thread.is_alive()
+    assert retry_scheduler._thread is None
+
+    expected_call = mock.call(
+        ack_ids=["ack_id_string"], ack_reqs_dict={"ack_id_string": items[0]}
+    )
+    assert manager.send_unary_ack.mock_calls == [expected_call] * 3
+    manager.leaser.remove.assert_called_with(items)
+
+
+@mock.patch.object(
+    dispatcher, "_MIN_EXACTLY_ONCE_DELIVERY_ACK_MODACK_RETRY_DURATION_SECS", 0.01
+)
 def test_retry_modacks():
     manager = mock.create_autospec(
         streaming_pull_manager.StreamingPullManager, instance=True
     )
     dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
 
-    f = futures.Future()
     items = [
-        requests.ModAckRequest(
-            ack_id="ack_id_string",
-            seconds=20,
-            future=f,
-        )
+        requests.ModAckRequest(ack_id="ack_id_string", seconds=20, future=None),
     ]
     # first and second calls fail, third one succeeds
     manager.send_unary_modack.side_effect = [([], items), ([], items), (items, [])]
-    with mock.patch("time.sleep", return_value=None):
-        dispatcher_._retry_modacks(items)
-
-    manager.send_unary_modack.assert_has_calls(
-        [
-            mock.call(
-                modify_deadline_ack_ids=["ack_id_string"],
-                modify_deadline_seconds=[20],
-                ack_reqs_dict={"ack_id_string": items[0]},
-            ),
-            mock.call(
-                modify_deadline_ack_ids=["ack_id_string"],
-                modify_deadline_seconds=[20],
-                ack_reqs_dict={"ack_id_string": items[0]},
-            ),
-            mock.call(
-                modify_deadline_ack_ids=["ack_id_string"],
-                modify_deadline_seconds=[20],
-                ack_reqs_dict={"ack_id_string": items[0]},
-            ),
-        ]
+    retry_thread = add_and_capture_retry_thread(retry_scheduler, items)
+    retry_thread.join(timeout=5)
+    assert not retry_thread.is_alive()
+
+    expected_call = mock.call(
+        modify_deadline_ack_ids=["ack_id_string"],
+        modify_deadline_seconds=[20],
+        ack_reqs_dict={"ack_id_string": items[0]},
+    )
+    assert manager.send_unary_modack.mock_calls == [expected_call] * 3
+    manager.leaser.remove.assert_not_called()
+
+
+def test_retry_scheduler_uses_single_thread():
+    dispatcher_ = dispatcher.Dispatcher(mock.sentinel.manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
+
+    with mock.patch.object(threading, "Thread", autospec=True) as Thread:
+        for i in range(10):
+            retry_scheduler.add([make_ack_request(f"ack_{i}")])
+
+    Thread.assert_called_once_with(
+        name=dispatcher._RETRY_THREAD_NAME, target=retry_scheduler._run, daemon=True
+    )
+    assert len(retry_scheduler._heap) == 10
+
+
+def test_retry_scheduler_waits_for_due_entries():
+    dispatcher_ = dispatcher.Dispatcher(mock.sentinel.manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
+    retry_scheduler._thread = mock.sentinel.thread
+
+    due = [make_ack_request("due_1"), make_ack_request("due_2")]
+    later = [make_ack_request("later")]
+    retry_scheduler.add(due[:1], iter([1.0]))
+    retry_scheduler.add(due[1:], iter([1.05]))
+    retry_scheduler.add(later, iter([5.0]))
+
+    monotonic = time.monotonic()
+    with mock.patch.object(retry_scheduler._condition, "wait") as wait, mock.patch(
+        "time.monotonic", side_effect=[monotonic, monotonic + 1.0, monotonic + 1.0]
+    ):
+        due_entries = retry_scheduler._wait_for_due_entries()
+
+    wait.assert_called_once()
+    # The entries due within the merge window are taken together.
+    assert [entry[2] for entry in due_entries] == [due[:1], due[1:]]
+    assert [entry[2] for entry in retry_scheduler._heap] == [later]
+
+
+def test_retry_scheduler_thread_exits_when_empty():
+    dispatcher_ = dispatcher.Dispatcher(mock.sentinel.manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
+    retry_scheduler._thread = mock.sentinel.thread
+
+    assert retry_scheduler._wait_for_due_entries() == []
+    assert retry_scheduler._thread is None
+
+
+def test_retry_scheduler_merges_due_retries():
+    manager = mock.create_autospec(
+        streaming_pull_manager.StreamingPullManager, instance=True
+    )
+    dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
+
+    group_1 = [make_ack_request("ack_1"), make_ack_request("ack_2")]
+    group_2 = [make_ack_request("ack_3")]
+    modacks = [requests.ModAckRequest(ack_id="ack_4", seconds=10, future=None)]
+    delays_1 = iter([2.0])
+    delays_2 = iter([4.0])
+    delays_3 = iter([8.0])
+    due_entries = [
+        (0.0, 0, group_1, delays_1),
+        (0.0, 1, group_2, delays_2),
+        (0.0, 2, modacks, delays_3),
+    ]
+    # ack_2 and ack_3 fail again, the rest succeeds
+    manager.send_unary_ack.return_value = (group_1[:1], [group_1[1], group_2[0]])
+    manager.send_unary_modack.return_value = (modacks, [])
+
+    with mock.patch.object(retry_scheduler, "add") as add:
+        retry_scheduler._retry(due_entries)
+
+    manager.send_unary_ack.assert_called_once_with(
+        ack_ids=["ack_1", "ack_2", "ack_3"],
+        ack_reqs_dict={req.ack_id: req for req in group_1 + group_2},
     )
+    manager.send_unary_modack.assert_called_once_with(
+        modify_deadline_ack_ids=["ack_4"],
+        modify_deadline_seconds=[10],
+        ack_reqs_dict={"ack_4": modacks[0]},
+    )
+    manager.leaser.remove.assert_called_once_with(group_1[:1])
+    # Each failed request keeps the backoff of its own group.
+    assert add.mock_calls == [
+        mock.call([group_1[1]], delays_1),
+        mock.call([group_2[0]], delays_2),
+    ]
+
+
+def test_retry_scheduler_defers_duplicate_ack_ids():
+    manager = mock.create_autospec(
+        streaming_pull_manager.StreamingPullManager, instance=True
+    )
+    dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
+
+    first = requests.ModAckRequest(ack_id="ack_1", seconds=10, future=None)
+    duplicate = requests.ModAckRequest(ack_id="ack_1", seconds=20, future=None)
+    delays = iter([2.0])
+    manager.send_unary_modack.return_value = ([first], [])
+
+    with mock.patch.object(retry_scheduler, "add") as add:
+        retry_scheduler._retry(
+            [(0.0, 0, [first], delays), (0.0, 1, [duplicate], delays)]
+        )
+
+    manager.send_unary_modack.assert_called_once_with(
+        modify_deadline_ack_ids=["ack_1"],
+        modify_deadline_seconds=[10],
+        ack_reqs_dict={"ack_1": first},
+    )
+    add.assert_called_once_with([duplicate], delays)
+
+
+def test_retry_scheduler_logs_send_error(caplog):
+    manager = mock.create_autospec(
+        streaming_pull_manager.StreamingPullManager, instance=True
+    )
+    manager.send_unary_ack.side_effect = ValueError("meep")
+    dispatcher_ = dispatcher.Dispatcher(manager, mock.sentinel.queue)
+    retry_scheduler = dispatcher_._retry_scheduler
+
+    with mock.patch.object(retry_scheduler, "add") as add:
+        retry_scheduler._retry([(0.0, 0, [make_ack_request("ack_1")], iter([]))])
+
+    assert "Error retrying 1 ack(s)/modack(s)" in caplog.text
+    add.assert_not_called()
 
 
 def test_lease():
@@ -793,3 +920,95 @@ def test_stop_no_join():
     dispatcher_ = dispatcher.Dispatcher(mock.sentinel.manager, mock.sentinel.queue)
 
     dispatcher_.stop()
+
+
+def test_constructor_invalid_max_ack_rpc_concurrency():
+    with pytest.raises(ValueError, match="max_ack_rpc_concurrency"):
+        dispatcher.Dispatcher(
+            mock.sentinel.manager, mock.sentinel.queue, max_ack_rpc_concurrency=0
+        )
+
+
+def test_ack_and_modack_with_concurrent_senders():
+    manager = mock.create_autospec(
+        streaming_pull_manager.StreamingPullManager, instance=True
+    )
+    dispatcher_ = dispatcher.Dispatcher(
+        manager, queue.Queue(), max_ack_rpc_concurrency=2
+    )
+    dispatcher_.start()
+
+    sender_threads = []
+
+    def send_unary_ack(ack_ids, ack_reqs_dict):
+        sender_threads.append(threading.current_thread().name)
+        return list(ack_reqs_dict.values()), []
+
+    def send_unary_modack(**kwargs):
+        sender_threads.append(threading.current_thread().name)
+        return [], []
+
+    manager.send_unary_ack.side_effect = send_unary_ack
+    manager.send_unary_modack.side_effect = send_unary_modack
+
+    ack_items = [
+        requests.AckRequest(
+            ack_id=str(i).zfill(176),
+            byte_size=0,
+            time_to_ack=20,
+            ordering_key="",
+            future=None,
+        )
+        for i in range(2500)
+    ]
+    modack_items = [requests.ModAckRequest(ack_id="ack_id", seconds=60, future=None)]
+    dispatcher_.ack(ack_items)
+    dispatcher_.modify_ack_deadline(modack_items)
+
+    # Stopping waits for the sent requests to complete.
+    dispatcher_.stop()
+
+    assert manager.send_unary_ack.call_count == 3
+    sent_ack_ids = set()
+    for call in manager.send_unary_ack.call_args_list:
+        sent_ack_ids.update(call.kwargs["ack_ids"])
+    assert sent_ack_ids == {item.ack_id for item in ack_items}
+    manager.send_unary_modack.assert_called_once_with(
+        modify_deadline_ack_ids=["ack_id"],
+        modify_deadline_seconds=[60],
+        ack_reqs_dict={"ack_id": modack_items[0]},
+        default_deadline=None,
+    )
+
+    assert len(sender_threads) == 4
+    assert all(
+        name.startswith(dispatcher._ACK_SENDER_NAME_PREFIX) for name in sender_threads
+    )
+    assert manager.leaser.remove.call_count == 3
+    assert dispatcher_._sender is None
+
+
+def test_concurrent_sender_error_is_logged(caplog):
+    manager = mock.create_autospec(
+        streaming_pull_manager.StreamingPullManager, instance=True
+    )
+    manager.send_unary_ack.side_effect = ValueError("meep")
+    dispatcher_ = dispatcher.Dispatcher(
+        manager, queue.Queue(), max_ack_rpc_concurrency=2
+    )
+    dispatcher_.start()
+
+    items = [
+        requests.AckRequest(
+            ack_id="ack_id_string",
+            byte_size=0,
+            time_to_ack=20,
+            ordering_key="",
+            future=None,
+        )
+    ]
+    dispatcher_.ack(items)
+    dispatcher_.stop()
+
+    assert "Error sending ack or modack requests" in caplog.text
+    manager.leaser.remove.assert_not_called()
@@ -87,6 +87,17 @@ class TestStreamingPullFuture(object):
         manager.close.assert_called_once()
         assert future.cancelled()
 
+    def test_metrics(self):
+        future = self.make_future()
+        manager = future._StreamingPullFuture__manager
+        manager.metrics.snapshot.return_value = {"messages_received_total": 3}
+
+        assert future.metrics() == {"messages_received_total": 3}
+        assert future.prometheus_metrics(labels={"subscription": "sub"}) == (
+            "# TYPE pubsub_subscriber_messages_received_total counter\n"
+            'pubsub_subscriber_messages_received_total{subscription="sub"} 3.0\n'
+        )
+
 
 class TestFuture(object):
     def test_cancel(self):
@@ -21,6 +21,10 @@ else:
     from unittest import mock
 
 import queue
+import threading
+import time
+
+import pytest
 
 from google.cloud.pubsub_v1.subscriber._protocol import helper_threads
 
@@ -123,3 +127,88 @@ def test_queue_callback_worker_exception():
         # Assert that we got the expected calls.
         assert get.call_count == 3
         callback.assert_called_once_with([mock.sentinel.A])
+
+
+def test_batch_queue_put_and_get():
+    queue_ = helper_threads.BatchQueue()
+    assert queue_.empty()
+
+    queue_.put(mock.sentinel.A)
+    queue_.put_nowait(mock.sentinel.B)
+
+    assert queue_.qsize() == 2
+    assert not queue_.empty()
+    assert not queue_.full()
+    assert queue_.get() is mock.sentinel.A
+    assert queue_.get_nowait() is mock.sentinel.B
+    assert queue_.empty()
+
+
+def test_batch_queue_get_empty():
+    queue_ = helper_threads.BatchQueue()
+
+    with pytest.raises(queue.Empty):
+        queue_.get_nowait()
+
+    start = time.monotonic()
+    with pytest.raises(queue.Empty):
+        queue_.get(timeout=0.05)
+    assert time.monotonic() - start >= 0.05
+
+
+def test_batch_queue_get_wakes_up_on_put():
+    queue_ = helper_threads.BatchQueue()
+    timer = threading.Timer(0.05, queue_.put, args=(mock.sentinel.A,))
+    timer.start()
+
+    assert queue_.get(timeout=5) is mock.sentinel.A
+    timer.join()
+
+
+def test_batch_queue_get_many():
+    queue_ = helper_threads.BatchQueue()
+    for i in range(5):
+        queue_.put(i)
+
+    assert queue_.get_many(max_items=3) == [0, 1, 2]
+    assert queue_.get_many() == [3, 4]
+    assert queue_.empty()
+
+
+def test_batch_queue_get_many_waits_for_more_items():
+    queue_ = helper_threads.BatchQueue()
+    queue_.put(mock.sentinel.A)
+    timer = threading.Timer(0.05, queue_.put, args=(mock.sentinel.B,))
+    timer.start()
+
+    items = queue_.get_many(max_items=2, max_latency=5)
+    timer.join()
+
+    assert items == [mock.sentinel.A, mock.sentinel.B]
+
+
+def test_batch_queue_get_many_max_latency():
+    queue_ = helper_threads.BatchQueue()
+    queue_.put(mock.sentinel.A)
+
+    start = time.monotonic()
+    assert queue_.get_many(max_items=2, max_latency=0.05) == [mock.sentinel.A]
+    assert time.monotonic() - start >= 0.05
+
+
+def test_queue_callback_worker_batch_queue():
+    queue_ = helper_threads.BatchQueue()
+    callback = mock.Mock(spec=())
+    qct = helper_threads.QueueCallbackWorker(queue_, callback, max_items=2)
+
+    for item in (mock.sentinel.A, mock.sentinel.B, mock.sentinel.C):
+        queue_.put(item)
+    queue_.put(helper_threads.STOP)
+    qct()
+
+    callback.assert_has_calls(
+        [
+            mock.call([mock.sentinel.A, mock.sentinel.B]),
+            mock.call([mock.sentinel.C]),
+        ]
+    )
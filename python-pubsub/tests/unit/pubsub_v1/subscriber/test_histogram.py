@@ -12,16 +12,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import sys
+
+# special case python < 3.8
+if sys.version_info.major == 3 and sys.version_info.minor < 8:
+    import mock
+else:
+    from unittest import mock
+
+import pytest
+
 from google.cloud.pubsub_v1.subscriber._protocol import histogram
 
 
 def test_init():
-    data = {}
-    histo = histogram.Histogram(data=data)
-    assert histo._data is data
+    histo = histogram.Histogram()
     assert len(histo) == 0
 
 
+def test_init_invalid_half_life():
+    with pytest.raises(ValueError):
+        histogram.Histogram(half_life=0)
+
+
 def test_contains():
     histo = histogram.Histogram()
     histo.add(10)
@@ -56,9 +69,11 @@ def test_min():
 def test_add():
     histo = histogram.Histogram()
     histo.add(60)
-    assert histo._data[60] == 1
-    histo.add(60)
-    assert histo._data[60] == 2
+    assert len(histo) == 1
+    assert 60 in histo
+    histo.add(60.5)
+    assert len(histo) == 2
+    assert histo.percentile(50) == histo.percentile(100) == 60
 
 
 def test_add_lower_limit():
@@ -85,3 +100,56 @@ def test_percentile():
     assert histo.percentile(101) == 200
     assert histo.percentile(99) == 199
     assert histo.percentile(1) == 101
+
+
+def test_percentile_with_repeated_values():
+    histo = histogram.Histogram()
+    for _ in range(98):
+        histo.add(20)
+    histo.add(30)
+    histo.add(40)
+    assert histo.percentile(98) == 20
+    assert histo.percentile(99) == 30
+    assert histo.percentile(99.5) == 40
+    assert histo.percentile(0) == histogram.MIN_ACK_DEADLINE
+
+
+def test_percentile_all_buckets():
+    histo = histogram.Histogram()
+    for value in range(histogram.MIN_ACK_DEADLINE, histogram.MAX_ACK_DEADLINE + 1):
+        histo.add(value)
+    assert histo.min == histogram.MIN_ACK_DEADLINE
+    assert histo.max == histogram.MAX_ACK_DEADLINE
+    assert histo.percentile(100) == histogram.MAX_ACK_DEADLINE
+    assert histo.percentile(50) == 305
+
+
+def test_half_life_favors_recent_values():
+    with mock.patch.object(histogram.time, "monotonic", return_value=0):
+        histo = histogram.Histogram(half_life=10)
+        for _ in range(10):
+            histo.add(100)
+
+    # Twenty seconds later, the old values count as much as 2.5 new values.
+    with mock.patch.object(histogram.time, "monotonic", return_value=20):
+        for _ in range(10):
+            histo.add(20)
+
+    assert len(histo) == 20
+    assert histo.percentile(75) == 20
+    assert histo.percentile(99) == 100
+
+
+def test_half_life_rescales_weights():
+    with mock.patch.object(histogram.time, "monotonic", return_value=0):
+        histo = histogram.Histogram(half_life=1)
+        histo.add(100)
+
+    with mock.patch.object(histogram.time, "monotonic", return_value=1000):
+        histo.add(20)
+        histo.add(30)
+
+    # The old value is forgotten for all practical purposes.
+    assert histo._total_weight == 2
+    assert histo.percentile(99) == 30
+    assert len(histo) == 3
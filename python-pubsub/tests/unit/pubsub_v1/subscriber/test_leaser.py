@@ -100,7 +100,7 @@ def test_maintain_leases_inactive_manager(caplog):
     manager.is_active = False
 
     leaser_ = leaser.Leaser(manager)
-    make_sleep_mark_event_as_done(leaser_)
+    make_sleep_mark_event_as_done_after_rotation(leaser_)
     leaser_.add(
         [requests.LeaseRequest(ack_id="my_ack_ID", byte_size=42, ordering_key="")]
     )
@@ -126,20 +126,29 @@ def test_maintain_leases_stopped(caplog):
     assert "exiting" in caplog.text
 
 
-def make_sleep_mark_event_as_done(leaser):
-    # Make sleep actually trigger the done event so that heartbeat()
-    # exits at the end of the first run.
+def make_sleep_mark_event_as_done(leaser_, cycles=1):
+    # Make sleep actually trigger the done event so that maintain_leases()
+    # exits at the end of the given number of runs.
+    remaining = [cycles]
+
     def trigger_done(timeout):
         assert 0 < timeout < 10
-        leaser._stop_event.set()
+        remaining[0] -= 1
+        if not remaining[0]:
+            leaser_._stop_event.set()
+
+    leaser_._stop_event.wait = trigger_done
+
 
-    leaser._stop_event.wait = trigger_done
+def make_sleep_mark_event_as_done_after_rotation(leaser_):
+    # New leases are first renewed after all the renewal slots have been renewed.
+    make_sleep_mark_event_as_done(leaser_, cycles=leaser._RENEWAL_SLOTS)
 
 
 def test_maintain_leases_ack_ids():
     manager = create_manager()
     leaser_ = leaser.Leaser(manager)
-    make_sleep_mark_event_as_done(leaser_)
+    make_sleep_mark_event_as_done_after_rotation(leaser_)
     leaser_.add(
         [requests.LeaseRequest(ack_id="my ack id", byte_size=50, ordering_key="")]
     )
@@ -157,7 +166,7 @@ def test_maintain_leases_ack_ids():
 def test_maintain_leases_expired_ack_ids_ignored():
     manager = create_manager()
     leaser_ = leaser.Leaser(manager)
-    make_sleep_mark_event_as_done(leaser_)
+    make_sleep_mark_event_as_done_after_rotation(leaser_)
     leaser_.add(
         [requests.LeaseRequest(ack_id="my ack id", byte_size=50, ordering_key="")]
     )
@@ -176,7 +185,7 @@ def test_maintain_leases_expired_ack_ids_ignored():
 def test_maintain_leases_expired_ack_ids_exactly_once():
     manager = create_manager()
     leaser_ = leaser.Leaser(manager)
-    make_sleep_mark_event_as_done(leaser_)
+    make_sleep_mark_event_as_done_after_rotation(leaser_)
     leaser_.add(
         [requests.LeaseRequest(ack_id="my ack id", byte_size=50, ordering_key="")]
     )
@@ -213,7 +222,7 @@ def test_maintain_leases_no_ack_ids():
 def test_maintain_leases_outdated_items(time):
     manager = create_manager()
     leaser_ = leaser.Leaser(manager)
-    make_sleep_mark_event_as_done(leaser_)
+    make_sleep_mark_event_as_done_after_rotation(leaser_)
 
     # Add and start expiry timer at the beginning of the timeline.
     time.return_value = 0
@@ -250,6 +259,104 @@ def test_maintain_leases_outdated_items(time):
     )
 
 
+def test_maintain_leases_renews_one_slot_per_cycle():
+    manager = create_manager()
+    manager._send_lease_modacks.return_value = set()
+    leaser_ = leaser.Leaser(manager)
+    leaser_.add([requests.LeaseRequest(ack_id="ack1", byte_size=50, ordering_key="")])
+
+    cycles = []
+
+    def wait(timeout):
+        cycles.append(timeout)
+        if len(cycles) == 1:
+            # Added to the slot renewed in the first cycle.
+            leaser_.add(
+                [requests.LeaseRequest(ack_id="ack2", byte_size=50, ordering_key="")]
+            )
+        if len(cycles) == leaser._RENEWAL_SLOTS + 1:
+            leaser_._stop_event.set()
+
+    leaser_._stop_event.wait = wait
+    leaser_.maintain_leases()
+
+    renewed = [list(call.args[0]) for call in manager._send_lease_modacks.mock_calls]
+    assert renewed == [["ack1"], ["ack2"]]
+
+
+def test_maintain_leases_rotation_fits_shortest_slot_deadline():
+    manager = create_manager()
+    manager._obtain_ack_deadline.return_value = 60
+    manager._send_lease_modacks.return_value = set()
+    leaser_ = leaser.Leaser(manager)
+
+    timeouts = []
+
+    def wait(timeout):
+        timeouts.append(timeout)
+        if len(timeouts) == leaser._RENEWAL_SLOTS:
+            leaser_._stop_event.set()
+
+    leaser_._stop_event.wait = wait
+    leaser_.maintain_leases()
+
+    # Until every slot is renewed with the longer deadline, the slots might still
+    # hold leases extended by the minimum deadline.
+    slot_time = 0.9 * histogram.MIN_ACK_DEADLINE / leaser._RENEWAL_SLOTS
+    assert all(timeout <= slot_time for timeout in timeouts[:-1])
+
+    slot_time = 0.9 * 60 / leaser._RENEWAL_SLOTS
+    assert slot_time / 2 <= timeouts[-1] <= slot_time
+
+
+@mock.patch("time.time", autospec=True)
+def test_take_expired_only_visits_due_buckets(time):
+    leaser_ = leaser.Leaser(mock.sentinel.manager)
+
+    time.return_value = 0
+    leaser_.add([requests.LeaseRequest(ack_id="ack1", byte_size=50, ordering_key="")])
+    leaser_.start_lease_expiry_timer(["ack1"])
+
+    time.return_value = 105
+    leaser_.add([requests.LeaseRequest(ack_id="ack2", byte_size=25, ordering_key="")])
+    leaser_.add([requests.LeaseRequest(ack_id="ack3", byte_size=25, ordering_key="")])
+    leaser_.start_lease_expiry_timer(["ack2"])
+
+    time.return_value = 108
+    leaser_.start_lease_expiry_timer(["ack3"])
+
+    with leaser_._add_remove_lock:
+        assert leaser_._take_expired(cutoff=50) == [
+            requests.DropRequest(ack_id="ack1", byte_size=50, ordering_key="")
+        ]
+        assert leaser_._take_expired(cutoff=50) == []
+        assert leaser_._take_expired(cutoff=106) == [
+            requests.DropRequest(ack_id="ack2", byte_size=25, ordering_key="")
+        ]
+
+    # Expired leases remain leased until dropped, the partially expired bucket
+    # is kept.
+    assert leaser_.message_count == 3
+    assert list(leaser_._expiry_buckets) == [10]
+
+
+@mock.patch("time.time", autospec=True)
+def test_remove_cleans_up_renewal_slot_and_expiry_bucket(time):
+    time.return_value = 0
+    leaser_ = leaser.Leaser(mock.sentinel.manager)
+    leaser_.add([requests.LeaseRequest(ack_id="ack1", byte_size=50, ordering_key="")])
+    leaser_.start_lease_expiry_timer(["ack1"])
+
+    leaser_.remove([requests.AckRequest("ack1", 50, 0, "", None)])
+
+    assert leaser_._expiry_buckets == {}
+    assert all(not slot for slot in leaser_._renewal_slots)
+
+    with leaser_._add_remove_lock:
+        assert leaser_._take_expired(cutoff=100) == []
+    assert leaser_._expiry_heap == []
+
+
 def test_start_lease_expiry_timer_unknown_ack_id():
     manager = create_manager()
     leaser_ = leaser.Leaser(manager)
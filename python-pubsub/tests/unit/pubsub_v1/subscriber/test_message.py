@@ -13,9 +13,12 @@
 # limitations under the License.
 
 import datetime
+import logging
+import lzma
 import queue
 import sys
 import time
+import zlib
 
 # special case python < 3.8
 if sys.version_info.major == 3 and sys.version_info.minor < 8:
@@ -79,6 +82,34 @@ def test_data():
     assert msg.data == b"foo"
 
 
+def test_data_compressed_zlib():
+    msg = create_message(zlib.compress(b"foo" * 100), googclient_compression="zlib")
+    assert msg.data == b"foo" * 100
+    # The data is decompressed only once.
+    with mock.patch.object(zlib, "decompress") as decompress:
+        assert msg.data == b"foo" * 100
+    decompress.assert_not_called()
+
+
+def test_data_compressed_lzma():
+    msg = create_message(lzma.compress(b"foo" * 100), googclient_compression="lzma")
+    assert msg.data == b"foo" * 100
+
+
+def test_data_decompression_error(caplog):
+    msg = create_message(b"not compressed", googclient_compression="zlib")
+
+    with caplog.at_level(logging.WARNING):
+        assert msg.data == b"not compressed"
+
+    assert "Failed to decompress" in caplog.text
+
+
+def test_data_unknown_compression_algorithm():
+    msg = create_message(b"foo", googclient_compression="brotli")
+    assert msg.data == b"foo"
+
+
 def test_size():
     msg = create_message(b"foo")
     assert msg.size == 30  # payload + protobuf overhead
@@ -111,6 +142,31 @@ def test_ordering_key():
     assert msg.ordering_key == "key1"
 
 
+def test_message_id():
+    msg = create_message(b"foo")
+    assert msg.message_id == "message_id"
+
+
+def test_fields_read_on_first_access():
+    raw_message = mock.Mock(spec=["message_id", "data", "attributes", "ByteSize"])
+    raw_message.data = b"foo"
+    raw_message.attributes = {}
+    raw_message.ByteSize.return_value = 42
+
+    msg = message.Message(raw_message, "ACKID", 0, queue.Queue())
+    raw_message.ByteSize.assert_not_called()
+    assert not hasattr(msg, "__dict__")
+
+    assert msg.size == 42
+    assert msg.size == 42
+    raw_message.ByteSize.assert_called_once()
+
+    # The data is cached, later changes to the raw message are not visible.
+    assert msg.data == b"foo"
+    raw_message.data = b"bar"
+    assert msg.data == b"foo"
+
+
 def check_call_types(mock, *args, **kwargs):
     """Checks a mock's call types.
 
@@ -267,6 +323,11 @@ def test_nack_with_response_exactly_once_delivery_enabled():
         check_call_types(put, requests.NackRequest)
 
 
+def test_repr_compressed_data():
+    msg = create_message(zlib.compress(b"foo" * 10), googclient_compression="zlib")
+    assert "  data: {!r}".format(b"foo" * 10) in repr(msg)
+
+
 def test_repr():
     data = b"foo"
     ordering_key = "ord_key"
@@ -0,0 +1,105 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from google.cloud.pubsub_v1.subscriber._protocol import message_batcher
+
+
+def make_batcher(max_size=3, max_latency=60):
+    sent = []
+    batcher = message_batcher.MessageBatcher(sent.append, max_size, max_latency)
+    return batcher, sent
+
+
+@pytest.mark.parametrize(
+    "max_size,max_latency,match",
+    [(0, 1.0, "max_size"), (10, -1.0, "max_latency")],
+)
+def test_constructor_invalid_settings(max_size, max_latency, match):
+    with pytest.raises(ValueError, match=match):
+        message_batcher.MessageBatcher(lambda batch: None, max_size, max_latency)
+
+
+def test_add_sends_full_batch():
+    batcher, sent = make_batcher(max_size=3)
+
+    for message in ["msg_1", "msg_2", "msg_3", "msg_4"]:
+        batcher.add(message)
+
+    assert sent == [["msg_1", "msg_2", "msg_3"]]
+    assert batcher._messages == ["msg_4"]
+
+    batcher.stop()
+
+
+def test_add_full_batch_cancels_flush_timer():
+    batcher, sent = make_batcher(max_size=2)
+
+    batcher.add("msg_1")
+    timer = batcher._timer
+    assert timer is not None
+    batcher.add("msg_2")
+
+    assert sent == [["msg_1", "msg_2"]]
+    assert batcher._timer is None
+    timer.join(timeout=3)
+    assert not timer.is_alive()
+
+
+def test_add_flushes_partial_batch_after_latency():
+    sent = []
+    flushed = threading.Event()
+
+    def send_batch(batch):
+        sent.append(batch)
+        flushed.set()
+
+    batcher = message_batcher.MessageBatcher(send_batch, max_size=10, max_latency=0.05)
+    batcher.add("msg_1")
+    batcher.add("msg_2")
+
+    assert flushed.wait(timeout=3)
+    assert sent == [["msg_1", "msg_2"]]
+    assert batcher._timer is None
+
+
+def test_stop_returns_unsent_messages():
+    batcher, sent = make_batcher(max_size=10)
+    batcher.add("msg_1")
+    batcher.add("msg_2")
+    timer = batcher._timer
+
+    unsent = batcher.stop()
+
+    assert unsent == ["msg_1", "msg_2"]
+    timer.join(timeout=3)
+    assert sent == []
+
+    # Messages added after stopping are dropped.
+    batcher.add("msg_3")
+    assert sent == []
+    assert batcher.stop() == []
+
+
+def test_flush_after_stop_is_noop():
+    batcher, sent = make_batcher(max_size=10)
+    batcher.add("msg_1")
+    batcher.stop()
+
+    batcher._flush()
+
+    assert sent == []
@@ -37,6 +37,19 @@ def test_init():
     assert moh.get() is None
 
 
+def test_put_many():
+    moh = messages_on_hold.MessagesOnHold()
+
+    msg1 = make_message(ack_id="ack1", ordering_key="")
+    msg2 = make_message(ack_id="ack2", ordering_key="key1")
+    moh.put_many([msg1, msg2])
+    assert moh.size == 2
+
+    assert moh.get() == msg1
+    assert moh.get() == msg2
+    assert moh.size == 0
+
+
 def test_put_and_get_unordered_messages():
     moh = messages_on_hold.MessagesOnHold()
 
@@ -258,16 +271,15 @@ def test_ordered_messages_two_keys_interleaved():
     assert moh.get() is msg2
     assert moh.size == 1
 
-    # Activate "key1". Clean up state for "key1" because another message with
-    # the same key (msg3) hasn't been sorted into _pending_ordered_messages yet
-    # through a call to get().
-    callback_tracker = ScheduleMessageCallbackTracker()
-    moh.activate_ordering_keys(["key1"], callback_tracker)
-    assert not callback_tracker.called
+    # msg3 is waiting for msg1 to complete, so it cannot be returned yet.
+    assert moh.get() is None
     assert moh.size == 1
 
-    # Get another message. msg3 is next in line in the queue.
-    assert moh.get() is msg3
+    # Activate "key1" to release msg3, the next message with that key.
+    callback_tracker = ScheduleMessageCallbackTracker()
+    moh.activate_ordering_keys(["key1"], callback_tracker)
+    assert callback_tracker.called
+    assert callback_tracker.message == msg3
     assert moh.size == 0
 
     # Activate "key2" to mark msg2 as complete. Release no messages because
@@ -346,6 +358,38 @@ def test_ordered_and_unordered_messages_interleaved():
     assert moh.size == 0
 
 
+def test_get_skips_messages_blocked_by_busy_key():
+    moh = messages_on_hold.MessagesOnHold()
+
+    first_hot = make_message(ack_id="hot0", ordering_key="hot")
+    blocked = [make_message(ack_id=f"hot{i}", ordering_key="hot") for i in (1, 2)]
+    cold = make_message(ack_id="cold", ordering_key="cold")
+    moh.put_many([first_hot] + blocked + [cold])
+
+    assert moh.get() == first_hot
+    # The messages blocked behind the in-flight "hot" message are not visited.
+    assert list(moh._messages_on_hold) == [cold]
+    assert list(moh._pending_ordered_messages["hot"]) == blocked
+
+    assert moh.get() == cold
+    assert moh.get() is None
+    assert moh.size == 2
+
+
+def test_drain():
+    moh = messages_on_hold.MessagesOnHold()
+
+    msg1 = make_message(ack_id="ack1", ordering_key="key1")
+    msg2 = make_message(ack_id="ack2", ordering_key="key1")
+    msg3 = make_message(ack_id="ack3", ordering_key="")
+    moh.put_many([msg1, msg2, msg3])
+
+    assert moh.drain() == [msg1, msg3, msg2]
+    assert moh.size == 0
+    assert moh.get() is None
+    assert len(moh._pending_ordered_messages) == 0
+
+
 def test_cleanup_nonexistent_key(caplog):
     moh = messages_on_hold.MessagesOnHold()
     moh._clean_up_ordering_key("non-existent-key")
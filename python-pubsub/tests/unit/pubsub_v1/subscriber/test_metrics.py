@@ -0,0 +1,100 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from google.cloud.pubsub_v1.subscriber._protocol import metrics
+
+
+def test_snapshot_empty():
+    assert metrics.Metrics().snapshot() == {}
+
+
+def test_increment():
+    registry = metrics.Metrics()
+
+    registry.increment("messages_total")
+    registry.increment("messages_total", 10)
+
+    assert registry.snapshot() == {"messages_total": 11}
+
+
+def test_observe():
+    registry = metrics.Metrics()
+
+    for value in (0.5, 2.0, 1.5):
+        registry.observe("latency_seconds", value)
+
+    assert registry.snapshot() == {
+        "latency_seconds_count": 3,
+        "latency_seconds_sum": 4.0,
+        "latency_seconds_max": 2.0,
+    }
+
+
+def test_add_gauge():
+    registry = metrics.Metrics()
+    values = iter([1, 2])
+    registry.add_gauge("depth", lambda: next(values))
+
+    assert registry.snapshot() == {"depth": 1}
+    assert registry.snapshot() == {"depth": 2}
+
+
+def test_add_gauge_read_error(caplog):
+    registry = metrics.Metrics()
+    registry.add_gauge("broken", lambda: 1 / 0)
+    registry.add_gauge("depth", lambda: 5)
+
+    with caplog.at_level(logging.DEBUG):
+        assert registry.snapshot() == {"depth": 5}
+
+    assert "Failed to read gauge broken" in caplog.text
+
+
+def test_to_prometheus_text():
+    snapshot = {
+        "messages_total": 3,
+        "latency_seconds_count": 2,
+        "latency_seconds_sum": 1.5,
+        "latency_seconds_max": 1.0,
+        "load": 0.25,
+    }
+
+    text = metrics.to_prometheus_text(snapshot, prefix="sub_")
+
+    assert text == (
+        "# TYPE sub_latency_seconds_count counter\n"
+        "sub_latency_seconds_count 2.0\n"
+        "# TYPE sub_latency_seconds_max gauge\n"
+        "sub_latency_seconds_max 1.0\n"
+        "# TYPE sub_latency_seconds_sum counter\n"
+        "sub_latency_seconds_sum 1.5\n"
+        "# TYPE sub_load gauge\n"
+        "sub_load 0.25\n"
+        "# TYPE sub_messages_total counter\n"
+        "sub_messages_total 3.0\n"
+    )
+
+
+def test_to_prometheus_text_labels():
+    text = metrics.to_prometheus_text(
+        {"load": 1}, labels={"subscription": "projects/p/subscriptions/s", "x": 'a"b'}
+    )
+
+    assert text == (
+        "# TYPE pubsub_subscriber_load gauge\n"
+        'pubsub_subscriber_load{subscription="projects/p/subscriptions/s",x="a\\"b"}'
+        " 1.0\n"
+    )
@@ -12,20 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import concurrent.futures
+import functools
 import queue
 import sys
 import threading
 import time
 import warnings
 
+import pytest
+
 # special case python < 3.8
 if sys.version_info.major == 3 and sys.version_info.minor < 8:
     import mock
 else:
     from unittest import mock
 
+from google.cloud.pubsub_v1.subscriber import message as message_module
 from google.cloud.pubsub_v1.subscriber import scheduler
+from google.cloud.pubsub_v1.subscriber._protocol import helper_threads
+from google.cloud.pubsub_v1.subscriber._protocol import requests
+from google.pubsub_v1 import types as gapic_types
 
 
 def test_subclasses_base_abc():
@@ -36,6 +44,7 @@ def test_constructor_defaults():
     scheduler_ = scheduler.ThreadScheduler()
 
     assert isinstance(scheduler_.queue, queue.Queue)
+    assert isinstance(scheduler_.queue, helper_threads.BatchQueue)
     assert isinstance(scheduler_._executor, concurrent.futures.Executor)
 
 
@@ -176,3 +185,282 @@ def test_shutdown_handles_executor_queue_sentinels():
     for msg in dropped:
         assert msg is not None
         assert msg.startswith("message_")
+
+
+def test_asyncio_scheduler_subclasses_base_abc():
+    assert issubclass(scheduler.AsyncioScheduler, scheduler.Scheduler)
+
+
+def test_asyncio_scheduler_invalid_max_concurrency():
+    with pytest.raises(ValueError):
+        scheduler.AsyncioScheduler(max_concurrency=0)
+
+
+def test_asyncio_scheduler_awaits_coroutine_callbacks():
+    called_with = []
+    both_done = threading.Barrier(3)  # 3 == 2x callback + 1x main thread
+
+    async def callback(*args, **kwargs):
+        await asyncio.sleep(0)
+        called_with.append((args, kwargs))
+        # Must not block the event loop.
+        await asyncio.get_running_loop().run_in_executor(None, both_done.wait)
+
+    scheduler_ = scheduler.AsyncioScheduler()
+    assert isinstance(scheduler_.queue, queue.Queue)
+
+    scheduler_.schedule(callback, "arg1", kwarg1="meep")
+    scheduler_.schedule(callback, "arg2", kwarg2="boop")
+
+    both_done.wait(timeout=3.0)
+    result = scheduler_.shutdown(await_msg_callbacks=True)
+
+    assert result == []  # no scheduled items dropped
+    expected_calls = [(("arg1",), {"kwarg1": "meep"}), (("arg2",), {"kwarg2": "boop"})]
+    assert sorted(called_with) == expected_calls
+    assert not scheduler_._thread.is_alive()
+
+
+def test_asyncio_scheduler_calls_regular_callbacks():
+    called = threading.Event()
+
+    scheduler_ = scheduler.AsyncioScheduler()
+    scheduler_.schedule(lambda message: called.set(), "message_1")
+
+    assert called.wait(timeout=3.0)
+    assert scheduler_.shutdown(await_msg_callbacks=True) == []
+
+
+def test_asyncio_scheduler_user_supplied_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    called = threading.Event()
+
+    async def callback(message):
+        assert asyncio.get_running_loop() is loop
+        called.set()
+
+    scheduler_ = scheduler.AsyncioScheduler(loop=loop)
+    scheduler_.schedule(callback, "message_1")
+
+    assert called.wait(timeout=3.0)
+    scheduler_.shutdown(await_msg_callbacks=True)
+
+    # A user-supplied loop is not stopped.
+    assert loop.is_running()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_asyncio_scheduler_schedule_after_shutdown_warning():
+    scheduler_ = scheduler.AsyncioScheduler()
+    scheduler_.shutdown()
+
+    with warnings.catch_warnings(record=True) as warned:
+        scheduler_.schedule(lambda message: None, "message_1")
+
+    assert len(warned) == 1
+    assert issubclass(warned[0].category, RuntimeWarning)
+    assert "after scheduler shutdown" in str(warned[0].message)
+
+
+@pytest.mark.parametrize("await_msg_callbacks", [False, True])
+def test_asyncio_scheduler_shutdown_drops_undispatched(await_msg_callbacks):
+    called_with = []
+    at_least_one_called = threading.Event()
+    at_least_one_completed = threading.Event()
+
+    async def callback(message):
+        called_with.append(message)
+        at_least_one_called.set()
+        await asyncio.sleep(0.5)
+        at_least_one_completed.set()
+
+    scheduler_ = scheduler.AsyncioScheduler(max_concurrency=1)
+
+    scheduler_.schedule(callback, "message_1")
+    scheduler_.schedule(callback, "message_2")
+
+    at_least_one_called.wait(timeout=3.0)
+    dropped = scheduler_.shutdown(await_msg_callbacks=await_msg_callbacks)
+
+    assert called_with == ["message_1"]
+    assert dropped == ["message_2"]
+    assert at_least_one_completed.is_set() == await_msg_callbacks
+
+    # The running callback completes in the background anyway.
+    assert at_least_one_completed.wait(timeout=3.0)
+    scheduler_._thread.join(timeout=3.0)
+    assert not scheduler_._thread.is_alive()
+    assert called_with == ["message_1"]
+
+
+def _make_message(ack_id, data=b"data"):
+    return message_module.Message(
+        message=gapic_types.PubsubMessage(
+            data=data, attributes={"key": "value"}, message_id="message_id"
+        )._pb,
+        ack_id=ack_id,
+        delivery_attempt=0,
+        request_queue=queue.Queue(),
+        exactly_once_delivery_enabled_func=lambda: False,
+    )
+
+
+def _wrap_callback(callback, on_callback_error, message):
+    try:
+        callback(message)
+    except Exception as exc:
+        message.nack()
+        on_callback_error(exc)
+
+
+def _wrap_batch_callback(callback, on_callback_error, messages):
+    try:
+        callback(messages)
+    except Exception as exc:  # pragma: NO COVER
+        for message in messages:
+            message.nack()
+        on_callback_error(exc)
+
+
+# Callbacks run in worker processes must be picklable, thus defined at module level.
+def _ack_upper_case(message):
+    if message.data == message.data.upper():
+        message.modify_ack_deadline(30)
+        message.ack()
+    else:
+        message.nack()
+
+
+def _raise_error(message):
+    raise ValueError(message.ack_id)
+
+
+def _square(value):
+    return value * value
+
+
+def test_process_scheduler_subclasses_base_abc():
+    assert issubclass(scheduler.ProcessScheduler, scheduler.Scheduler)
+
+
+def test_process_scheduler_applies_decisions_from_worker():
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    scheduler_ = scheduler.ProcessScheduler(executor=executor)
+    on_callback_error = mock.Mock()
+    callback = functools.partial(_wrap_callback, _ack_upper_case, on_callback_error)
+
+    upper = _make_message("ack_1", data=b"UPPER")
+    lower = _make_message("ack_2", data=b"lower")
+    scheduler_.schedule(callback, upper)
+    scheduler_.schedule(callback, lower)
+
+    assert upper._request_queue.get(timeout=10) == requests.ModAckRequest(
+        ack_id="ack_1", seconds=30, future=None
+    )
+    assert isinstance(upper._request_queue.get(timeout=10), requests.AckRequest)
+    assert isinstance(lower._request_queue.get(timeout=10), requests.NackRequest)
+    scheduler_.shutdown(await_msg_callbacks=True)
+    assert upper._request_queue.empty()
+    assert lower._request_queue.empty()
+    on_callback_error.assert_not_called()
+
+
+def _ack_all_upper_case(messages):
+    for message in messages:
+        _ack_upper_case(message)
+
+
+def test_process_scheduler_applies_batch_decisions_from_worker():
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    scheduler_ = scheduler.ProcessScheduler(executor=executor)
+    on_callback_error = mock.Mock()
+    callback = functools.partial(
+        _wrap_batch_callback, _ack_all_upper_case, on_callback_error
+    )
+
+    upper = _make_message("ack_1", data=b"UPPER")
+    lower = _make_message("ack_2", data=b"lower")
+    scheduler_.schedule(callback, [upper, lower])
+
+    assert isinstance(lower._request_queue.get(timeout=10), requests.NackRequest)
+    assert isinstance(upper._request_queue.get(timeout=10), requests.ModAckRequest)
+    assert isinstance(upper._request_queue.get(timeout=10), requests.AckRequest)
+    scheduler_.shutdown(await_msg_callbacks=True)
+    on_callback_error.assert_not_called()
+
+
+def test_process_scheduler_worker_error_nacks_message():
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    scheduler_ = scheduler.ProcessScheduler(executor=executor)
+    on_callback_error = mock.Mock()
+    callback = functools.partial(_wrap_callback, _raise_error, on_callback_error)
+
+    msg = _make_message("ack_1")
+    scheduler_.schedule(callback, msg)
+
+    assert isinstance(msg._request_queue.get(timeout=10), requests.NackRequest)
+    scheduler_.shutdown(await_msg_callbacks=True)
+    on_callback_error.assert_called_once()
+    error = on_callback_error.call_args[0][0]
+    assert isinstance(error, ValueError)
+    assert str(error) == "ack_1"
+
+
+def test_process_scheduler_calls_other_callbacks_in_worker():
+    executor = mock.create_autospec(
+        concurrent.futures.ProcessPoolExecutor, instance=True
+    )
+    future = concurrent.futures.Future()
+    executor.submit.return_value = future
+    scheduler_ = scheduler.ProcessScheduler(executor=executor)
+
+    scheduler_.schedule(_square, 3)
+    assert scheduler_._pending == {future: 3}
+
+    future.set_result(9)
+    executor.submit.assert_called_once_with(_square, 3)
+    assert scheduler_._pending == {}
+
+
+def test_process_scheduler_schedule_after_shutdown_warning():
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    scheduler_ = scheduler.ProcessScheduler(executor=executor)
+    scheduler_.shutdown()
+
+    with warnings.catch_warnings(record=True) as warned:
+        scheduler_.schedule(_square, 3)
+
+    assert len(warned) == 1
+    assert issubclass(warned[0].category, RuntimeWarning)
+    assert "after executor shutdown" in str(warned[0].message)
+
+
+def test_process_scheduler_shutdown_drops_undispatched():
+    executor = mock.create_autospec(
+        concurrent.futures.ProcessPoolExecutor, instance=True
+    )
+    pending = concurrent.futures.Future()
+    running = concurrent.futures.Future()
+    running.set_running_or_notify_cancel()
+    executor.submit.side_effect = [running, pending]
+    scheduler_ = scheduler.ProcessScheduler(executor=executor)
+    callback = functools.partial(_wrap_callback, _ack_upper_case, mock.Mock())
+
+    msg_1 = _make_message("ack_1")
+    msg_2 = _make_message("ack_2")
+    scheduler_.schedule(callback, msg_1)
+    scheduler_.schedule(callback, msg_2)
+    dropped = scheduler_.shutdown(await_msg_callbacks=True)
+
+    assert dropped == [msg_2]
+    assert pending.cancelled()
+    executor.shutdown.assert_called_once_with(wait=True)
+
+    # The callback already sent to a worker still has its decisions applied.
+    running.set_result([("ack", None)])
+    assert isinstance(msg_1._request_queue.get_nowait(), requests.AckRequest)
+    assert msg_2._request_queue.empty()
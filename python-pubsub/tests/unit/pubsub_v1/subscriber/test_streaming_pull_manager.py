@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import functools
 import logging
 import sys
@@ -35,6 +36,7 @@ from google.cloud.pubsub_v1.subscriber import scheduler
 from google.cloud.pubsub_v1.subscriber._protocol import dispatcher
 from google.cloud.pubsub_v1.subscriber._protocol import heartbeater
 from google.cloud.pubsub_v1.subscriber._protocol import leaser
+from google.cloud.pubsub_v1.subscriber._protocol import message_batcher
 from google.cloud.pubsub_v1.subscriber._protocol import messages_on_hold
 from google.cloud.pubsub_v1.subscriber._protocol import requests
 from google.cloud.pubsub_v1.subscriber._protocol import streaming_pull_manager
@@ -90,6 +92,74 @@ def test__wrap_callback_errors_error():
     on_callback_error.assert_called_once_with(callback_error)
 
 
+def test__wrap_callback_errors_coroutine_no_error():
+    msg = mock.create_autospec(message.Message, instance=True)
+    on_callback_error = mock.Mock()
+    called_with = []
+
+    async def callback(message):
+        called_with.append(message)
+
+    result = streaming_pull_manager._wrap_callback_errors(
+        callback, on_callback_error, msg
+    )
+    assert called_with == []
+
+    asyncio.run(result)
+
+    assert called_with == [msg]
+    msg.nack.assert_not_called()
+    on_callback_error.assert_not_called()
+
+
+def test__wrap_callback_errors_coroutine_error():
+    callback_error = ValueError("meep")
+    msg = mock.create_autospec(message.Message, instance=True)
+    on_callback_error = mock.Mock()
+
+    async def callback(message):
+        raise callback_error
+
+    result = streaming_pull_manager._wrap_callback_errors(
+        callback, on_callback_error, msg
+    )
+    asyncio.run(result)
+
+    msg.nack.assert_called_once()
+    on_callback_error.assert_called_once_with(callback_error)
+
+
+def test__wrap_batch_callback_errors_no_error():
+    msgs = [mock.create_autospec(message.Message, instance=True) for _ in range(2)]
+    callback = mock.Mock()
+    on_callback_error = mock.Mock()
+
+    streaming_pull_manager._wrap_batch_callback_errors(
+        callback, on_callback_error, msgs
+    )
+
+    callback.assert_called_once_with(msgs)
+    for msg in msgs:
+        msg.nack.assert_not_called()
+    on_callback_error.assert_not_called()
+
+
+def test__wrap_batch_callback_errors_error():
+    callback_error = ValueError("meep")
+
+    msgs = [mock.create_autospec(message.Message, instance=True) for _ in range(2)]
+    callback = mock.Mock(side_effect=callback_error)
+    on_callback_error = mock.Mock()
+
+    streaming_pull_manager._wrap_batch_callback_errors(
+        callback, on_callback_error, msgs
+    )
+
+    for msg in msgs:
+        msg.nack.assert_called_once()
+    on_callback_error.assert_called_once_with(callback_error)
+
+
 def test_constructor_and_default_state():
     mock.sentinel.subscription = str()
     manager = streaming_pull_manager.StreamingPullManager(
@@ -129,6 +199,16 @@ def test_constructor_with_default_options():
     assert manager._stream_ack_deadline == 60
 
 
+def test_constructor_with_ack_time_half_life():
+    mock.sentinel.subscription = str()
+    flow_control_ = types.FlowControl(ack_time_half_life=30)
+    manager = streaming_pull_manager.StreamingPullManager(
+        mock.sentinel.client, mock.sentinel.subscription, flow_control=flow_control_
+    )
+
+    assert manager.ack_histogram._half_life == 30
+
+
 def test_constructor_with_min_and_max_duration_per_lease_extension_():
     mock.sentinel.subscription = str()
     flow_control_ = types.FlowControl(
@@ -174,6 +254,24 @@ def test_constructor_with_max_duration_per_lease_extension_too_high():
     assert manager._stream_ack_deadline == 600
 
 
+def test_constructor_invalid_num_streams():
+    with pytest.raises(ValueError, match="num_streams"):
+        streaming_pull_manager.StreamingPullManager(
+            mock.sentinel.client, mock.sentinel.subscription, num_streams=0
+        )
+
+
+@pytest.mark.parametrize("low_watermark,high_watermark", [(0, 1.0), (0.9, 0.8)])
+def test_constructor_invalid_watermarks(low_watermark, high_watermark):
+    flow_control = types.FlowControl(
+        low_watermark=low_watermark, high_watermark=high_watermark
+    )
+    with pytest.raises(ValueError, match="watermark"):
+        streaming_pull_manager.StreamingPullManager(
+            mock.sentinel.client, mock.sentinel.subscription, flow_control=flow_control
+        )
+
+
 def make_manager(**kwargs):
     client_ = mock.create_autospec(client.Client, instance=True)
     scheduler_ = mock.create_autospec(scheduler.Scheduler, instance=True)
@@ -379,6 +477,16 @@ def test_streaming_flow_control():
     assert request.max_outstanding_bytes == 1000
 
 
+def test_streaming_flow_control_split_across_streams():
+    manager = make_manager(
+        flow_control=types.FlowControl(max_messages=10, max_bytes=1000),
+        num_streams=3,
+    )
+    request = manager._get_initial_request(stream_ack_deadline_seconds=60)
+    assert request.max_outstanding_messages == 4
+    assert request.max_outstanding_bytes == 334
+
+
 def test_streaming_flow_control_use_legacy_flow_control():
     manager = make_manager(
         flow_control=types.FlowControl(max_messages=10, max_bytes=1000),
@@ -433,6 +541,31 @@ def test_lease_load_and_pause():
     assert manager.load == 1.16
     manager.maybe_pause_consumer()
     manager._consumer.pause.assert_called_once()
+    assert manager.metrics.snapshot()["consumer_pauses_total"] == 1
+
+
+def test_lease_load_and_pause_multiple_streams():
+    manager = make_manager(
+        flow_control=types.FlowControl(max_messages=10, max_bytes=1000)
+    )
+    manager._leaser = leaser.Leaser(manager)
+    manager._consumer = mock.create_autospec(bidi.BackgroundConsumer, instance=True)
+    manager._consumer.is_paused = False
+    extra_consumers = [
+        mock.create_autospec(bidi.BackgroundConsumer, instance=True) for _ in range(2)
+    ]
+    extra_consumers[0].is_paused = False
+    extra_consumers[1].is_paused = True
+    manager._extra_consumers = extra_consumers
+
+    manager.leaser.add(
+        [requests.LeaseRequest(ack_id="one", byte_size=1000, ordering_key="")]
+    )
+    manager.maybe_pause_consumer()
+
+    manager._consumer.pause.assert_called_once()
+    extra_consumers[0].pause.assert_called_once()
+    extra_consumers[1].pause.assert_not_called()
 
 
 def test_drop_and_resume():
@@ -464,6 +597,89 @@ def test_drop_and_resume():
     )
     manager.maybe_resume_consumer()
     manager._consumer.resume.assert_called_once()
+    assert manager.metrics.snapshot()["consumer_resumes_total"] == 1
+
+
+def test_pause_and_resume_custom_watermarks():
+    manager = make_manager(
+        flow_control=types.FlowControl(
+            max_messages=10, max_bytes=1000, high_watermark=0.6, low_watermark=0.3
+        )
+    )
+    manager._leaser = leaser.Leaser(manager)
+    manager._consumer = mock.create_autospec(bidi.BackgroundConsumer, instance=True)
+    manager._consumer.is_paused = False
+
+    manager.leaser.add(
+        [
+            requests.LeaseRequest(ack_id=f"ack_{i}", byte_size=10, ordering_key="")
+            for i in range(6)
+        ]
+    )
+    manager.maybe_pause_consumer()
+    manager._consumer.pause.assert_called_once()
+    manager._consumer.is_paused = True
+
+    # Between the watermarks, the consumer stays paused.
+    manager.leaser.remove(
+        [
+            requests.DropRequest(ack_id=f"ack_{i}", byte_size=10, ordering_key="")
+            for i in range(3)
+        ]
+    )
+    manager.maybe_resume_consumer()
+    manager._consumer.resume.assert_not_called()
+
+    manager.leaser.remove(
+        [requests.DropRequest(ack_id="ack_3", byte_size=10, ordering_key="")]
+    )
+    manager.maybe_resume_consumer()
+    manager._consumer.resume.assert_called_once()
+
+
+def test_resume_releases_limited_messages_per_drop():
+    manager = make_manager(
+        flow_control=types.FlowControl(
+            max_messages=10, max_bytes=1000, max_release_per_drop=2
+        )
+    )
+    manager._callback = mock.sentinel.callback
+    manager._leaser = mock.create_autospec(leaser.Leaser)
+    manager._leaser.message_count = 6
+    manager._leaser.bytes = 60
+    manager._consumer = mock.create_autospec(bidi.BackgroundConsumer, instance=True)
+    manager._consumer.is_paused = True
+
+    # One message is being processed, and five are on hold.
+    for i in range(5):
+        msg = mock.create_autospec(
+            message.Message, instance=True, ack_id=f"ack_{i}", size=10
+        )
+        manager._messages_on_hold.put(msg)
+    manager._on_hold_bytes = 50
+
+    manager.maybe_resume_consumer()
+
+    assert manager._scheduler.schedule.call_count == 2
+    assert manager._messages_on_hold.size == 3
+    manager._consumer.resume.assert_not_called()
+
+
+def test_resume_multiple_streams():
+    manager = make_manager(
+        flow_control=types.FlowControl(max_messages=10, max_bytes=1000)
+    )
+    manager._leaser = leaser.Leaser(manager)
+    manager._consumer = mock.create_autospec(bidi.BackgroundConsumer, instance=True)
+    manager._consumer.is_paused = False
+    extra_consumer = mock.create_autospec(bidi.BackgroundConsumer, instance=True)
+    extra_consumer.is_paused = True
+    manager._extra_consumers = [extra_consumer]
+
+    manager.maybe_resume_consumer()
+
+    manager._consumer.resume.assert_not_called()
+    extra_consumer.resume.assert_called_once()
 
 
 def test_resume_not_paused():
@@ -569,6 +785,36 @@ def test__maybe_release_messages_negative_on_hold_bytes_warning(caplog):
     assert manager._on_hold_bytes == 0  # should be auto-corrected
 
 
+def test__maybe_release_messages_in_batches():
+    manager = make_manager(
+        flow_control=types.FlowControl(max_messages=10, max_bytes=1000)
+    )
+    manager._callback = mock.sentinel.callback
+    manager._batcher = message_batcher.MessageBatcher(
+        manager._schedule_batch, max_size=2, max_latency=60
+    )
+
+    _leaser = manager._leaser = mock.create_autospec(leaser.Leaser)
+    fake_leaser_add(_leaser, init_msg_count=3, assumed_msg_size=10)
+
+    messages = [
+        mock.create_autospec(message.Message, instance=True, ack_id="ack_foo", size=10),
+        mock.create_autospec(message.Message, instance=True, ack_id="ack_bar", size=10),
+        mock.create_autospec(message.Message, instance=True, ack_id="ack_baz", size=10),
+    ]
+    manager._messages_on_hold.put_many(messages)
+    manager._on_hold_bytes = 3 * 10
+
+    manager._maybe_release_messages()
+
+    # The full batch is sent, and the last message waits for the next batch.
+    assert manager._messages_on_hold.size == 0
+    manager._scheduler.schedule.assert_called_once_with(
+        mock.sentinel.callback, messages[:2]
+    )
+    assert manager._batcher.stop() == messages[2:]
+
+
 def test_send_unary_ack():
     manager = make_manager()
 
@@ -585,6 +831,10 @@ def test_send_unary_ack():
     manager._client.acknowledge.assert_called_once_with(
         subscription=manager._subscription, ack_ids=["ack_id1", "ack_id2"]
     )
+    snapshot = manager.metrics.snapshot()
+    assert snapshot["ack_rpc_latency_seconds_count"] == 1
+    assert snapshot["ack_rpc_batch_size_max"] == 2
+    assert "ack_rpc_errors_total" not in snapshot
 
 
 def test_send_unary_ack_exactly_once_enabled_with_futures():
@@ -677,6 +927,9 @@ def test_send_unary_modack():
         ],
         any_order=True,
     )
+    snapshot = manager.metrics.snapshot()
+    assert snapshot["modack_rpc_latency_seconds_count"] == 1
+    assert snapshot["modack_rpc_batch_size_sum"] == 3
 
 
 def test_send_unary_modack_default_deadline():
@@ -800,6 +1053,7 @@ def test_send_unary_ack_api_call_error(caplog):
     manager.send_unary_ack(ack_ids=["ack_id1", "ack_id2"], ack_reqs_dict=ack_reqs_dict)
 
     assert "The front fell off" in caplog.text
+    assert manager.metrics.snapshot()["ack_rpc_errors_total"] == 1
 
 
 def test_send_unary_modack_api_call_error(caplog):
@@ -1169,7 +1423,9 @@ def test_open(heartbeater, dispatcher, leaser, background_consumer, resumable_bi
     heartbeater.return_value.start.assert_called_once()
     assert manager._heartbeater == heartbeater.return_value
 
-    dispatcher.assert_called_once_with(manager, manager._scheduler.queue)
+    dispatcher.assert_called_once_with(
+        manager, manager._scheduler.queue, max_ack_rpc_concurrency=1
+    )
     dispatcher.return_value.start.assert_called_once()
     assert manager._dispatcher == dispatcher.return_value
 
@@ -1203,6 +1459,94 @@ def test_open(heartbeater, dispatcher, leaser, background_consumer, resumable_bi
     assert manager.is_active is True
 
 
+def test_heartbeat_multiple_streams():
+    manager = make_manager()
+    manager._rpc = mock.create_autospec(bidi.BidiRpc, instance=True)
+    manager._rpc.is_active = False
+    extra_rpcs = [mock.create_autospec(bidi.BidiRpc, instance=True) for _ in range(2)]
+    for rpc in extra_rpcs:
+        rpc.is_active = True
+    manager._extra_rpcs = extra_rpcs
+    manager._send_new_ack_deadline = True
+
+    result = manager.heartbeat()
+
+    assert result
+    manager._rpc.send.assert_not_called()
+    for rpc in extra_rpcs:
+        rpc.send.assert_called_once_with(
+            gapic_types.StreamingPullRequest(stream_ack_deadline_seconds=60)
+        )
+
+
+@mock.patch("google.api_core.bidi.ResumableBidiRpc", autospec=True)
+@mock.patch("google.api_core.bidi.BackgroundConsumer", autospec=True)
+@mock.patch("google.cloud.pubsub_v1.subscriber._protocol.leaser.Leaser", autospec=True)
+@mock.patch(
+    "google.cloud.pubsub_v1.subscriber._protocol.dispatcher.Dispatcher", autospec=True
+)
+@mock.patch(
+    "google.cloud.pubsub_v1.subscriber._protocol.heartbeater.Heartbeater", autospec=True
+)
+def test_open_multiple_streams(
+    heartbeater, dispatcher, leaser, background_consumer, resumable_bidi_rpc
+):
+    rpcs = [mock.Mock(name=f"rpc_{i}") for i in range(3)]
+    consumers = [mock.Mock(name=f"consumer_{i}") for i in range(3)]
+    resumable_bidi_rpc.side_effect = rpcs
+    background_consumer.side_effect = consumers
+    manager = make_manager(num_streams=3)
+
+    manager.open(mock.sentinel.callback, mock.sentinel.on_callback_error)
+
+    assert manager._rpc is rpcs[0]
+    assert manager._extra_rpcs == rpcs[1:]
+    assert manager._consumer is consumers[0]
+    assert manager._extra_consumers == consumers[1:]
+    assert background_consumer.call_args_list == [
+        mock.call(rpc, manager._on_response) for rpc in rpcs
+    ]
+    for rpc, consumer in zip(rpcs, consumers):
+        rpc.add_done_callback.assert_called_once_with(manager._on_rpc_done)
+        consumer.start.assert_called_once()
+
+    # The streams share the helper threads.
+    heartbeater.assert_called_once_with(manager)
+    dispatcher.assert_called_once()
+    leaser.assert_called_once_with(manager)
+
+
+@mock.patch("google.api_core.bidi.ResumableBidiRpc", autospec=True)
+@mock.patch("google.api_core.bidi.BackgroundConsumer", autospec=True)
+@mock.patch("google.cloud.pubsub_v1.subscriber._protocol.leaser.Leaser", autospec=True)
+@mock.patch(
+    "google.cloud.pubsub_v1.subscriber._protocol.dispatcher.Dispatcher", autospec=True
+)
+@mock.patch(
+    "google.cloud.pubsub_v1.subscriber._protocol.heartbeater.Heartbeater", autospec=True
+)
+def test_open_batch_callback(
+    heartbeater, dispatcher, leaser, background_consumer, resumable_bidi_rpc
+):
+    manager = make_manager()
+
+    manager.open(
+        mock.sentinel.callback,
+        mock.sentinel.on_callback_error,
+        max_batch_size=50,
+        max_batch_latency=0.5,
+    )
+
+    assert manager._callback.func is streaming_pull_manager._wrap_batch_callback_errors
+    assert manager._callback.args == (
+        mock.sentinel.callback,
+        mock.sentinel.on_callback_error,
+    )
+    assert isinstance(manager._batcher, message_batcher.MessageBatcher)
+    assert manager._batcher._max_size == 50
+    assert manager._batcher._max_latency == 0.5
+
+
 def test_open_already_active():
     manager = make_manager()
     manager._consumer = mock.create_autospec(bidi.BackgroundConsumer, instance=True)
@@ -1273,6 +1617,26 @@ def test_close():
     assert manager.is_active is False
 
 
+def test_close_multiple_streams():
+    manager, consumer, _, _, _, _ = make_running_manager()
+    extra_consumers = [
+        mock.create_autospec(bidi.BackgroundConsumer, instance=True) for _ in range(2)
+    ]
+    extra_consumers[0].is_active = True
+    extra_consumers[1].is_active = False
+    manager._extra_consumers = extra_consumers
+    manager._extra_rpcs = [mock.sentinel.rpc_1, mock.sentinel.rpc_2]
+
+    manager.close()
+    await_manager_shutdown(manager, timeout=3)
+
+    consumer.stop.assert_called_once()
+    extra_consumers[0].stop.assert_called_once()
+    extra_consumers[1].stop.assert_not_called()
+    assert manager._extra_consumers == []
+    assert manager._extra_rpcs == []
+
+
 def test_close_inactive_consumer():
     (
         manager,
@@ -1403,6 +1767,31 @@ def test_close_nacks_internally_queued_messages():
     assert sorted(nacked_messages) == [b"msg1", b"msg2", b"msg3"]
 
 
+def test_close_nacks_unsent_and_dropped_batches():
+    nacked_messages = []
+
+    def fake_nack(self):
+        nacked_messages.append(self.data)
+
+    MockMsg = functools.partial(mock.create_autospec, message.Message, instance=True)
+    messages = [MockMsg(data=b"msg1"), MockMsg(data=b"msg2"), MockMsg(data=b"msg3")]
+    for msg in messages:
+        msg.nack = stdlib_types.MethodType(fake_nack, msg)
+
+    manager, _, _, _, _, _ = make_running_manager()
+    manager._batcher = mock.create_autospec(
+        message_batcher.MessageBatcher, instance=True
+    )
+    manager._batcher.stop.return_value = messages[2:]
+    manager._scheduler.shutdown.return_value = [messages[:2]]
+
+    manager.close()
+    await_manager_shutdown(manager, timeout=3)
+
+    manager._batcher.stop.assert_called_once()
+    assert sorted(nacked_messages) == [b"msg1", b"msg2", b"msg3"]
+
+
 def test__get_initial_request():
     manager = make_manager()
     manager._leaser = mock.create_autospec(leaser.Leaser, instance=True)
@@ -1462,6 +1851,32 @@ def test__on_response_delivery_attempt():
     assert msg2.delivery_attempt == 6
 
 
+def test__on_response_adds_all_messages_to_leaser_at_once():
+    manager, _, dispatcher, leaser, _, scheduler = make_running_manager()
+    manager._callback = mock.sentinel.callback
+
+    response = gapic_types.StreamingPullResponse(
+        received_messages=[
+            gapic_types.ReceivedMessage(
+                ack_id="ack_{}".format(i),
+                message=gapic_types.PubsubMessage(data=b"foo", message_id=str(i)),
+            )
+            for i in range(3)
+        ]
+    )
+
+    fake_leaser_add(leaser, init_msg_count=0, assumed_msg_size=10)
+    leaser.add = mock.Mock(wraps=leaser.add)
+
+    manager._on_response(response)
+
+    leaser.add.assert_called_once()
+    lease_requests = leaser.add.call_args[0][0]
+    assert [req.ack_id for req in lease_requests] == ["ack_0", "ack_1", "ack_2"]
+    assert leaser.message_count == 3
+    assert len(scheduler.schedule.mock_calls) == 3
+
+
 def test__on_response_modifies_ack_deadline():
     manager, _, dispatcher, leaser, _, scheduler = make_running_manager()
     manager._callback = mock.sentinel.callback
@@ -1618,6 +2033,46 @@ def test__on_response_send_ack_deadline_after_enabling_exactly_once():
     )
 
 
+def test_metrics_snapshot_not_open():
+    manager = make_manager()
+
+    snapshot = manager.metrics.snapshot()
+
+    assert snapshot["leased_messages"] == 0
+    assert snapshot["leased_bytes"] == 0
+    assert snapshot["retry_queue_size"] == 0
+    assert snapshot["load"] == 0.0
+    assert snapshot["consumer_paused"] is False
+
+
+def test_metrics_snapshot():
+    manager, consumer, dispatcher, leaser, _, scheduler = make_running_manager(
+        flow_control=types.FlowControl(max_messages=10, max_bytes=1000)
+    )
+    consumer.is_paused = True
+    leaser.message_count = 4
+    leaser.bytes = 100
+    dispatcher.retry_queue_size = 7
+    scheduler.queue.qsize.return_value = 3
+    msg = mock.create_autospec(message.Message, instance=True, ack_id="ack", size=11)
+    manager._messages_on_hold.put(msg)
+    manager._on_hold_bytes = msg.size
+    manager._ack_histogram.add(30)
+
+    snapshot = manager.metrics.snapshot()
+
+    assert snapshot["messages_on_hold"] == 1
+    assert snapshot["bytes_on_hold"] == 11
+    assert snapshot["leased_messages"] == 4
+    assert snapshot["leased_bytes"] == 100
+    assert snapshot["load"] == 0.3
+    assert snapshot["ack_deadline_seconds"] == 10
+    assert snapshot["ack_time_p99_seconds"] == 30
+    assert snapshot["consumer_paused"] is True
+    assert snapshot["retry_queue_size"] == 7
+    assert snapshot["scheduler_queue_size"] == 3
+
+
 def test__on_response_no_leaser_overload():
     manager, _, dispatcher, leaser, _, scheduler = make_running_manager()
     manager._callback = mock.sentinel.callback
@@ -1642,6 +2097,7 @@ def test__on_response_no_leaser_overload():
     # Actually run the method and prove that modack and schedule
     # are called in the expected way.
     manager._on_response(response)
+    assert manager.metrics.snapshot()["messages_received_total"] == 2
 
     dispatcher.modify_ack_deadline.assert_called_once_with(
         [
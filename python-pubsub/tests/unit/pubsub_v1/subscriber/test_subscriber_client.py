@@ -166,6 +166,8 @@ def test_subscribe_options(manager_open, creds):
         flow_control=flow_control,
         scheduler=scheduler,
         await_callbacks_on_shutdown=mock.sentinel.await_callbacks,
+        max_ack_rpc_concurrency=4,
+        num_streams=3,
     )
     assert isinstance(future, futures.StreamingPullFuture)
 
@@ -174,6 +176,8 @@ def test_subscribe_options(manager_open, creds):
     assert manager.flow_control == flow_control
     assert manager._scheduler == scheduler
     assert manager._await_callbacks_on_shutdown is mock.sentinel.await_callbacks
+    assert manager._max_ack_rpc_concurrency == 4
+    assert manager._num_streams == 3
     manager_open.assert_called_once_with(
         mock.ANY,
         callback=mock.sentinel.callback,
@@ -181,6 +185,36 @@ def test_subscribe_options(manager_open, creds):
     )
 
 
+@mock.patch(
+    "google.cloud.pubsub_v1.subscriber._protocol.streaming_pull_manager."
+    "StreamingPullManager.open",
+    autospec=True,
+)
+def test_subscribe_batch(manager_open, creds):
+    client = subscriber.Client(credentials=creds)
+    flow_control = types.FlowControl(max_messages=500)
+
+    future = client.subscribe_batch(
+        "sub_name_a",
+        callback=mock.sentinel.callback,
+        max_batch_size=500,
+        max_batch_latency=2.5,
+        flow_control=flow_control,
+    )
+    assert isinstance(future, futures.StreamingPullFuture)
+
+    manager = future._StreamingPullFuture__manager
+    assert manager._subscription == "sub_name_a"
+    assert manager.flow_control == flow_control
+    manager_open.assert_called_once_with(
+        mock.ANY,
+        callback=mock.sentinel.callback,
+        on_callback_error=future.set_exception,
+        max_batch_size=500,
+        max_batch_latency=2.5,
+    )
+
+
 def test_close(creds):
     client = subscriber.Client(credentials=creds)
     patcher = mock.patch.object(client._transport.grpc_channel, "close")